@@ -2,17 +2,31 @@ import os
 import uuid
 import logging
 from datetime import datetime
-from flask import Flask, request, jsonify
+import json
+import queue
+import time
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
 from config import config
-from models import db, Order, InvitationLog, Package, AdminAccount
+from models import db, Order, OrderMember, InvitationLog, Package, AdminAccount
 from utils.validators import validate_order_data
 from utils.tripay_client import get_tripay_client
-from utils.email_service import send_payment_confirmation, send_admin_notification
+from utils.order_pipeline import request_payment, find_reusable_order, PENDING_GATEWAY, GATEWAY_FAILED
+from utils.order_state import INVITATION_QUEUED
+from utils.background import run_in_background
+from utils.payment_channels import get_payment_catalog, is_channel_active
+from utils.idempotency import idempotent, IDEMPOTENCY_HEADER
+from utils.id_generator import generate_merchant_ref
+from utils.status_cache import get_order_status as get_cached_order_status
+from utils.order_events import get_event_hub
+from utils.order_queries import parse_order_filters, apply_order_filters, apply_cursor, encode_cursor, estimate_count
+from utils.order_export import iter_export, export_filename
+from utils.package_catalog import get_package, get_package_catalog, bump_catalog_version
+from utils.payment_events import record_payment_event, process_payment_events, start_payment_event_sweeper
 
 # Configure logging
 logging.basicConfig(
@@ -37,7 +51,8 @@ def create_app(config_name=None):
     CORS(app,
          origins=app.config['ALLOWED_ORIGINS'],
          supports_credentials=True,
-         allow_headers=['Content-Type', 'Authorization'],
+         allow_headers=['Content-Type', 'Authorization', 'Prefer', 'If-None-Match', 'Last-Event-ID', IDEMPOTENCY_HEADER],
+         expose_headers=['Location', 'ETag', 'Idempotent-Replayed'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     
     # Configure rate limiting
@@ -53,6 +68,43 @@ def create_app(config_name=None):
         except Exception as e:
             logger.warning(f"Celery initialization failed: {str(e)}")
     
+    # Without Celery beat, retry stuck payment events from this process
+    if celery is None:
+        start_payment_event_sweeper(app)
+    
+    def dispatch_payment_request(merchant_ref, payment_data, payment_method):
+        """Hand the Tripay call for a committed order to Celery or a background thread"""
+        if celery:
+            try:
+                from tasks import create_payment_task
+                create_payment_task.delay(merchant_ref, payment_data, payment_method)
+                return
+            except Exception as e:
+                logger.error(f"Failed to queue payment task for order {merchant_ref}: {str(e)}")
+        
+        run_in_background(app, request_payment, merchant_ref, payment_data, payment_method)
+    
+    def dispatch_payment_events(merchant_ref):
+        """Drain an order's payment events in a Celery worker or a background thread"""
+        if celery:
+            try:
+                from tasks import process_payment_events_task
+                process_payment_events_task.delay(merchant_ref)
+                return
+            except Exception as e:
+                logger.error(f"Failed to queue payment events for order {merchant_ref}: {str(e)}")
+        
+        run_in_background(app, process_payment_events, merchant_ref)
+    
+    def gateway_degraded_response(payment_result):
+        """503 with Retry-After for calls refused by the Tripay circuit breaker"""
+        details = payment_result.get('details', {})
+        response = jsonify({
+            'error': payment_result.get('error', 'Payment gateway degraded'),
+            'details': details
+        })
+        response.headers['Retry-After'] = str(details.get('retry_after', 30))
+        return response, 503
     
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -65,6 +117,7 @@ def create_app(config_name=None):
     
     @app.route('/api/orders', methods=['POST'])
     @limiter.limit("10 per minute")
+    @idempotent
     def create_order():
         """Create new order and initiate payment"""
         try:
@@ -81,12 +134,10 @@ def create_app(config_name=None):
             # Generate unique merchant_ref if not provided
             merchant_ref = validated_data.get('merchant_ref')
             if not merchant_ref:
-                import time
-                merchant_ref = f"INV-{int(time.time())}"
+                merchant_ref = generate_merchant_ref()
             
-            # Get package information
-            packages = app.config['PACKAGES']
-            package = packages.get(validated_data['package_id'])
+            # Get package information (inactive packages cannot be ordered)
+            package = get_package(validated_data['package_id'])
             
             if not package:
                 return jsonify({'error': 'Invalid package_id'}), 400
@@ -97,7 +148,41 @@ def create_app(config_name=None):
             # Get payment method
             payment_method = validated_data.get('payment_method', 'QRIS')
             
-            # Create order record
+            # Reject channels Tripay has disabled or whose amount limits the
+            # package price is outside of (only checked against the cache)
+            if is_channel_active(payment_method, amount) is False:
+                return jsonify({'error': f'Payment method not available: {payment_method}'}), 400
+            
+            # Repeat checkout: hand back the transaction the customer already has
+            existing_order = find_reusable_order(
+                validated_data['customer_email'],
+                validated_data['package_id'],
+                payment_method,
+                amount,
+                member_emails=validated_data['member_emails']
+            )
+            if existing_order:
+                logger.info(f"Reusing pending order {existing_order.order_id} for {existing_order.customer_email}")
+                return jsonify({
+                    'success': True,
+                    'order_id': existing_order.order_id,
+                    'reference': existing_order.reference,
+                    'checkout_url': existing_order.checkout_url,
+                    'qr_string': existing_order.qr_string,
+                    'payment_method': existing_order.payment_method,
+                    'amount': amount,
+                    'expired_at': existing_order.expired_at.isoformat(),
+                    'status': 'pending_payment',
+                    'reused': True
+                }), 200
+            
+            # Fail fast without creating an order while the gateway is degraded
+            tripay_client = get_tripay_client()
+            if tripay_client.is_degraded():
+                return gateway_degraded_response(tripay_client.degraded_response())
+            
+            # Phase 1: commit the order before talking to the gateway so no
+            # transaction or pooled connection is held across the HTTP call
             order = Order(
                 order_id=merchant_ref,
                 customer_email=validated_data['customer_email'],
@@ -105,15 +190,15 @@ def create_app(config_name=None):
                 phone_number=validated_data.get('phone_number'),
                 package_id=validated_data['package_id'],
                 amount=amount,
-                payment_status='pending',
-                invitation_status='pending'
+                payment_method=payment_method,
+                payment_status=PENDING_GATEWAY,
+                invitation_status='pending',
+                members=[OrderMember(email=email) for email in validated_data['member_emails']]
             )
             
             db.session.add(order)
-            db.session.flush()  # Get the ID without committing
+            db.session.commit()
             
-            # Create payment transaction
-            tripay_client = get_tripay_client()
             payment_data = {
                 'merchant_ref': merchant_ref,
                 'amount': amount,
@@ -124,23 +209,37 @@ def create_app(config_name=None):
                 'package_name': package['name']
             }
             
-            payment_result = tripay_client.create_transaction(payment_data, method=payment_method)
+            # Phase 2 (async mode): answer right away and let the client poll
+            prefer = request.headers.get('Prefer', '').lower()
+            if app.config.get('ORDER_ASYNC_GATEWAY') or 'respond-async' in prefer:
+                dispatch_payment_request(merchant_ref, payment_data, payment_method)
+                
+                logger.info(f"Order accepted, payment pending gateway: {merchant_ref}")
+                
+                status_url = f"/api/orders/{merchant_ref}/status"
+                response = jsonify({
+                    'success': True,
+                    'order_id': merchant_ref,
+                    'amount': amount,
+                    'payment_method': payment_method,
+                    'status': PENDING_GATEWAY,
+                    'status_url': status_url
+                })
+                response.headers['Location'] = status_url
+                return response, 202
+            
+            # Phase 2 (sync mode): call Tripay outside any transaction
+            payment_result = request_payment(merchant_ref, payment_data, payment_method)
+            
+            if payment_result.get('degraded'):
+                return gateway_degraded_response(payment_result)
             
             if not payment_result.get('success', False):
-                db.session.rollback()
-                logger.error(f"Tripay error: {payment_result.get('error', 'Unknown error')}")
                 return jsonify({
                     'error': payment_result.get('error', 'Payment gateway error'),
                     'details': payment_result.get('details', {})
                 }), 500
             
-            # Update order with Tripay transaction details
-            order.checkout_url = payment_result.get('checkout_url')
-            order.payment_method = payment_result.get('payment_method')
-            order.reference = payment_result.get('reference')
-            
-            db.session.commit()
-            
             logger.info(f"Order created successfully: {merchant_ref}")
             
             return jsonify({
@@ -174,28 +273,119 @@ def create_app(config_name=None):
     def get_order_status(order_id):
         """Get order status"""
         try:
-            order = Order.query.filter_by(order_id=order_id).first()
+            status = get_cached_order_status(order_id)
             
-            if not order:
+            if not status:
                 return jsonify({'error': 'Order not found'}), 404
             
-            # Generate status message
-            message = generate_status_message(order)
-            
-            return jsonify({
-                'order_id': order.order_id,
-                'payment_status': order.payment_status,
-                'invitation_status': order.invitation_status,
-                'message': message
-            })
+            # Idle pollers revalidate with If-None-Match and get an empty 304
+            if request.if_none_match.contains(status['etag']):
+                response = app.response_class(status=304)
+            else:
+                response = jsonify({
+                    'order_id': status['order_id'],
+                    'payment_status': status['payment_status'],
+                    'invitation_status': status['invitation_status'],
+                    'checkout_url': status['checkout_url'],
+                    'qr_string': status['qr_string'],
+                    'payment_method': status['payment_method'],
+                    'message': generate_status_message(status)
+                })
+            
+            response.set_etag(status['etag'])
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
             
         except Exception as e:
             logger.error(f"Error getting order status: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
+    # Statuses after which a stream has nothing more to report
+    FINAL_PAYMENT_STATUSES = ('failed', 'expired', GATEWAY_FAILED)
+    FINAL_INVITATION_STATUSES = ('sent', 'manual_review_required')
+    
+    def is_final_status(status):
+        return (status['payment_status'] in FINAL_PAYMENT_STATUSES or
+                status['invitation_status'] in FINAL_INVITATION_STATUSES)
+    
+    def format_status_event(status):
+        """Serialize a status as a Server-Sent Event, using its ETag as the event id"""
+        data = json.dumps({
+            'order_id': status['order_id'],
+            'payment_status': status['payment_status'],
+            'invitation_status': status['invitation_status'],
+            'checkout_url': status['checkout_url'],
+            'qr_string': status['qr_string'],
+            'payment_method': status['payment_method'],
+            'message': generate_status_message(status)
+        })
+        return f"id: {status['etag']}\nevent: status\ndata: {data}\n\n"
+    
+    @app.route('/api/orders/<order_id>/events', methods=['GET'])
+    @limiter.limit("20 per minute")
+    def stream_order_events(order_id):
+        """Stream payment/invitation status transitions as Server-Sent Events"""
+        try:
+            status = get_cached_order_status(order_id)
+            if not status:
+                return jsonify({'error': 'Order not found'}), 404
+        except Exception as e:
+            logger.error(f"Error opening event stream: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+        finally:
+            # The stream outlives the request; hand the connection back to
+            # the pool instead of holding it for ORDER_EVENTS_MAX_SECONDS
+            db.session.remove()
+        
+        hub = get_event_hub()
+        last_event_id = request.headers.get('Last-Event-ID')
+        heartbeat = app.config.get('ORDER_EVENTS_HEARTBEAT_SECONDS', 15)
+        max_seconds = app.config.get('ORDER_EVENTS_MAX_SECONDS', 600)
+        
+        def generate(status):
+            events = hub.subscribe(order_id) if hub else None
+            try:
+                yield f"retry: {app.config.get('ORDER_EVENTS_RETRY_MS', 3000)}\n\n"
+                
+                # Skip the snapshot if the reconnecting client already has it
+                last_sent = last_event_id
+                if status['etag'] != last_sent:
+                    yield format_status_event(status)
+                    last_sent = status['etag']
+                
+                deadline = time.monotonic() + max_seconds
+                while not is_final_status(status) and time.monotonic() < deadline:
+                    try:
+                        if events is None:
+                            time.sleep(heartbeat)
+                            raise queue.Empty
+                        status = events.get(timeout=heartbeat)
+                    except queue.Empty:
+                        # Re-check the cache in case an event was missed (or
+                        # there is no Redis), then keep the connection alive
+                        try:
+                            status = get_cached_order_status(order_id) or status
+                        finally:
+                            db.session.remove()
+                        if status['etag'] == last_sent:
+                            yield ": keep-alive\n\n"
+                            continue
+                    
+                    if status['etag'] != last_sent:
+                        yield format_status_event(status)
+                        last_sent = status['etag']
+            finally:
+                if events is not None:
+                    hub.unsubscribe(order_id, events)
+        
+        response = Response(stream_with_context(generate(status)), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
     @app.route('/api/payment/webhook', methods=['POST'])
     def tripay_callback():
-        """Handle Tripay payment callback"""
+        """Handle Tripay payment callback: verify, store in the inbox, return 200"""
         try:
             # Get webhook data
             webhook_data = request.get_json()
@@ -225,52 +415,15 @@ def create_app(config_name=None):
                 logger.error(f"Callback body: {safe_data}")
                 return jsonify({'error': 'Invalid signature'}), 401
             
-            # Find order
-            order = Order.query.filter_by(order_id=merchant_ref).first()
-            if not order:
-                logger.error(f"Order not found: {merchant_ref}")
-                return jsonify({'error': 'Order not found'}), 404
-            
-            # Map Tripay status to our internal status
-            status_mapping = {
-                'PAID': 'paid',
-                'EXPIRED': 'expired',
-                'FAILED': 'failed',
-                'UNPAID': 'pending'
-            }
+            # Store the event and acknowledge; the order is updated by the inbox drain
+            event = record_payment_event(webhook_data)
+            if event is None:
+                logger.info(f"Duplicate Tripay callback ignored for order {merchant_ref} ({reference} {status})")
+                return jsonify({'success': True}), 200
             
-            new_status = status_mapping.get(status, 'pending')
-            old_status = order.payment_status
+            dispatch_payment_events(merchant_ref)
             
-            # Update order status
-            order.payment_status = new_status
-            order.updated_at = datetime.utcnow()
-            
-            # If payment is successful, trigger invitation process
-            if new_status == 'paid' and old_status != 'paid':
-                order.invitation_status = 'processing'
-                
-                # Send payment confirmation email
-                try:
-                    send_payment_confirmation(order)
-                except Exception as e:
-                    logger.error(f"Failed to send payment confirmation: {str(e)}")
-                
-                # Trigger invitation task
-                if celery:
-                    try:
-                        from tasks import process_invitation_task
-                        process_invitation_task.delay(order.id)
-                        logger.info(f"Invitation task queued for order {merchant_ref}")
-                    except Exception as e:
-                        logger.error(f"Failed to queue invitation task: {str(e)}")
-                        order.invitation_status = 'failed'
-                else:
-                    logger.info(f"Celery disabled, invitation task not queued for order {merchant_ref}")
-            
-            db.session.commit()
-            
-            logger.info(f"Tripay callback processed successfully for order {merchant_ref}: {old_status} -> {new_status}")
+            logger.info(f"Tripay callback stored as payment event {event.id} for order {merchant_ref} ({status})")
             
             return jsonify({'success': True}), 200
             
@@ -285,56 +438,188 @@ def create_app(config_name=None):
     
     @app.route('/api/packages', methods=['GET'])
     def get_packages():
-        """Get available packages"""
+        """Get available packages (served from the versioned package cache)"""
         try:
-            packages = app.config['PACKAGES']
-            return jsonify({'packages': packages})
+            payload, etag = get_package_catalog()
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = jsonify(payload)
+            
+            response.set_etag(etag)
+            max_age = app.config.get('PACKAGES_CACHE_MAX_AGE', 300)
+            stale = app.config.get('PACKAGES_CACHE_STALE_AGE', 86400)
+            response.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={stale}'
+            return response
         except Exception as e:
             logger.error(f"Error getting packages: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
+    @app.route('/api/payment-channels', methods=['GET'])
+    def get_payment_channels():
+        """Get active payment channels with per-package fees (served from cache)"""
+        try:
+            catalog = get_payment_catalog()
+            if catalog is None:
+                response = jsonify({'error': 'Payment channels not available yet'})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+            
+            payload, etag = catalog
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = jsonify(payload)
+            
+            response.set_etag(etag)
+            max_age = app.config.get('PAYMENT_CHANNELS_TTL', 300)
+            response.headers['Cache-Control'] = f'public, max-age={max_age}, stale-while-revalidate={max_age}'
+            return response
+        except Exception as e:
+            logger.error(f"Error getting payment channels: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
     @app.route('/api/admin/orders', methods=['GET'])
     @limiter.limit("100 per hour")
     def admin_get_orders():
-        """Admin endpoint to get orders (basic implementation)"""
+        """
+        Admin endpoint to get orders, newest first, with keyset pagination
+        
+        Pass next_cursor from the previous page as ?cursor=; the old ?page=
+        parameter is rejected. The total is a planner estimate unless
+        ?count=exact is given or the database cannot estimate.
+        """
         try:
             # In production, add proper authentication here
-            page = request.args.get('page', 1, type=int)
-            per_page = min(request.args.get('per_page', 20, type=int), 100)
+            if 'page' in request.args:
+                return jsonify({'error': 'page is not supported, pass next_cursor from the previous page as cursor'}), 400
             
-            orders = Order.query.order_by(Order.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            limit = min(request.args.get('per_page', 20, type=int), 100)
+            
+            try:
+                filters = parse_order_filters(request.args)
+                query = apply_order_filters(Order.query, filters)
+                filtered_query = query
+                
+                cursor = request.args.get('cursor')
+                if cursor:
+                    query = apply_cursor(query, cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            orders = query.options(db.selectinload(Order.members)).order_by(
+                Order.created_at.desc(), Order.id.desc()
+            ).limit(limit + 1).all()
+            has_more = len(orders) > limit
+            orders = orders[:limit]
+            
+            exact = request.args.get('count') == 'exact'
+            total = None if exact else estimate_count(filtered_query)
+            if total is None:
+                exact = True
+                total = filtered_query.order_by(None).count()
             
             return jsonify({
-                'orders': [order.to_dict() for order in orders.items],
-                'total': orders.total,
-                'pages': orders.pages,
-                'current_page': page
+                'orders': [order.to_dict() for order in orders],
+                'next_cursor': encode_cursor(orders[-1]) if has_more else None,
+                'has_more': has_more,
+                'total': total,
+                'total_is_estimate': not exact
             })
             
         except Exception as e:
             logger.error(f"Error getting admin orders: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     
-    def generate_status_message(order):
-        """Generate human-readable status message"""
-        if order.payment_status == 'pending':
+    @app.route('/api/admin/orders/export', methods=['GET'])
+    @limiter.limit("10 per hour")
+    def admin_export_orders():
+        """
+        Admin endpoint streaming orders joined with invitation logs
+        
+        ?format=csv|ndjson, ?gzip=1, plus the same filters as /api/admin/orders.
+        The response is sent with chunked encoding while rows are read.
+        """
+        try:
+            # In production, add proper authentication here
+            export_format = request.args.get('format', 'csv')
+            compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+            
+            try:
+                filters = parse_order_filters(request.args)
+                chunks = iter_export(
+                    filters,
+                    export_format=export_format,
+                    compress=compress,
+                    batch_size=app.config.get('ORDER_EXPORT_BATCH_SIZE', 1000)
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            if compress:
+                mimetype = 'application/gzip'
+            elif export_format == 'csv':
+                mimetype = 'text/csv'
+            else:
+                mimetype = 'application/x-ndjson'
+            
+            response = Response(stream_with_context(chunks), mimetype=mimetype)
+            response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(export_format, compress)}"'
+            response.headers['X-Accel-Buffering'] = 'no'
+            return response
+            
+        except Exception as e:
+            logger.error(f"Error exporting orders: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    @app.route('/api/admin/gateway/health', methods=['GET'])
+    @limiter.limit("100 per hour")
+    def admin_gateway_health():
+        """Admin endpoint exposing Tripay latency and circuit breaker state"""
+        try:
+            # In production, add proper authentication here
+            return jsonify({'tripay': get_tripay_client().get_health()})
+        except Exception as e:
+            logger.error(f"Error getting gateway health: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    @app.route('/api/admin/browser-pool', methods=['GET'])
+    @limiter.limit("100 per hour")
+    def admin_browser_pool():
+        """Admin endpoint exposing per-worker browser pool stats and stored login sessions"""
+        try:
+            # In production, add proper authentication here
+            # Imported here so the web process does not load Selenium;
+            # neither module imports it
+            from automation.pool_stats import read_pool_stats
+            from automation.session_store import session_stats
+            return jsonify({'workers': read_pool_stats(), 'stored_sessions': session_stats()})
+        except Exception as e:
+            logger.error(f"Error getting browser pool stats: {str(e)}")
+            return jsonify({'error': 'Internal server error'}), 500
+    
+    def generate_status_message(status):
+        """Generate human-readable status message from cached status fields"""
+        if status['payment_status'] == PENDING_GATEWAY:
+            return "Pesanan diterima. Sedang menyiapkan instruksi pembayaran."
+        elif status['payment_status'] == GATEWAY_FAILED:
+            return "Gagal membuat transaksi pembayaran. Silakan buat pesanan baru."
+        elif status['payment_status'] == 'pending':
             return "Menunggu pembayaran. Silakan selesaikan pembayaran sesuai instruksi."
-        elif order.payment_status == 'failed':
+        elif status['payment_status'] == 'failed':
             return "Pembayaran gagal. Silakan coba lagi atau hubungi support."
-        elif order.payment_status == 'expired':
+        elif status['payment_status'] == 'expired':
             return "Pembayaran kedaluwarsa. Silakan buat pesanan baru."
-        elif order.payment_status == 'paid':
-            if order.invitation_status == 'pending':
+        elif status['payment_status'] == 'paid':
+            if status['invitation_status'] in ('pending', INVITATION_QUEUED):
                 return "Pembayaran berhasil. Proses undangan akan segera dimulai."
-            elif order.invitation_status == 'processing':
+            elif status['invitation_status'] == 'processing':
                 return "Pembayaran berhasil. Undangan sedang diproses dan akan dikirim dalam 5-30 menit."
-            elif order.invitation_status == 'sent':
-                return f"Undangan ChatGPT Plus telah dikirim ke {order.customer_email}. Silakan cek inbox dan spam folder."
-            elif order.invitation_status == 'failed':
+            elif status['invitation_status'] == 'sent':
+                return f"Undangan ChatGPT Plus telah dikirim ke {status['customer_email']}. Silakan cek inbox dan spam folder."
+            elif status['invitation_status'] == 'failed':
                 return "Pembayaran berhasil, namun ada kendala dalam pengiriman undangan. Tim support akan menghubungi Anda."
-            elif order.invitation_status == 'manual_review_required':
+            elif status['invitation_status'] == 'manual_review_required':
                 return "Pembayaran berhasil. Undangan memerlukan review manual. Tim support akan menghubungi Anda segera."
         
         return "Status tidak diketahui. Silakan hubungi support."
@@ -373,11 +658,13 @@ def init_database(app):
                     name=package_data['name'],
                     price=package_data['price'],
                     duration=package_data['duration'],
-                    description=package_data['description']
+                    description=package_data['description'],
+                    seats=package_data.get('seats', 1)
                 )
                 db.session.add(package)
         
         db.session.commit()
+        bump_catalog_version()
         logger.info("Database initialized successfully")
 
 if __name__ == '__main__':
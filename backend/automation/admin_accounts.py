@@ -0,0 +1,59 @@
+import logging
+from datetime import datetime
+from flask import current_app
+from models import db, AdminAccount
+
+logger = logging.getLogger(__name__)
+
+def get_next_admin():
+    """
+    Pick the admin account for the next invitation
+
+    Rotates through active accounts, least recently used first, skipping
+    accounts at ADMIN_MAX_FAILED_ATTEMPTS consecutive failures. Falls back
+    to CHATGPT_ADMIN_EMAIL/CHATGPT_ADMIN_PASSWORD (id None) when the table
+    has no usable account.
+
+    Returns:
+        dict: {'id', 'email', 'password'} or None if no account is available
+    """
+    max_failures = current_app.config.get('ADMIN_MAX_FAILED_ATTEMPTS', 5)
+    admin = AdminAccount.query.filter(
+        AdminAccount.is_active.is_(True),
+        AdminAccount.failed_attempts < max_failures
+    ).order_by(AdminAccount.last_used.asc().nullsfirst(), AdminAccount.id).first()
+
+    if admin:
+        return {'id': admin.id, 'email': admin.email, 'password': admin.password}
+
+    email = current_app.config.get('CHATGPT_ADMIN_EMAIL')
+    password = current_app.config.get('CHATGPT_ADMIN_PASSWORD')
+    if email and password:
+        return {'id': None, 'email': email, 'password': password}
+
+    logger.error("No usable admin account: all disabled or over the failure limit")
+    return None
+
+def mark_admin_success(admin_id):
+    """Record a successful invitation: reset failures, update last_used"""
+    try:
+        AdminAccount.query.filter_by(id=admin_id).update({
+            'failed_attempts': 0,
+            'last_used': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to mark admin {admin_id} success: {str(e)}")
+
+def mark_admin_failure(admin_id):
+    """Record a failed login or invitation; the account is skipped after ADMIN_MAX_FAILED_ATTEMPTS"""
+    try:
+        AdminAccount.query.filter_by(id=admin_id).update({
+            'failed_attempts': AdminAccount.failed_attempts + 1,
+            'last_used': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to mark admin {admin_id} failure: {str(e)}")
\ No newline at end of file
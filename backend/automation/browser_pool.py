@@ -0,0 +1,332 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from flask import current_app
+from automation.chatgpt_inviter import ChatGPTTeamInviter
+from automation.admin_accounts import get_next_admin, mark_admin_success, mark_admin_failure
+from automation.locator import get_locator_stats
+from automation.timing import get_step_profile
+from automation.driver_manager import get_driver_paths
+from automation.browser_profile import profile_name
+from automation.pool_stats import publish_pool_stats
+
+logger = logging.getLogger(__name__)
+
+class SessionUnavailable(Exception):
+    """A logged-in browser session could not be created"""
+
+def _process_tree_rss_mb(pid):
+    """
+    Resident memory of a process and all its descendants, in MB
+
+    Reads /proc, so chromedriver plus every Chrome renderer it spawned is
+    counted. Returns None where /proc is not available.
+    """
+    if not pid or not os.path.exists(f'/proc/{pid}'):
+        return None
+    total_kb = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+class BrowserSession:
+    """A Chrome instance logged in as one admin account"""
+
+    def __init__(self, admin, inviter):
+        self.admin_id = admin['id']
+        self.admin_email = admin['email']
+        self.inviter = inviter
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.baseline_rss_mb = self.rss_mb()
+
+    @property
+    def key(self):
+        return self.admin_id if self.admin_id is not None else self.admin_email
+
+    def rss_mb(self):
+        try:
+            return _process_tree_rss_mb(self.inviter.driver.service.process.pid)
+        except Exception:
+            return None
+
+    def is_healthy(self):
+        """The browser answers and the admin is still logged in"""
+        try:
+            driver = self.inviter.driver
+            if not driver.window_handles:
+                return False
+            if driver.execute_script('return document.readyState') not in ('interactive', 'complete'):
+                return False
+            return '/auth/login' not in driver.current_url
+        except Exception:
+            return False
+
+    def to_dict(self):
+        now = time.monotonic()
+        return {
+            'admin_email': self.admin_email,
+            'uses': self.uses,
+            'age_seconds': int(now - self.created_at),
+            'idle_seconds': int(now - self.last_used),
+            'rss_mb': self.rss_mb(),
+            'baseline_rss_mb': self.baseline_rss_mb
+        }
+
+    def close(self):
+        self.inviter.close()
+
+class BrowserPool:
+    """
+    Per-worker pool of logged-in Chrome sessions, one per admin account
+
+    A lease reuses the idle session of the admin if it passes a health
+    check, so steady-state invites only pay navigation and the invite
+    itself. Sessions are recycled after max_uses leases, max_age_seconds,
+    or once Chrome has grown max_rss_growth_mb over its size after login.
+    """
+
+    def __init__(self, headless=True, timeout=30, max_uses=50, max_age_seconds=3600,
+                 max_rss_growth_mb=300, max_sessions=2, step_budgets=None, mode='dom', workspace_id=None):
+        self.headless = headless
+        self.timeout = timeout
+        self.step_budgets = step_budgets
+        self.mode = mode
+        self.workspace_id = workspace_id
+        self.max_uses = max_uses
+        self.max_age_seconds = max_age_seconds
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.max_sessions = max_sessions
+        self._idle = {}  # admin key -> BrowserSession
+        self._lock = threading.Lock()
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'leases': 0,
+            'login_failures': 0,
+            'recycled': {'max_uses': 0, 'max_age': 0, 'memory': 0, 'unhealthy': 0, 'error': 0, 'evicted': 0}
+        }
+
+    def _recycle_reason(self, session):
+        if session.uses >= self.max_uses:
+            return 'max_uses'
+        if time.monotonic() - session.created_at >= self.max_age_seconds:
+            return 'max_age'
+        rss = session.rss_mb()
+        if rss is not None and session.baseline_rss_mb is not None and rss - session.baseline_rss_mb >= self.max_rss_growth_mb:
+            return 'memory'
+        if not session.is_healthy():
+            return 'unhealthy'
+        return None
+
+    def _discard(self, session, reason):
+        logger.info(f"Recycling browser session for {session.admin_email} ({reason}, {session.uses} uses)")
+        with self._lock:
+            self._stats['recycled'][reason] += 1
+        session.close()
+
+    def _create(self, admin):
+        inviter = ChatGPTTeamInviter(
+            headless=self.headless,
+            timeout=self.timeout,
+            step_budgets=self.step_budgets,
+            mode=self.mode,
+            workspace_id=self.workspace_id
+        )
+        if not inviter.run_step('setup', inviter._setup_driver):
+            raise SessionUnavailable("Failed to setup WebDriver")
+        if not inviter.run_step('login', inviter.ensure_logged_in, admin['email'], admin['password'], admin_id=admin['id']):
+            inviter.close()
+            with self._lock:
+                self._stats['login_failures'] += 1
+            raise SessionUnavailable("Login failed")
+
+        with self._lock:
+            self._stats['created'] += 1
+        logger.info(f"New browser session logged in as {admin['email']}")
+        return BrowserSession(admin, inviter)
+
+    def _evict_idle(self):
+        """Keep at most max_sessions idle browsers, dropping the least recently used"""
+        with self._lock:
+            if len(self._idle) <= self.max_sessions:
+                return
+            oldest = sorted(self._idle.values(), key=lambda session: session.last_used)
+            evicted = oldest[:len(self._idle) - self.max_sessions]
+            for session in evicted:
+                del self._idle[session.key]
+        for session in evicted:
+            self._discard(session, 'evicted')
+
+    @contextmanager
+    def lease(self, admin):
+        """
+        Lease a logged-in session for an admin account
+
+        The session goes back to the pool when the block completes and is
+        closed if it raises, since the page state is then unknown.
+
+        Raises:
+            SessionUnavailable: if a new session cannot be set up or log in
+        """
+        key = admin['id'] if admin['id'] is not None else admin['email']
+        with self._lock:
+            session = self._idle.pop(key, None)
+            self._stats['leases'] += 1
+
+        if session is not None:
+            reason = self._recycle_reason(session)
+            if reason:
+                self._discard(session, reason)
+                session = None
+            else:
+                with self._lock:
+                    self._stats['reused'] += 1
+
+        if session is None:
+            session = self._create(admin)
+
+        try:
+            yield session.inviter
+        except Exception:
+            self._discard(session, 'error')
+            raise
+
+        session.uses += 1
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle[session.key] = session
+        self._evict_idle()
+
+    def discard(self, admin):
+        """Close the idle session of an admin, e.g. after its password changed"""
+        key = admin['id'] if admin['id'] is not None else admin['email']
+        with self._lock:
+            session = self._idle.pop(key, None)
+        if session:
+            self._discard(session, 'error')
+
+    def stats(self):
+        with self._lock:
+            stats = json.loads(json.dumps(self._stats))
+            sessions = list(self._idle.values())
+        stats['idle_sessions'] = [session.to_dict() for session in sessions]
+        stats['hit_rate'] = round(stats['reused'] / stats['leases'], 3) if stats['leases'] else None
+        stats['locators'] = get_locator_stats().snapshot()
+        stats['steps'] = get_step_profile().snapshot()
+        stats['driver'] = get_driver_paths().info()
+        stats['profile'] = profile_name()
+        rss = [session['rss_mb'] for session in stats['idle_sessions'] if session['rss_mb'] is not None]
+        stats['avg_rss_mb'] = round(sum(rss) / len(rss), 1) if rss else None
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._idle.values())
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+# Global pool instance (one per worker process)
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Factory function to get this worker process's browser pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                _pool = BrowserPool(
+                    headless=config.get('SELENIUM_HEADLESS', True),
+                    timeout=config.get('SELENIUM_TIMEOUT', 30),
+                    max_uses=config.get('SELENIUM_POOL_MAX_USES', 50),
+                    max_age_seconds=config.get('SELENIUM_POOL_MAX_AGE_SECONDS', 3600),
+                    max_rss_growth_mb=config.get('SELENIUM_POOL_MAX_RSS_GROWTH_MB', 300),
+                    max_sessions=config.get('SELENIUM_POOL_MAX_SESSIONS', 2),
+                    step_budgets=config.get('INVITER_STEP_BUDGETS'),
+                    mode=config.get('INVITER_MODE', 'api'),
+                    workspace_id=config.get('CHATGPT_WORKSPACE_ID')
+                )
+    return _pool
+
+def shutdown_browser_pool():
+    """Close every pooled browser; called on worker shutdown and at exit"""
+    if _pool is not None:
+        _pool.close_all()
+
+atexit.register(shutdown_browser_pool)
+
+def process_invitation_pooled(member_email, team_url=None):
+    """
+    Pooled counterpart of ChatGPTTeamInviter.process_invitation
+
+    Returns:
+        bool: True if the invitation was sent
+    """
+    return process_invitations_pooled([member_email], team_url=team_url)[member_email]
+
+def process_invitations_pooled(member_emails, team_url=None):
+    """
+    Invite several members with one workspace API request, or one
+    navigate and invite-modal cycle
+
+    Logs in only when no healthy session of the chosen admin is idle in
+    this worker. The admin account is credited with a success if any
+    email was invited.
+
+    Returns:
+        dict: email -> True if invited
+    """
+    results = {email: False for email in member_emails}
+    admin = get_next_admin()
+    if not admin:
+        logger.error("No active admin accounts available")
+        return results
+    team_url = team_url or "https://chatgpt.com/admin?tab=members"
+
+    pool = get_browser_pool()
+    try:
+        with pool.lease(admin) as inviter:
+            try:
+                results = inviter.send_invitations(member_emails, team_url)
+                if not any(results.values()):
+                    raise Exception("Failed to send invitation")
+            except Exception:
+                inviter._take_screenshot("process_failed")
+                raise
+    except Exception as e:
+        logger.error(f"Invitation process failed: {str(e)}")
+        if admin['id']:
+            mark_admin_failure(admin['id'])
+        return results
+    finally:
+        publish_pool_stats(pool)
+
+    if admin['id']:
+        mark_admin_success(admin['id'])
+    invited = sum(results.values())
+    logger.info(f"Invitation process completed: {invited}/{len(member_emails)} invited")
+    return results
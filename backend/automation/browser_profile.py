@@ -0,0 +1,77 @@
+import os
+import logging
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Requests the invite flow never needs: fonts, images, media and
+# third-party analytics. Patterns are for CDP Network.setBlockedURLs.
+BLOCKED_URL_PATTERNS = [
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.ico',
+    '*.mp4', '*.webm', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*segment.io*', '*segment.com*', '*intercom.io*', '*intercomcdn.com*',
+    '*browser-intake-datadoghq.com*', '*sentry.io*'
+]
+
+# Chrome features and background services an automation browser does not use
+LEAN_CHROME_ARGUMENTS = [
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-translate',
+    '--disable-client-side-phishing-detection',
+    '--disable-domain-reliability',
+    '--disable-features=Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--mute-audio'
+]
+
+def _setting(name, default):
+    """Setting from the app config, or the environment in standalone scripts"""
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return os.environ.get(name, default)
+
+def is_lean():
+    value = _setting('SELENIUM_LEAN_PROFILE', True)
+    return value if isinstance(value, bool) else str(value).lower() == 'true'
+
+def profile_name():
+    """Name reported with the pool stats, to compare runs of both profiles"""
+    return 'lean' if is_lean() else 'default'
+
+def apply_profile(chrome_options):
+    """Add the window size and, for the lean profile, its Chrome arguments"""
+    if not is_lean():
+        chrome_options.add_argument('--window-size=1920,1080')
+        return
+
+    # New headless mode instead of the old one (only if running headless)
+    if '--headless' in chrome_options.arguments:
+        chrome_options.arguments.remove('--headless')
+        chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument(f"--window-size={_setting('SELENIUM_WINDOW_SIZE', '1280,800')}")
+    for argument in LEAN_CHROME_ARGUMENTS:
+        chrome_options.add_argument(argument)
+
+    # One cache for every browser of the host, so static assets are
+    # downloaded once instead of once per fresh profile
+    cache_dir = _setting('SELENIUM_DISK_CACHE_DIR', '/tmp/chrome-cache')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        chrome_options.add_argument(f'--disk-cache-dir={cache_dir}')
+
+def block_heavy_resources(driver):
+    """Block BLOCKED_URL_PATTERNS in a started browser (lean profile only)"""
+    if not is_lean():
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logger.warning(f"Failed to block heavy resources: {str(e)}")
@@ -0,0 +1,135 @@
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+BACKEND_API_URL = "https://chatgpt.com/backend-api"
+
+# Lists the accounts (personal and workspaces) of the logged-in user
+ACCOUNTS_CHECK_PATH = "/accounts/check/v4-2023-04-27"
+
+# Role of invited members ("Member" in the invite modal)
+MEMBER_ROLE = "standard-user"
+
+# Page size for member and invite listings
+PAGE_SIZE = 100
+
+class WorkspaceAPIError(Exception):
+    """The workspace API could not be used; callers fall back to the DOM flow"""
+
+class WorkspaceAPIClient:
+    """
+    Workspace admin API of ChatGPT, called with a logged-in browser's session
+
+    The access token comes from /api/auth/session of the browser, and its
+    cookies and user agent are sent along so requests look like the ones
+    the admin page itself makes. One keep-alive connection pool per client;
+    the browser pool keeps a client per logged-in session.
+    """
+
+    def __init__(self, access_token, cookies=None, user_agent=None, account_id=None, timeout=(3.05, 15)):
+        self.account_id = account_id
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json',
+            'Origin': 'https://chatgpt.com',
+            'Referer': 'https://chatgpt.com/admin?tab=members'
+        })
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+        for cookie in cookies or []:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+    def _request(self, method, path, **kwargs):
+        """
+        Raises:
+            WorkspaceAPIError: on network errors, non-2xx responses or non-JSON bodies
+        """
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, f"{BACKEND_API_URL}{path}", timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise WorkspaceAPIError(f"{method} {path} failed: {str(e)}")
+        finally:
+            logger.info(f"Workspace API {method} {path} took {(time.monotonic() - started) * 1000:.0f} ms")
+
+        if response.status_code >= 300:
+            raise WorkspaceAPIError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+        try:
+            return response.json()
+        except ValueError:
+            raise WorkspaceAPIError(f"{method} {path} returned a non-JSON body")
+
+    def _account_request(self, method, suffix, **kwargs):
+        """Request under /accounts/{workspace id}, discovering the id on first use"""
+        if not self.account_id:
+            self.account_id = self.discover_account_id()
+        headers = {'ChatGPT-Account-Id': self.account_id}
+        return self._request(method, f"/accounts/{self.account_id}/{suffix}", headers=headers, **kwargs)
+
+    def discover_account_id(self):
+        """
+        Id of the workspace the admin belongs to
+
+        Raises:
+            WorkspaceAPIError: if the user is in no workspace
+        """
+        accounts = self._request('GET', ACCOUNTS_CHECK_PATH).get('accounts', {})
+        for account_id, entry in accounts.items():
+            if (entry.get('account') or {}).get('structure') == 'workspace':
+                return account_id
+        raise WorkspaceAPIError("No workspace account found for this admin")
+
+    def _list(self, suffix, email_field):
+        emails = set()
+        offset = 0
+        while True:
+            page = self._account_request('GET', suffix, params={'offset': offset, 'limit': PAGE_SIZE, 'query': ''})
+            items = page.get('items', [])
+            emails.update(item[email_field].lower() for item in items if item.get(email_field))
+            offset += len(items)
+            if not items or offset >= page.get('total', 0):
+                return emails
+
+    def list_members(self):
+        """Emails of the workspace members, lowercased"""
+        return self._list('users', 'email')
+
+    def list_invites(self):
+        """Emails with a pending invite, lowercased"""
+        return self._list('invites', 'email_address')
+
+    def invite(self, emails):
+        """
+        Invite several emails as members with one request
+
+        Returns:
+            dict: email -> True if the invite was created; addresses the API
+            reported as errored come back False
+        """
+        payload = {'email_addresses': emails, 'role': MEMBER_ROLE, 'resend_emails': True}
+        body = self._account_request('POST', 'invites', json=payload)
+
+        errored = {
+            str(entry.get('email_address') if isinstance(entry, dict) else entry).lower()
+            for entry in body.get('errored_emails', [])
+        }
+        return {email: email.lower() not in errored for email in emails}
+
+    def verify(self, emails):
+        """
+        Returns:
+            dict: email -> True if the email is a member or has a pending invite
+        """
+        known = self.list_invites() | self.list_members()
+        return {email: email.lower() in known for email in emails}
+
+    def close(self):
+        self.session.close()
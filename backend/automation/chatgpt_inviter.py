@@ -1,4 +1,5 @@
 import os
+import json
 import time
 import logging
 from datetime import datetime
@@ -12,12 +13,32 @@ from selenium.common.exceptions import (
     TimeoutException, NoSuchElementException, WebDriverException,
     ElementClickInterceptedException, StaleElementReferenceException
 )
-from webdriver_manager.chrome import ChromeDriverManager
+from automation.admin_accounts import get_next_admin, mark_admin_success, mark_admin_failure
+from automation.session_store import load_session, save_session, record_restore
+from automation.locator import wait_for_any
+from automation.timing import DEFAULT_STEP_BUDGETS, StepClock, StepBudgetExceeded, get_step_profile
+from automation.chatgpt_api import WorkspaceAPIClient, WorkspaceAPIError
+from automation.driver_manager import get_driver_paths
+from automation.browser_profile import apply_profile, block_heavy_resources
+
+# Returns the logged-in user and access token, or {} when logged out
+SESSION_CHECK_URL = "https://chatgpt.com/api/auth/session"
+
+# Page load state and number of resources fetched so far
+PAGE_ACTIVITY_SCRIPT = "return [document.readyState, performance.getEntriesByType('resource').length]"
+
+# The invite modal, open while any of these is displayed
+DIALOG_SELECTOR = '//div[@role="dialog"]'
 
 class ChatGPTTeamInviter:
-    def __init__(self, headless=True, timeout=30):
+    def __init__(self, headless=True, timeout=30, step_budgets=None, mode='dom', workspace_id=None):
         self.headless = headless
         self.timeout = timeout
+        self.mode = mode  # 'api' invites over HTTP, falling back to 'dom' (the members page)
+        self.workspace_id = workspace_id
+        self.api_client = None
+        self.step_budgets = dict(DEFAULT_STEP_BUDGETS, **(step_budgets or {}))
+        self._clock = None  # StepClock of the step in progress
         self.driver = None
         self.logger = logging.getLogger(__name__)
         self.screenshots_dir = os.path.join(os.path.dirname(__file__), '..', 'screenshots')
@@ -48,19 +69,27 @@ class ChatGPTTeamInviter:
             # User agent to appear more human-like
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
-            # Window size
-            chrome_options.add_argument('--window-size=1920,1080')
+            # Window size and, unless SELENIUM_LEAN_PROFILE is off, the lean
+            # profile (new headless mode, no background services, shared disk cache)
+            apply_profile(chrome_options)
             
-            # Setup Chrome service
-            service = Service(ChromeDriverManager().install())
+            # Setup Chrome service with the driver resolved once per process
+            paths = get_driver_paths().resolve()
+            if paths['binary_path']:
+                chrome_options.binary_location = paths['binary_path']
+            service = Service(paths['driver_path'])
             
+            started = time.monotonic()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            get_step_profile().record('driver_start', time.monotonic() - started, True)
+            block_heavy_resources(self.driver)
             
             # Execute script to remove webdriver property
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            # Set timeouts
-            self.driver.implicitly_wait(10)
+            # Set timeouts; waits are all explicit (see automation/locator.py),
+            # an implicit wait would stack on top of every one of them
+            self.driver.implicitly_wait(0)
             self.driver.set_page_load_timeout(self.timeout)
             
             self.logger.info("Chrome WebDriver initialized successfully")
@@ -84,9 +113,71 @@ class ChatGPTTeamInviter:
             self.logger.error(f"Failed to take screenshot: {str(e)}")
             return None
     
+    def run_step(self, step, func, *args, **kwargs):
+        """
+        Run one step of the invite flow within its time budget
+        
+        Every wait inside the step is capped at what is left of
+        step_budgets[step], and the duration is added to the step profile.
+        """
+        self._clock = StepClock(step, self.step_budgets.get(step, self.timeout))
+        result = False
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            elapsed = self._clock.elapsed()
+            self._clock = None
+            succeeded = any(result.values()) if isinstance(result, dict) else bool(result)
+            get_step_profile().record(step, elapsed, succeeded)
+            self.logger.info(f"Step {step} took {elapsed:.2f}s")
+    
+    def _timeout(self, timeout=None):
+        """Timeout for a wait, capped by the budget of the current step"""
+        timeout = timeout or self.timeout
+        if self._clock is None:
+            return timeout
+        return self._clock.timeout(timeout)
+    
+    def _wait_for_page_ready(self, timeout=None, quiet_seconds=0.5):
+        """
+        Wait until the document has loaded and no new resources were fetched
+        for quiet_seconds (network idle, as far as the page can tell)
+        """
+        state = {'count': -1, 'since': time.monotonic()}
+        
+        def settled(driver):
+            ready_state, resources = driver.execute_script(PAGE_ACTIVITY_SCRIPT)
+            now = time.monotonic()
+            if ready_state != 'complete' or resources != state['count']:
+                state.update(count=resources, since=now)
+                return False
+            return now - state['since'] >= quiet_seconds
+        
+        try:
+            WebDriverWait(self.driver, self._timeout(timeout), poll_frequency=0.1).until(settled)
+            return True
+        except TimeoutException:
+            self.logger.warning("Page did not settle, continuing")
+            return False
+    
+    def _wait_for_dialog_closed(self, timeout=None):
+        """Wait until no dialog is displayed"""
+        def closed(driver):
+            return not any(dialog.is_displayed() for dialog in driver.find_elements(By.XPATH, DIALOG_SELECTOR))
+        
+        try:
+            WebDriverWait(
+                self.driver, self._timeout(timeout), poll_frequency=0.2,
+                ignored_exceptions=(StaleElementReferenceException,)
+            ).until(closed)
+            return True
+        except TimeoutException:
+            return False
+    
     def _wait_and_find_element(self, by, value, timeout=None):
         """Wait for element and return it"""
-        timeout = timeout or self.timeout
+        timeout = self._timeout(timeout)
         try:
             element = WebDriverWait(self.driver, timeout).until(
                 EC.presence_of_element_located((by, value))
@@ -96,17 +187,23 @@ class ChatGPTTeamInviter:
             self.logger.error(f"Element not found: {by}={value}")
             return None
     
+    def _wait_for_any(self, step, locators, timeout=None, condition='present'):
+        """Wait for whichever of several fallback locators matches first"""
+        element = wait_for_any(self.driver, step, locators, self._timeout(timeout), condition=condition)
+        if element is None:
+            self.logger.error(f"No locator matched for {step}: {locators}")
+        return element
+    
     def _wait_and_click_element(self, by, value, timeout=None):
         """Wait for element to be clickable and click it"""
-        timeout = timeout or self.timeout
+        timeout = self._timeout(timeout)
         try:
             element = WebDriverWait(self.driver, timeout).until(
                 EC.element_to_be_clickable((by, value))
             )
             
-            # Scroll to element
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(1)
+            # Scroll to element instantly, so it is in place for the click
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});", element)
             
             # Try regular click first
             try:
@@ -126,45 +223,46 @@ class ChatGPTTeamInviter:
         try:
             self.logger.info(f"Attempting to login with email: {email}")
             
-            # Navigate to login page
+            # Navigate to login page; the email field below is the readiness condition
             self.driver.get(login_url)
-            time.sleep(3)
             
             # Wait for and fill email field
-            email_field = self._wait_and_find_element(By.CSS_SELECTOR, 'input[type="email"], input[name="email"], #email')
-            if not email_field:
-                # Try alternative selectors
-                email_field = self._wait_and_find_element(By.XPATH, '//input[@placeholder="Email address"]')
+            email_field = self._wait_for_any('login_email', [
+                (By.CSS_SELECTOR, 'input[type="email"], input[name="email"], #email'),
+                (By.XPATH, '//input[@placeholder="Email address"]')
+            ], condition='visible')
             
             if not email_field:
                 raise Exception("Email input field not found")
             
             email_field.clear()
             email_field.send_keys(email)
-            time.sleep(1)
             
-            # Click continue button
-            continue_btn = self._wait_and_find_element(By.XPATH, '//button[contains(text(), "Continue") or contains(text(), "Next")]')
+            # Click continue button once it is enabled
+            continue_btn = self._wait_for_any('login_continue', [
+                '//button[contains(text(), "Continue") or contains(text(), "Next")]'
+            ], condition='clickable')
             if continue_btn:
                 continue_btn.click()
-                time.sleep(3)
             
-            # Wait for and fill password field
-            password_field = self._wait_and_find_element(By.CSS_SELECTOR, 'input[type="password"], input[name="password"], #password')
+            # Wait for and fill password field (shown after the continue step)
+            password_field = self._wait_for_any('login_password', [
+                (By.CSS_SELECTOR, 'input[type="password"], input[name="password"], #password')
+            ], condition='visible')
             if not password_field:
                 raise Exception("Password input field not found")
             
             password_field.clear()
             password_field.send_keys(password)
-            time.sleep(1)
             
             # Click login/continue button
-            login_btn = self._wait_and_find_element(By.XPATH, '//button[contains(text(), "Continue") or contains(text(), "Log in") or contains(text(), "Sign in")]')
+            login_btn = self._wait_for_any('login_submit', [
+                '//button[contains(text(), "Continue") or contains(text(), "Log in") or contains(text(), "Sign in")]'
+            ], condition='clickable')
             if not login_btn:
                 raise Exception("Login button not found")
             
             login_btn.click()
-            time.sleep(5)
             
             # Check if login was successful
             # Look for elements that indicate successful login
@@ -174,18 +272,16 @@ class ChatGPTTeamInviter:
                 '//div[contains(text(), "ChatGPT")]'
             ]
             
-            login_success = False
-            for indicator in success_indicators:
-                if self._wait_and_find_element(By.XPATH, indicator, timeout=10):
-                    login_success = True
-                    break
+            login_success = self._wait_for_any('login_success', success_indicators, timeout=20) is not None
             
             if login_success:
                 self.logger.info("Login successful")
                 return True
             else:
                 # Check for error messages
-                error_element = self._wait_and_find_element(By.XPATH, '//div[contains(@class, "error") or contains(text(), "error") or contains(text(), "invalid")]', timeout=5)
+                error_element = wait_for_any(self.driver, 'login_error', [
+                    '//div[contains(@class, "error") or contains(text(), "error") or contains(text(), "invalid")]'
+                ], timeout=self._timeout(2))
                 if error_element:
                     error_msg = error_element.text
                     self.logger.error(f"Login failed with error: {error_msg}")
@@ -198,6 +294,121 @@ class ChatGPTTeamInviter:
             self._take_screenshot("login_failed")
             return False
     
+    def get_auth_session(self):
+        """The auth session of the browser: user and access token, or {} when logged out"""
+        try:
+            self.driver.get(SESSION_CHECK_URL)
+            return json.loads(self.driver.execute_script("return document.body.innerText") or '{}')
+        except (WebDriverException, ValueError) as e:
+            self.logger.warning(f"Session check failed: {str(e)}")
+            return {}
+    
+    def is_logged_in(self):
+        """Check the session with one request to the auth session endpoint"""
+        return bool(self.get_auth_session().get('accessToken'))
+    
+    def _get_api_client(self):
+        """
+        Workspace API client using this browser's login, created once per session
+        
+        Raises:
+            WorkspaceAPIError: if the browser has no access token
+        """
+        if self.api_client is None:
+            access_token = self.get_auth_session().get('accessToken')
+            if not access_token:
+                raise WorkspaceAPIError("No access token in the browser session")
+            self.api_client = WorkspaceAPIClient(
+                access_token,
+                cookies=self.export_cookies(),
+                user_agent=self.driver.execute_script("return navigator.userAgent"),
+                account_id=self.workspace_id,
+                timeout=(3.05, self.timeout)
+            )
+        return self.api_client
+    
+    def invite_members_api(self, member_emails):
+        """
+        Invite over the workspace API with one request, then look up the
+        emails it reported as errored (e.g. already invited) in the member
+        and invite lists
+        
+        Raises:
+            WorkspaceAPIError: if the API cannot be used
+        """
+        client = self._get_api_client()
+        client.timeout = (3.05, self._timeout())  # reads may use what is left of the step budget
+        results = client.invite(member_emails)
+        
+        unconfirmed = [email for email, invited in results.items() if not invited]
+        if unconfirmed:
+            results.update(client.verify(unconfirmed))
+        
+        self.logger.info(f"Invited over the workspace API: {sum(results.values())}/{len(member_emails)}")
+        return results
+    
+    def send_invitations(self, member_emails, team_url):
+        """
+        Invite members in the configured mode; API mode falls back to the
+        members page when the API call fails or runs out of its budget
+        
+        Returns:
+            dict: email -> True if invited
+        """
+        if self.mode == 'api':
+            try:
+                return self.run_step('api_invite', self.invite_members_api, member_emails)
+            except (WorkspaceAPIError, StepBudgetExceeded) as e:
+                self.logger.warning(f"Workspace API unavailable, falling back to the members page: {str(e)}")
+                self.close_api_client()
+        
+        if not self.run_step('navigate', self.navigate_to_team_management, team_url):
+            raise Exception("Failed to navigate to team management")
+        return self.run_step('invite', self.invite_members, member_emails)
+    
+    def close_api_client(self):
+        if self.api_client is not None:
+            self.api_client.close()
+            self.api_client = None
+    
+    def restore_session(self, cookies):
+        """Load stored cookies into the browser and verify they are still logged in"""
+        try:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        except WebDriverException as e:
+            self.logger.warning(f"Failed to restore cookies: {str(e)}")
+            return False
+        return self.is_logged_in()
+    
+    def export_cookies(self):
+        """All cookies of the browser, including those of the auth domain"""
+        return self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+    
+    def ensure_logged_in(self, admin_email, admin_password, admin_id=None):
+        """
+        Log in by restoring the stored session of the account, falling back
+        to the interactive login when there is none or it has expired. A
+        fresh login is stored for the next driver.
+        """
+        cookies = load_session(admin_email)
+        if cookies:
+            if self.restore_session(cookies):
+                self.logger.info(f"Restored stored session for {admin_email}")
+                record_restore(admin_email, True)
+                return True
+            self.logger.info(f"Stored session for {admin_email} expired, logging in")
+            record_restore(admin_email, False)
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        
+        if not self.login(admin_email, admin_password):
+            return False
+        
+        try:
+            save_session(admin_email, self.export_cookies(), admin_id=admin_id)
+        except WebDriverException as e:
+            self.logger.warning(f"Failed to export cookies: {str(e)}")
+        return True
+    
     def navigate_to_team_management(self, team_url):
         """Navigate to team management page"""
         try:
@@ -205,8 +416,10 @@ class ChatGPTTeamInviter:
             admin_url = "https://chatgpt.com/admin?tab=members"
             self.logger.info(f"Navigating to admin members page: {admin_url}")
             
+            started = time.monotonic()
             self.driver.get(admin_url)
-            time.sleep(5)
+            ready = self._wait_for_page_ready(timeout=10)
+            get_step_profile().record('page_load', time.monotonic() - started, ready)
             
             # Wait for admin members page to load
             team_indicators = [
@@ -216,10 +429,9 @@ class ChatGPTTeamInviter:
                 '//button[@class="btn relative btn-primary" and contains(text(), "Invite member")]'
             ]
             
-            for indicator in team_indicators:
-                if self._wait_and_find_element(By.XPATH, indicator, timeout=15):
-                    self.logger.info("Successfully navigated to admin members page")
-                    return True
+            if self._wait_for_any('members_page', team_indicators, timeout=15):
+                self.logger.info("Successfully navigated to admin members page")
+                return True
             
             raise Exception("Admin members page not loaded properly")
             
@@ -230,8 +442,22 @@ class ChatGPTTeamInviter:
     
     def invite_member(self, member_email):
         """Send invitation to team member"""
+        return self.invite_members([member_email])[member_email]
+    
+    def invite_members(self, member_emails):
+        """
+        Invite several members with one submission of the invite modal
+        
+        Returns:
+            dict: email -> True if invited. The confirmation message is
+            generic, so it only settles a single-email submission; for
+            several emails (possibly of several orders), or without a
+            message, each email is looked up on the page and addresses the
+            workspace rejected come back False.
+        """
+        results = {email: False for email in member_emails}
         try:
-            self.logger.info(f"Attempting to invite member: {member_email}")
+            self.logger.info(f"Attempting to invite {len(member_emails)} member(s): {', '.join(member_emails)}")
             
             # Look for "Invite member" button (based on screenshot)
             invite_selectors = [
@@ -240,18 +466,13 @@ class ChatGPTTeamInviter:
                 '//button[contains(@class, "btn-primary") and contains(text(), "Invite")]'
             ]
             
-            invite_button = None
-            for selector in invite_selectors:
-                invite_button = self._wait_and_find_element(By.XPATH, selector, timeout=10)
-                if invite_button:
-                    break
+            invite_button = self._wait_for_any('invite_button', invite_selectors, timeout=10, condition='clickable')
             
             if not invite_button:
                 raise Exception("Invite button not found")
             
             # Click invite button
             invite_button.click()
-            time.sleep(3)
             
             # Wait for invite modal to appear
             modal_selectors = [
@@ -260,17 +481,9 @@ class ChatGPTTeamInviter:
                 '//div[@role="dialog"]'
             ]
             
-            modal_found = False
-            for selector in modal_selectors:
-                if self._wait_and_find_element(By.XPATH, selector, timeout=10):
-                    modal_found = True
-                    break
-            
-            if not modal_found:
+            if not self._wait_for_any('invite_modal', modal_selectors, timeout=10, condition='visible'):
                 raise Exception("Failed to click invite button")
             
-            time.sleep(3)
-            
             # Wait for invite modal/form to appear
             # Based on screenshot, look for email input in the modal
             email_input_selectors = [
@@ -279,19 +492,14 @@ class ChatGPTTeamInviter:
                 '//input[@type="email"]'
             ]
             
-            email_input = None
-            for selector in email_input_selectors:
-                email_input = self._wait_and_find_element(By.XPATH, selector, timeout=10)
-                if email_input:
-                    break
+            email_input = self._wait_for_any('invite_email_input', email_input_selectors, timeout=10, condition='visible')
             
             if not email_input:
                 raise Exception("Email input field not found in invite form")
             
-            # Fill email field
+            # Fill email field; the modal takes a comma separated list
             email_input.clear()
-            email_input.send_keys(member_email)
-            time.sleep(1)
+            email_input.send_keys(', '.join(member_emails))
             
             # Select Member role from dropdown (based on screenshot)
             role_selectors = [
@@ -300,29 +508,27 @@ class ChatGPTTeamInviter:
                 '//button[contains(text(), "Member") and contains(@class, "dropdown")]'
             ]
             
-            # Find role dropdown and select Member
-            for selector in role_selectors:
-                role_element = self._wait_and_find_element(By.XPATH, selector, timeout=5)
-                if role_element:
-                    try:
-                        # If it's a select dropdown (most likely based on screenshot)
-                        if role_element.tag_name == 'select':
-                            from selenium.webdriver.support.ui import Select
-                            select = Select(role_element)
-                            # Select Member role (default option)
+            # Find role dropdown and select Member (optional: Member is the default)
+            role_element = wait_for_any(self.driver, 'role_select', role_selectors, timeout=self._timeout(3))
+            if role_element:
+                try:
+                    # If it's a select dropdown (most likely based on screenshot)
+                    if role_element.tag_name == 'select':
+                        from selenium.webdriver.support.ui import Select
+                        select = Select(role_element)
+                        # Select Member role (default option)
+                        try:
+                            select.select_by_visible_text('Member')
+                            self.logger.info("Selected Member role from dropdown")
+                        except:
                             try:
-                                select.select_by_visible_text('Member')
-                                self.logger.info("Selected Member role from dropdown")
+                                select.select_by_value('member')
+                                self.logger.info("Selected member role by value")
                             except:
-                                try:
-                                    select.select_by_value('member')
-                                    self.logger.info("Selected member role by value")
-                                except:
-                                    # Member is usually the default, so continue
-                                    self.logger.info("Using default Member role")
-                    except Exception as e:
-                        self.logger.warning(f"Could not set role to Member: {str(e)}")
-                    break
+                                # Member is usually the default, so continue
+                                self.logger.info("Using default Member role")
+                except Exception as e:
+                    self.logger.warning(f"Could not set role to Member: {str(e)}")
             
             # Look for send invite button
             # Based on screenshot, look for "Next" button
@@ -333,20 +539,17 @@ class ChatGPTTeamInviter:
                 '//button[@type="submit"]'
             ]
             
-            send_button = None
-            for selector in send_selectors:
-                send_button = self._wait_and_find_element(By.XPATH, selector, timeout=10)
-                if send_button and send_button.is_enabled():
-                    break
+            send_button = self._wait_for_any('invite_send', send_selectors, timeout=10, condition='clickable')
             
             if not send_button:
                 raise Exception("Send invite button not found or not enabled")
             
-            # Click send button
+            # Click send button; the modal closes once the request completed
             send_button.click()
-            time.sleep(5)
+            if not self._wait_for_dialog_closed(timeout=15):
+                self.logger.warning("Invite modal still open after sending")
             
-            # Wait for confirmation
+            # Wait for confirmation (the toast shows up as the modal closes)
             success_indicators = [
                 '//div[contains(text(), "invited")]',
                 '//div[contains(text(), "sent")]',
@@ -355,51 +558,74 @@ class ChatGPTTeamInviter:
                 '//div[contains(text(), "Member added")]'
             ]
             
-            for indicator in success_indicators:
-                if self._wait_and_find_element(By.XPATH, indicator, timeout=10):
-                    self.logger.info(f"Successfully invited member: {member_email}")
-                    return True
+            confirmed = wait_for_any(self.driver, 'invite_success', success_indicators, timeout=self._timeout(3), condition='visible')
+            if confirmed and len(member_emails) == 1:
+                self.logger.info(f"Successfully invited: {member_emails[0]}")
+                return {member_emails[0]: True}
             
-            # If no success message, check if the email appears in pending invitations
-            if self.verify_invitation_status(member_email):
-                self.logger.info(f"Invitation verified for: {member_email}")
-                return True
+            # One toast does not say which addresses of a batch were accepted:
+            # check which emails appear in pending invitations
+            results = self.verify_invitations(member_emails)
+            if not any(results.values()):
+                raise Exception("No confirmation of successful invitation")
             
-            raise Exception("No confirmation of successful invitation")
+            failed = [email for email, invited in results.items() if not invited]
+            if failed:
+                self.logger.warning(f"Invitation not confirmed for: {', '.join(failed)}")
+                self._take_screenshot("invite_partial")
+            return results
             
         except Exception as e:
-            self.logger.error(f"Failed to invite member {member_email}: {str(e)}")
+            self.logger.error(f"Failed to invite {', '.join(member_emails)}: {str(e)}")
             self._take_screenshot("invite_failed")
-            return False
+            return results
     
     def verify_invitation_status(self, member_email):
         """Verify if invitation was sent successfully"""
+        self.logger.info(f"Verifying invitation status for: {member_email}")
+        return self.verify_invitations([member_email])[member_email]
+    
+    def verify_invitations(self, member_emails):
+        """Look up several emails on the members page, refreshing it at most once"""
         try:
-            self.logger.info(f"Verifying invitation status for: {member_email}")
+            results = {email: bool(self.driver.find_elements(By.XPATH, f'//*[contains(text(), "{email}")]'))
+                       for email in member_emails}
+            if all(results.values()):
+                return results
             
-            # Look for the email in pending invitations or member list
-            email_elements = self.driver.find_elements(By.XPATH, f'//*[contains(text(), "{member_email}")]')
-            
-            if email_elements:
-                self.logger.info(f"Found {member_email} in team management page")
-                return True
-            
-            # Try refreshing the page and checking again
             self.driver.refresh()
-            time.sleep(5)
-            
-            email_elements = self.driver.find_elements(By.XPATH, f'//*[contains(text(), "{member_email}")]')
             
-            return len(email_elements) > 0
+            # Wait until every email is listed (the list renders after the page)
+            def all_listed(driver):
+                for email, found in results.items():
+                    if not found:
+                        results[email] = bool(driver.find_elements(By.XPATH, f'//*[contains(text(), "{email}")]'))
+                return all(results.values())
             
+            try:
+                WebDriverWait(self.driver, self._timeout(10), poll_frequency=0.2).until(all_listed)
+            except TimeoutException:
+                pass
+            return results
         except Exception as e:
             self.logger.error(f"Failed to verify invitation status: {str(e)}")
-            return False
+            return {email: False for email in member_emails}
     
     def process_invitation(self, member_email, admin_id=None, admin_email=None, admin_password=None, team_url=None):
         """Complete invitation process"""
+        results = self.process_invitations([member_email], admin_id, admin_email, admin_password, team_url)
+        return results[member_email]
+    
+    def process_invitations(self, member_emails, admin_id=None, admin_email=None, admin_password=None, team_url=None):
+        """
+        Complete invitation process for several members in one browser session
+        
+        Returns:
+            dict: email -> True if invited
+        """
+        results = {email: False for email in member_emails}
         try:
-            self.logger.info(f"Starting invitation process for {member_email}")
+            self.logger.info(f"Starting invitation process for {', '.join(member_emails)}")
             
             # Get admin credentials if not provided
             if not admin_email or not admin_password:
@@ -416,51 +642,37 @@ class ChatGPTTeamInviter:
                 team_url = "https://chatgpt.com/admin?tab=members"
             
             # Initialize driver
-            if not self._setup_driver():
-                if admin_id:
-                    mark_admin_failure(admin_id)
+            if not self.run_step('setup', self._setup_driver):
                 raise Exception("Failed to setup WebDriver")
             
-            # Login
-            if not self.login(admin_email, admin_password):
-                if admin_id:
-                    mark_admin_failure(admin_id)
+            # Login, reusing the stored session when it is still valid
+            if not self.run_step('login', self.ensure_logged_in, admin_email, admin_password, admin_id=admin_id):
                 raise Exception("Login failed")
             
-            # Navigate to team management
-            if not self.navigate_to_team_management(team_url):
-                if admin_id:
-                    mark_admin_failure(admin_id)
-                raise Exception("Failed to navigate to team management")
-            
-            # Send invitation
-            if not self.invite_member(member_email):
-                if admin_id:
-                    mark_admin_failure(admin_id)
+            # Send invitations with one API request or one submission of the invite modal
+            results = self.send_invitations(member_emails, team_url)
+            if not any(results.values()):
                 raise Exception("Failed to send invitation")
             
-            # Verify invitation
-            if not self.verify_invitation_status(member_email):
-                self.logger.warning(f"Could not verify invitation status for {member_email}")
-            
             # Mark admin as successful
             if admin_id:
                 mark_admin_success(admin_id)
             
-            self.logger.info(f"Invitation process completed successfully for {member_email}")
-            return True
+            self.logger.info(f"Invitation process completed: {sum(results.values())}/{len(member_emails)} invited")
+            return results
             
         except Exception as e:
             self.logger.error(f"Invitation process failed: {str(e)}")
             if admin_id:
                 mark_admin_failure(admin_id)
             self._take_screenshot("process_failed")
-            return False
+            return results
         finally:
             self.close()
     
     def close(self):
         """Close the browser and clean up"""
+        self.close_api_client()
         try:
             if self.driver:
                 self.driver.quit()
@@ -469,6 +681,12 @@ class ChatGPTTeamInviter:
             self.logger.error(f"Error closing WebDriver: {str(e)}")
 
 # Factory function for easy instantiation
-def create_inviter(headless=True, timeout=30):
+def create_inviter(headless=True, timeout=30, step_budgets=None, mode='dom', workspace_id=None):
     """Create and return a ChatGPTTeamInviter instance"""
-    return ChatGPTTeamInviter(headless=headless, timeout=timeout)
\ No newline at end of file
+    return ChatGPTTeamInviter(
+        headless=headless,
+        timeout=timeout,
+        step_budgets=step_budgets,
+        mode=mode,
+        workspace_id=workspace_id
+    )
\ No newline at end of file
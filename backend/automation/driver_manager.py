@@ -0,0 +1,83 @@
+import os
+import time
+import logging
+import threading
+from flask import current_app, has_app_context
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+def _configured_path(name):
+    """Path setting from the app config, or the environment in standalone scripts"""
+    if has_app_context():
+        return current_app.config.get(name)
+    return os.environ.get(name)
+
+class DriverPaths:
+    """
+    ChromeDriver and Chrome binary of this worker process, resolved once
+
+    CHROMEDRIVER_PATH is used as-is when it points at a file; otherwise
+    webdriver-manager resolves a driver (a version lookup, possibly a
+    download) on first use only, and the result is pinned for the life of
+    the process.
+    """
+
+    def __init__(self):
+        self._resolved = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """
+        Returns:
+            dict: driver_path, binary_path (None for Chrome's default),
+            source ('config' or 'webdriver-manager') and resolve_seconds
+        """
+        if self._resolved is None:
+            with self._lock:
+                if self._resolved is None:
+                    self._resolved = self._resolve()
+        return self._resolved
+
+    def _resolve(self):
+        started = time.monotonic()
+
+        driver_path = _configured_path('CHROMEDRIVER_PATH')
+        if driver_path and os.path.isfile(driver_path):
+            source = 'config'
+        else:
+            if driver_path:
+                logger.warning(f"CHROMEDRIVER_PATH {driver_path} not found, resolving with webdriver-manager")
+            driver_path = ChromeDriverManager().install()
+            source = 'webdriver-manager'
+
+        binary_path = _configured_path('CHROME_BINARY_PATH')
+        if binary_path and not os.path.isfile(binary_path):
+            logger.warning(f"CHROME_BINARY_PATH {binary_path} not found, using the default Chrome")
+            binary_path = None
+
+        resolved = {
+            'driver_path': driver_path,
+            'binary_path': binary_path,
+            'source': source,
+            'resolve_seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info(f"ChromeDriver resolved from {source} in {resolved['resolve_seconds']}s: {driver_path}")
+        return resolved
+
+    def info(self):
+        """Resolved paths for the pool stats; None before the first resolve"""
+        return dict(self._resolved) if self._resolved else None
+
+_paths = DriverPaths()
+
+def get_driver_paths():
+    """Factory function to get this process's resolved ChromeDriver paths"""
+    return _paths
+
+def warm_up_driver():
+    """Resolve the driver at worker boot so the first invite does not pay for it"""
+    try:
+        _paths.resolve()
+    except Exception as e:
+        logger.warning(f"ChromeDriver warm-up failed, resolving on first invite: {str(e)}")
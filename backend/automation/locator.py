@@ -0,0 +1,113 @@
+import time
+import logging
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+logger = logging.getLogger(__name__)
+
+# Element checks a locator match must pass
+CONDITIONS = {
+    'present': lambda element: True,
+    'visible': lambda element: element.is_displayed(),
+    'clickable': lambda element: element.is_displayed() and element.is_enabled()
+}
+
+def _normalize(locator):
+    """Plain strings are XPath, as in the inviter's selector lists"""
+    if isinstance(locator, str):
+        return (By.XPATH, locator)
+    return tuple(locator)
+
+class LocatorStats:
+    """
+    Per-step hit counts of fallback locators (one instance per process)
+
+    The locator that matched most often for a step is tried first on the
+    next wait, so once the page settles on one layout the common case is a
+    hit on the first find_elements call.
+    """
+
+    def __init__(self):
+        self._steps = {}
+        self._lock = threading.Lock()
+
+    def _step(self, step):
+        return self._steps.setdefault(step, {'hits': {}, 'misses': 0, 'wait_seconds': 0.0})
+
+    def order(self, step, locators):
+        """Locators by descending hits; ties keep their listed order"""
+        with self._lock:
+            hits = dict(self._step(step)['hits'])
+        return sorted(locators, key=lambda locator: -hits.get(locator[1], 0))
+
+    def record(self, step, locator, elapsed):
+        with self._lock:
+            stats = self._step(step)
+            stats['wait_seconds'] += elapsed
+            if locator is None:
+                stats['misses'] += 1
+            else:
+                stats['hits'][locator[1]] = stats['hits'].get(locator[1], 0) + 1
+
+    def snapshot(self):
+        """Copy of the stats, e.g. for the browser pool stats endpoint"""
+        with self._lock:
+            return {
+                step: {
+                    'hits': dict(stats['hits']),
+                    'misses': stats['misses'],
+                    'wait_seconds': round(stats['wait_seconds'], 3)
+                }
+                for step, stats in self._steps.items()
+            }
+
+_stats = LocatorStats()
+
+def get_locator_stats():
+    """Factory function to get the process-wide locator statistics"""
+    return _stats
+
+def wait_for_any(driver, step, locators, timeout, condition='present', poll_frequency=0.2):
+    """
+    Wait until any of several locators matches, in one polling loop
+
+    Each poll runs find_elements for every locator, best performer first,
+    and returns the first element passing the condition. A miss therefore
+    costs timeout once, not timeout per locator. The driver's implicit wait
+    must be 0, or every empty find_elements call blocks for it.
+
+    Args:
+        driver: Selenium WebDriver
+        step (str): Name the hit statistics are kept under
+        locators (list): XPath strings or (By, value) tuples
+        timeout (float): Seconds to wait in total
+        condition (str): 'present', 'visible' or 'clickable'
+
+    Returns:
+        WebElement or None if nothing matched within timeout
+    """
+    ordered = _stats.order(step, [_normalize(locator) for locator in locators])
+    check = CONDITIONS[condition]
+
+    def first_match(driver):
+        for locator in ordered:
+            for element in driver.find_elements(*locator):
+                if check(element):
+                    return element, locator
+        return False
+
+    started = time.monotonic()
+    try:
+        element, locator = WebDriverWait(
+            driver, timeout,
+            poll_frequency=poll_frequency,
+            ignored_exceptions=(StaleElementReferenceException,)
+        ).until(first_match)
+    except TimeoutException:
+        _stats.record(step, None, time.monotonic() - started)
+        return None
+
+    _stats.record(step, locator, time.monotonic() - started)
+    return element
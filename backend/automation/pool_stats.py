@@ -0,0 +1,32 @@
+import os
+import json
+import socket
+import logging
+from flask import current_app
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'browser_pool:stats:{}'
+
+def publish_pool_stats(pool):
+    """Store this worker's pool stats in Redis for /api/admin/browser-pool"""
+    try:
+        client = get_redis()
+        if client:
+            key = STATS_KEY.format(f"{socket.gethostname()}:{os.getpid()}")
+            client.set(key, json.dumps(pool.stats()), ex=current_app.config.get('SELENIUM_POOL_STATS_TTL', 3600))
+    except Exception as e:
+        logger.warning(f"Failed to publish browser pool stats: {str(e)}")
+
+def read_pool_stats():
+    """Stats published by every worker, keyed by host:pid"""
+    client = get_redis()
+    if not client:
+        return {}
+    stats = {}
+    for key in client.scan_iter(match=STATS_KEY.format('*')):
+        raw = client.get(key)
+        if raw:
+            stats[key.decode('utf-8').split(':', 2)[2]] = json.loads(raw)
+    return stats
@@ -0,0 +1,112 @@
+import json
+import base64
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from cryptography.fernet import Fernet, InvalidToken
+from flask import current_app, has_app_context
+from models import db, AdminSession
+
+logger = logging.getLogger(__name__)
+
+# Only cookies of these domains are needed to stay logged in
+SESSION_COOKIE_DOMAINS = ('chatgpt.com', 'openai.com')
+
+# Fields accepted by CDP Network.setCookies; getAllCookies returns more
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires', 'priority')
+
+def _get_fernet():
+    """
+    Fernet cipher for stored sessions
+
+    Uses ADMIN_SESSION_KEY (a Fernet key) if set, otherwise a key derived
+    from SECRET_KEY. Changing either makes stored sessions unreadable, which
+    only costs one interactive login per account.
+    """
+    key = current_app.config.get('ADMIN_SESSION_KEY')
+    if not key:
+        digest = hashlib.sha256(current_app.config['SECRET_KEY'].encode('utf-8')).digest()
+        key = base64.urlsafe_b64encode(digest)
+    return Fernet(key)
+
+def clean_cookies(cookies):
+    """Keep the session cookies and the fields setCookies accepts"""
+    cleaned = []
+    for cookie in cookies:
+        if not cookie.get('domain', '').lstrip('.').endswith(SESSION_COOKIE_DOMAINS):
+            continue
+        cookie = {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+        if cookie.get('expires', -1) <= 0:
+            cookie.pop('expires', None)  # session cookie
+        cleaned.append(cookie)
+    return cleaned
+
+def load_session(admin_email):
+    """
+    Stored cookies of an admin account
+
+    Returns:
+        list: CDP cookie dicts, or None if nothing usable is stored
+    """
+    if not has_app_context():
+        return None  # standalone scripts log in every time
+    try:
+        session = AdminSession.query.filter_by(admin_email=admin_email).first()
+        if not session:
+            return None
+
+        max_age = timedelta(seconds=current_app.config.get('ADMIN_SESSION_MAX_AGE_SECONDS', 604800))
+        if datetime.utcnow() - session.created_at > max_age:
+            logger.info(f"Stored session for {admin_email} is older than the max age")
+            return None
+
+        return json.loads(_get_fernet().decrypt(session.cookies.encode('utf-8')))
+    except InvalidToken:
+        logger.warning(f"Stored session for {admin_email} cannot be decrypted (key changed?)")
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load stored session for {admin_email}: {str(e)}")
+        return None
+
+def save_session(admin_email, cookies, admin_id=None):
+    """Encrypt and store the cookies of a fresh interactive login"""
+    if not has_app_context():
+        return
+    try:
+        token = _get_fernet().encrypt(json.dumps(clean_cookies(cookies)).encode('utf-8')).decode('utf-8')
+        session = AdminSession.query.filter_by(admin_email=admin_email).first()
+        if session is None:
+            session = AdminSession(admin_email=admin_email, restores=0, restore_failures=0, logins=0)
+            db.session.add(session)
+        session.admin_id = admin_id
+        session.cookies = token
+        session.created_at = datetime.utcnow()
+        session.last_verified_at = session.created_at
+        session.logins += 1
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Failed to store session for {admin_email}: {str(e)}")
+
+def record_restore(admin_email, success):
+    """Count a restore attempt of a stored session for the hit rate"""
+    if success:
+        values = {'restores': AdminSession.restores + 1, 'last_verified_at': datetime.utcnow()}
+    else:
+        values = {'restore_failures': AdminSession.restore_failures + 1}
+    try:
+        AdminSession.query.filter_by(admin_email=admin_email).update(values, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Failed to record session restore for {admin_email}: {str(e)}")
+
+def delete_session(admin_email):
+    """Forget the stored session, e.g. after a password change"""
+    deleted = AdminSession.query.filter_by(admin_email=admin_email).delete()
+    db.session.commit()
+    return bool(deleted)
+
+def session_stats():
+    """Age, restores and hit rate of every stored session"""
+    return [session.to_dict() for session in AdminSession.query.order_by(AdminSession.admin_email).all()]
@@ -0,0 +1,91 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Seconds each inviter step may take in total, across all of its waits
+DEFAULT_STEP_BUDGETS = {
+    'setup': 30,
+    'login': 60,
+    'api_invite': 15,
+    'navigate': 20,
+    'invite': 45  # includes looking the emails up when no toast was seen
+}
+
+# Durations kept per step for the percentiles
+PROFILE_WINDOW = 200
+
+class StepBudgetExceeded(Exception):
+    """A step used up its time budget"""
+
+class StepClock:
+    """Deadline of the step in progress"""
+
+    def __init__(self, step, budget):
+        self.step = step
+        self.budget = budget
+        self.started = time.monotonic()
+        self.deadline = self.started + budget
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def timeout(self, wanted):
+        """
+        Timeout for the next wait: wanted, capped at what is left of the budget
+
+        Raises:
+            StepBudgetExceeded: if nothing is left
+        """
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise StepBudgetExceeded(f"Step {self.step} exceeded its {self.budget}s budget")
+        return min(wanted, remaining)
+
+class StepProfile:
+    """Recent durations of every inviter step (one instance per process)"""
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self._window = window
+        self._steps = {}
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, succeeded):
+        with self._lock:
+            stats = self._steps.setdefault(step, {
+                'durations': deque(maxlen=self._window),
+                'count': 0,
+                'failures': 0
+            })
+            stats['durations'].append(seconds)
+            stats['count'] += 1
+            if not succeeded:
+                stats['failures'] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: step -> count, failures and p50/p95/max seconds of the recent window
+        """
+        with self._lock:
+            steps = {step: (sorted(stats['durations']), stats['count'], stats['failures'])
+                     for step, stats in self._steps.items()}
+
+        profile = {}
+        for step, (durations, count, failures) in steps.items():
+            profile[step] = {
+                'count': count,
+                'failures': failures,
+                'p50': round(durations[len(durations) // 2], 3),
+                'p95': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+                'max': round(durations[-1], 3)
+            }
+        return profile
+
+_profile = StepProfile()
+
+def get_step_profile():
+    """Factory function to get the process-wide step duration profile"""
+    return _profile
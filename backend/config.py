@@ -25,6 +25,87 @@ class Config:
     TRIPAY_BASE_URL = os.environ.get('TRIPAY_BASE_URL', 'https://tripay.co.id/api')
     TRIPAY_CALLBACK_URL = os.environ.get('TRIPAY_CALLBACK_URL')
     
+    # Tripay HTTP client: one keep-alive pool per process, sized to the
+    # number of threads serving requests in that process
+    TRIPAY_POOL_SIZE = int(os.environ.get('TRIPAY_POOL_SIZE') or os.environ.get('GUNICORN_THREADS') or '10')
+    TRIPAY_CONNECT_TIMEOUT = float(os.environ.get('TRIPAY_CONNECT_TIMEOUT', '3.05'))
+    TRIPAY_READ_TIMEOUT = float(os.environ.get('TRIPAY_READ_TIMEOUT', '15'))
+    
+    # Tripay circuit breaker
+    TRIPAY_BREAKER_FAILURE_RATE = float(os.environ.get('TRIPAY_BREAKER_FAILURE_RATE', '0.5'))
+    TRIPAY_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('TRIPAY_BREAKER_SLOW_CALL_SECONDS', '5'))
+    TRIPAY_BREAKER_SLOW_CALL_RATE = float(os.environ.get('TRIPAY_BREAKER_SLOW_CALL_RATE', '0.5'))
+    TRIPAY_BREAKER_MINIMUM_CALLS = int(os.environ.get('TRIPAY_BREAKER_MINIMUM_CALLS', '10'))
+    TRIPAY_BREAKER_WINDOW_SECONDS = int(os.environ.get('TRIPAY_BREAKER_WINDOW_SECONDS', '60'))
+    TRIPAY_BREAKER_OPEN_SECONDS = int(os.environ.get('TRIPAY_BREAKER_OPEN_SECONDS', '30'))
+    
+    # Payment channel catalog cache (seconds)
+    # Fresh for PAYMENT_CHANNELS_TTL, then served stale while a background
+    # refresh runs, and dropped after PAYMENT_CHANNELS_STALE_TTL
+    PAYMENT_CHANNELS_TTL = int(os.environ.get('PAYMENT_CHANNELS_TTL', '300'))
+    PAYMENT_CHANNELS_STALE_TTL = int(os.environ.get('PAYMENT_CHANNELS_STALE_TTL', '3600'))
+    PAYMENT_CHANNELS_LOCAL_TTL = int(os.environ.get('PAYMENT_CHANNELS_LOCAL_TTL', '5'))
+    
+    # Order pipeline
+    # When enabled, POST /api/orders answers 202 right after the order is stored
+    # and the Tripay transaction is created in the background.
+    # Clients can also opt in per request with "Prefer: respond-async".
+    ORDER_ASYNC_GATEWAY = os.environ.get('ORDER_ASYNC_GATEWAY', 'false').lower() == 'true'
+    # Orders stuck in pending_gateway longer than this are marked gateway_failed
+    ORDER_GATEWAY_STALE_MINUTES = int(os.environ.get('ORDER_GATEWAY_STALE_MINUTES', '15'))
+    
+    # Order status cache: Redis (invalidated on every status change) plus a
+    # short-lived per-process LRU in front of it
+    ORDER_STATUS_CACHE_TTL = int(os.environ.get('ORDER_STATUS_CACHE_TTL', '300'))
+    ORDER_STATUS_LOCAL_TTL = float(os.environ.get('ORDER_STATUS_LOCAL_TTL', '1'))
+    ORDER_STATUS_LOCAL_SIZE = int(os.environ.get('ORDER_STATUS_LOCAL_SIZE', '2048'))
+    
+    # Server-Sent Events for /api/orders/<order_id>/events
+    # Each open stream occupies a worker thread: run gunicorn with threads or
+    # gevent workers when enabling the stream in the frontend
+    ORDER_EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('ORDER_EVENTS_HEARTBEAT_SECONDS', '15'))
+    ORDER_EVENTS_MAX_SECONDS = int(os.environ.get('ORDER_EVENTS_MAX_SECONDS', '600'))
+    ORDER_EVENTS_RETRY_MS = int(os.environ.get('ORDER_EVENTS_RETRY_MS', '3000'))
+    
+    # Payment event inbox (Tripay callbacks are stored, then applied by workers)
+    PAYMENT_EVENT_MAX_ATTEMPTS = int(os.environ.get('PAYMENT_EVENT_MAX_ATTEMPTS', '5'))
+    PAYMENT_EVENTS_LOCK_TIMEOUT = int(os.environ.get('PAYMENT_EVENTS_LOCK_TIMEOUT', '120'))
+    PAYMENT_EVENTS_SWEEP_SECONDS = int(os.environ.get('PAYMENT_EVENTS_SWEEP_SECONDS', '60'))
+    
+    # Email outbox sender
+    EMAIL_OUTBOX_POLL_SECONDS = int(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', '10'))
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '100'))
+    EMAIL_OUTBOX_MAX_BATCHES = int(os.environ.get('EMAIL_OUTBOX_MAX_BATCHES', '10'))
+    EMAIL_SEND_LEASE_SECONDS = int(os.environ.get('EMAIL_SEND_LEASE_SECONDS', '120'))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '8'))
+    EMAIL_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_RETRY_BASE_SECONDS', '30'))
+    EMAIL_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_RETRY_MAX_SECONDS', '3600'))
+    # Requests per second per provider
+    EMAIL_RATE_LIMITS = {
+        'sendgrid': float(os.environ.get('SENDGRID_RATE_LIMIT', '10'))
+    }
+    
+    # Rows fetched per server-side cursor round trip by the order export
+    ORDER_EXPORT_BATCH_SIZE = int(os.environ.get('ORDER_EXPORT_BATCH_SIZE', '1000'))
+    
+    # Repeat checkouts for the same email+package reuse a pending Tripay transaction
+    ORDER_REUSE_ENABLED = os.environ.get('ORDER_REUSE_ENABLED', 'true').lower() == 'true'
+    ORDER_REUSE_WINDOW_MINUTES = int(os.environ.get('ORDER_REUSE_WINDOW_MINUTES', '60'))
+    # Do not hand out a transaction that expires sooner than this
+    ORDER_REUSE_MIN_REMAINING_MINUTES = int(os.environ.get('ORDER_REUSE_MIN_REMAINING_MINUTES', '10'))
+    
+    # merchant_ref generator: give each host/container its own worker id (0-65535);
+    # when unset one is derived from hostname and pid
+    MERCHANT_REF_WORKER_ID = int(os.environ['MERCHANT_REF_WORKER_ID']) if os.environ.get('MERCHANT_REF_WORKER_ID') else None
+    MERCHANT_REF_PREFIX = os.environ.get('MERCHANT_REF_PREFIX', 'INV')
+    
+    # Idempotency-Key handling for POST /api/orders
+    IDEMPOTENCY_WINDOW_SECONDS = int(os.environ.get('IDEMPOTENCY_WINDOW_SECONDS', '86400'))
+    # How long a retry waits for the first request with the same key
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', '35'))
+    # An in_progress key older than this is treated as abandoned
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', '90'))
+    
     # API Configuration
     API_BASE_URL = os.environ.get('API_BASE_URL', 'http://localhost:5000')
     TRIPAY_CALLBACK_PATH = os.environ.get('TRIPAY_CALLBACK_PATH', '/callback/tripay')
@@ -41,6 +122,7 @@ class Config:
     
     # Redis Configuration
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', '0.5'))
     
     # Celery Configuration
     CELERY_BROKER_URL = REDIS_URL
@@ -62,6 +144,11 @@ class Config:
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
     ADMIN_TELEGRAM_BOT_TOKEN = os.environ.get('ADMIN_TELEGRAM_BOT_TOKEN')
     ADMIN_TELEGRAM_CHAT_ID = os.environ.get('ADMIN_TELEGRAM_CHAT_ID')
+    # Notifications are buffered and sent as one digest per window or
+    # once ADMIN_DIGEST_MAX_EVENTS are waiting
+    ADMIN_DIGEST_WINDOW_SECONDS = int(os.environ.get('ADMIN_DIGEST_WINDOW_SECONDS', '300'))
+    ADMIN_DIGEST_MAX_EVENTS = int(os.environ.get('ADMIN_DIGEST_MAX_EVENTS', '50'))
+    ADMIN_DIGEST_CHECK_SECONDS = int(os.environ.get('ADMIN_DIGEST_CHECK_SECONDS', '30'))
     
     # Security
     WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
@@ -73,25 +160,84 @@ class Config:
     SELENIUM_HEADLESS = os.environ.get('SELENIUM_HEADLESS', 'true').lower() == 'true'
     SELENIUM_TIMEOUT = int(os.environ.get('SELENIUM_TIMEOUT', '30'))
     
+    # Lean browser profile: blocks fonts, images and analytics, turns off
+    # Chrome background services and shares one disk cache per host.
+    # Compare page_load and avg_rss_mb in /api/admin/browser-pool with it off.
+    SELENIUM_LEAN_PROFILE = os.environ.get('SELENIUM_LEAN_PROFILE', 'true').lower() == 'true'
+    SELENIUM_WINDOW_SIZE = os.environ.get('SELENIUM_WINDOW_SIZE', '1280,800')
+    SELENIUM_DISK_CACHE_DIR = os.environ.get('SELENIUM_DISK_CACHE_DIR', '/tmp/chrome-cache')
+    
+    # 'api' invites with one request to the workspace API using the logged-in
+    # browser's session and falls back to the members page if that fails;
+    # 'dom' always uses the members page
+    INVITER_MODE = os.environ.get('INVITER_MODE', 'api').lower()
+    # Workspace (account) id; discovered from the admin's accounts when unset
+    CHATGPT_WORKSPACE_ID = os.environ.get('CHATGPT_WORKSPACE_ID')
+    
+    # Total seconds each invite step may spend waiting (per-step durations
+    # are reported under 'steps' in /api/admin/browser-pool)
+    INVITER_STEP_BUDGETS = {
+        'setup': int(os.environ.get('INVITER_SETUP_BUDGET_SECONDS', '30')),
+        'login': int(os.environ.get('INVITER_LOGIN_BUDGET_SECONDS', '60')),
+        'api_invite': int(os.environ.get('INVITER_API_INVITE_BUDGET_SECONDS', '15')),
+        'navigate': int(os.environ.get('INVITER_NAVIGATE_BUDGET_SECONDS', '20')),
+        'invite': int(os.environ.get('INVITER_INVITE_BUDGET_SECONDS', '45'))
+    }
+    
+    # Logged-in browser pool (per worker process): a session is recycled
+    # after MAX_USES invitations, MAX_AGE_SECONDS, or once Chrome grew
+    # MAX_RSS_GROWTH_MB over its size right after login
+    SELENIUM_POOL_ENABLED = os.environ.get('SELENIUM_POOL_ENABLED', 'true').lower() == 'true'
+    SELENIUM_POOL_MAX_USES = int(os.environ.get('SELENIUM_POOL_MAX_USES', '50'))
+    SELENIUM_POOL_MAX_AGE_SECONDS = int(os.environ.get('SELENIUM_POOL_MAX_AGE_SECONDS', '3600'))
+    SELENIUM_POOL_MAX_RSS_GROWTH_MB = int(os.environ.get('SELENIUM_POOL_MAX_RSS_GROWTH_MB', '300'))
+    SELENIUM_POOL_MAX_SESSIONS = int(os.environ.get('SELENIUM_POOL_MAX_SESSIONS', '2'))
+    ADMIN_MAX_FAILED_ATTEMPTS = int(os.environ.get('ADMIN_MAX_FAILED_ATTEMPTS', '5'))
+    
+    # Invitation batching: paid orders wait up to INVITATION_BATCH_WINDOW_SECONDS
+    # so up to INVITATION_BATCH_MAX_SIZE emails go through one invite modal
+    INVITATION_BATCH_ENABLED = os.environ.get('INVITATION_BATCH_ENABLED', 'true').lower() == 'true'
+    INVITATION_BATCH_WINDOW_SECONDS = int(os.environ.get('INVITATION_BATCH_WINDOW_SECONDS', '20'))
+    INVITATION_BATCH_MAX_SIZE = int(os.environ.get('INVITATION_BATCH_MAX_SIZE', '10'))
+    
+    # Stored admin login sessions (cookies, Fernet-encrypted). The key
+    # defaults to one derived from SECRET_KEY; generate a dedicated one with
+    # Fernet.generate_key()
+    ADMIN_SESSION_KEY = os.environ.get('ADMIN_SESSION_KEY')
+    ADMIN_SESSION_MAX_AGE_SECONDS = int(os.environ.get('ADMIN_SESSION_MAX_AGE_SECONDS', '604800'))
+    
     # Rate Limiting
     RATELIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL') or 'redis://localhost:6379/1'
     
     # Celery Configuration
     ENABLE_CELERY = os.environ.get('ENABLE_CELERY', 'false').lower() == 'true'
     
-    # Package Configuration
+    # Package catalog cache: workers compare a Redis version counter every
+    # PACKAGE_CACHE_CHECK_SECONDS and reload when it moved; without Redis
+    # they reload every PACKAGE_CACHE_FALLBACK_TTL seconds
+    PACKAGE_CACHE_CHECK_SECONDS = float(os.environ.get('PACKAGE_CACHE_CHECK_SECONDS', '1'))
+    PACKAGE_CACHE_FALLBACK_TTL = int(os.environ.get('PACKAGE_CACHE_FALLBACK_TTL', '30'))
+    
+    # Browser caching of /api/packages (revalidated with a strong ETag)
+    PACKAGES_CACHE_MAX_AGE = int(os.environ.get('PACKAGES_CACHE_MAX_AGE', '300'))
+    PACKAGES_CACHE_STALE_AGE = int(os.environ.get('PACKAGES_CACHE_STALE_AGE', '86400'))
+    
+    # Default packages, seeded into the packages table by init_database.
+    # The table is the source of truth; edit it with manage_packages.py
     PACKAGES = {
         'chatgpt_plus_1_month': {
             'name': 'Individual Plan',
             'price': 25000,
             'duration': '1 Bulan',
-            'description': 'Akses GPT-4 Unlimited dengan email pribadi sebagai Member'
+            'description': 'Akses GPT-4 Unlimited dengan email pribadi sebagai Member',
+            'seats': 1
         },
         'team_package': {
             'name': 'Team Plan',
             'price': 95000,
             'duration': '1 Bulan',
-            'description': 'Sampai 5 akun tim sebagai Member dengan akses penuh'
+            'description': 'Sampai 5 akun tim sebagai Member dengan akses penuh',
+            'seats': 5
         }
     }
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Email outbox sender
+Delivers emails queued in the email_outbox table. Safe to run several
+instances (and alongside the Celery outbox task): rows are claimed with
+SKIP LOCKED leases.
+
+Run with: python email_sender.py
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db
+from utils.email_outbox import drain_email_outbox
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+running = True
+
+def stop(signum, frame):
+    global running
+    logger.info("Email sender stopping...")
+    running = False
+
+def main():
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    
+    with app.app_context():
+        poll_seconds = app.config.get('EMAIL_OUTBOX_POLL_SECONDS', 10)
+        logger.info(f"Email sender started (polling every {poll_seconds}s)")
+        
+        while running:
+            busy = False
+            try:
+                totals = drain_email_outbox()
+                busy = any(totals.values())
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Email sender error: {str(e)}")
+            finally:
+                # Give the connection back to the pool between polls
+                db.session.remove()
+            
+            if busy:
+                continue
+            
+            deadline = time.monotonic() + poll_seconds
+            while running and time.monotonic() < deadline:
+                time.sleep(0.5)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Order export script for reconciliation
+Streams orders joined with invitation logs to a file or stdout.
+
+Usage:
+  python export_orders.py --format csv --output orders.csv
+  python export_orders.py --format ndjson --gzip --output orders.ndjson.gz
+  python export_orders.py --payment-status paid --from 2025-01-01 --to 2025-02-01 > paid.csv
+"""
+
+import os
+import sys
+import argparse
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from utils.order_queries import parse_order_filters
+from utils.order_export import iter_export, EXPORT_FORMATS
+
+def main():
+    parser = argparse.ArgumentParser(description='Export orders with invitation logs')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--gzip', action='store_true', help='gzip the output')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--payment-status')
+    parser.add_argument('--invitation-status')
+    parser.add_argument('--package-id')
+    parser.add_argument('--from', dest='created_from', help='ISO date, inclusive')
+    parser.add_argument('--to', dest='created_to', help='ISO date, exclusive')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+    
+    app = create_app('production')
+    
+    with app.app_context():
+        filters = parse_order_filters({
+            'payment_status': args.payment_status,
+            'invitation_status': args.invitation_status,
+            'package_id': args.package_id,
+            'created_from': args.created_from,
+            'created_to': args.created_to
+        })
+        
+        chunks = iter_export(filters, export_format=args.format, compress=args.gzip, batch_size=args.batch_size)
+        
+        output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            written = 0
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if args.output:
+                output.close()
+        
+        print(f"Export completed: {written:,} bytes", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 from models import db, Order, InvitationLog, Package, AdminAccount
+from utils.package_catalog import bump_catalog_version
 
 def init_database():
     """Initialize database with tables and seed data"""
@@ -34,7 +35,8 @@ def init_database():
                     name=package_data['name'],
                     price=package_data['price'],
                     duration=package_data['duration'],
-                    description=package_data['description']
+                    description=package_data['description'],
+                    seats=package_data.get('seats', 1)
                 )
                 db.session.add(package)
                 print(f"Added package: {package_data['name']}")
@@ -63,6 +65,8 @@ def init_database():
                 print(f"Added admin account: {admin_data['email']}")
         
         db.session.commit()
+        # Workers with a cached package catalog reload it
+        bump_catalog_version()
         print("Database initialization completed successfully!")
         
         # Show summary
@@ -7,6 +7,8 @@ Usage:
   python manage_admins.py disable admin@example.com
   python manage_admins.py enable admin@example.com
   python manage_admins.py reset-failures admin@example.com
+  python manage_admins.py sessions
+  python manage_admins.py clear-session admin@example.com
 """
 
 import os
@@ -18,6 +20,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 from models import db, AdminAccount
+from automation.session_store import session_stats, delete_session
 
 def list_admins():
     """List all admin accounts"""
@@ -89,6 +92,29 @@ def reset_failures(email):
     
     print(f"Failure count reset for admin {email}.")
 
+def list_sessions():
+    """List stored login sessions with their age and restore hit rate"""
+    sessions = session_stats()
+    
+    if not sessions:
+        print("No stored sessions found.")
+        return
+    
+    print(f"{'Email':<30} {'Age (h)':<8} {'Restores':<10} {'Expired':<8} {'Logins':<7} {'Hit Rate':<8}")
+    print("-" * 80)
+    
+    for session in sessions:
+        age = f"{session['age_seconds'] / 3600:.1f}" if session['age_seconds'] is not None else '-'
+        hit_rate = f"{session['hit_rate']:.0%}" if session['hit_rate'] is not None else '-'
+        print(f"{session['admin_email']:<30} {age:<8} {session['restores']:<10} {session['restore_failures']:<8} {session['logins']:<7} {hit_rate:<8}")
+
+def clear_session(email):
+    """Forget the stored session so the next invite logs in again"""
+    if delete_session(email):
+        print(f"Stored session for {email} cleared.")
+    else:
+        print(f"No stored session for {email}.")
+
 def main():
     if len(sys.argv) < 2:
         print(__doc__)
@@ -121,6 +147,13 @@ def main():
                 print("Usage: python manage_admins.py reset-failures <email>")
                 return
             reset_failures(sys.argv[2])
+        elif command == 'sessions':
+            list_sessions()
+        elif command == 'clear-session':
+            if len(sys.argv) != 3:
+                print("Usage: python manage_admins.py clear-session <email>")
+                return
+            clear_session(sys.argv[2])
         else:
             print(f"Unknown command: {command}")
             print(__doc__)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Package catalog management script
+Changes take effect on every worker within a second, without a redeploy.
+
+Usage:
+  python manage_packages.py list
+  python manage_packages.py add team_package_3m "Team Plan 3 Bulan" 270000 "3 Bulan" "Deskripsi"
+  python manage_packages.py set-price team_package 99000
+  python manage_packages.py set-seats team_package 5
+  python manage_packages.py disable team_package
+  python manage_packages.py enable team_package
+"""
+
+import os
+import sys
+from decimal import Decimal, InvalidOperation
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db, Package
+from utils.package_catalog import bump_catalog_version
+
+def publish_change():
+    """Tell the running workers to reload the catalog"""
+    version = bump_catalog_version()
+    if version is None:
+        print("Warning: Redis unavailable, workers will reload within PACKAGE_CACHE_FALLBACK_TTL.")
+    else:
+        print(f"Package catalog version is now {version}.")
+
+def parse_price(value):
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    return price if price > 0 else None
+
+def list_packages():
+    """List all packages"""
+    packages = Package.query.order_by(Package.price, Package.id).all()
+    
+    if not packages:
+        print("No packages found.")
+        return
+    
+    print(f"{'ID':<28} {'Name':<24} {'Price':>10} {'Duration':<12} {'Seats':>5} {'Active':<8}")
+    print("-" * 92)
+    
+    for package in packages:
+        print(f"{package.id:<28} {package.name:<24} {int(package.price):>10} {package.duration:<12} {package.seats:>5} {'Yes' if package.is_active else 'No':<8}")
+
+def add_package(package_id, name, price, duration, description=None):
+    """Add new package"""
+    if Package.query.get(package_id):
+        print(f"Package {package_id} already exists.")
+        return
+    
+    amount = parse_price(price)
+    if amount is None:
+        print(f"Invalid price: {price}")
+        return
+    
+    package = Package(
+        id=package_id,
+        name=name,
+        price=amount,
+        duration=duration,
+        description=description,
+        is_active=True
+    )
+    
+    db.session.add(package)
+    db.session.commit()
+    
+    print(f"Package {package_id} added successfully.")
+    publish_change()
+
+def set_price(package_id, price):
+    """Change package price"""
+    package = Package.query.get(package_id)
+    if not package:
+        print(f"Package {package_id} not found.")
+        return
+    
+    amount = parse_price(price)
+    if amount is None:
+        print(f"Invalid price: {price}")
+        return
+    
+    package.price = amount
+    db.session.commit()
+    
+    print(f"Package {package_id} price set to {int(amount)}.")
+    publish_change()
+
+def set_seats(package_id, seats):
+    """Change how many member emails an order of the package may invite"""
+    package = Package.query.get(package_id)
+    if not package:
+        print(f"Package {package_id} not found.")
+        return
+    
+    if not seats.isdigit() or int(seats) < 1:
+        print(f"Invalid seats: {seats}")
+        return
+    
+    package.seats = int(seats)
+    db.session.commit()
+    
+    print(f"Package {package_id} seats set to {package.seats}.")
+    publish_change()
+
+def set_active(package_id, is_active):
+    """Enable or disable package"""
+    package = Package.query.get(package_id)
+    if not package:
+        print(f"Package {package_id} not found.")
+        return
+    
+    package.is_active = is_active
+    db.session.commit()
+    
+    print(f"Package {package_id} {'enabled' if is_active else 'disabled'}.")
+    publish_change()
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    
+    app = create_app('production')
+    
+    with app.app_context():
+        command = sys.argv[1].lower()
+        
+        if command == 'list':
+            list_packages()
+        elif command == 'add':
+            if len(sys.argv) not in (6, 7):
+                print("Usage: python manage_packages.py add <id> <name> <price> <duration> [description]")
+                return
+            add_package(*sys.argv[2:])
+        elif command == 'set-price':
+            if len(sys.argv) != 4:
+                print("Usage: python manage_packages.py set-price <id> <price>")
+                return
+            set_price(sys.argv[2], sys.argv[3])
+        elif command == 'set-seats':
+            if len(sys.argv) != 4:
+                print("Usage: python manage_packages.py set-seats <id> <seats>")
+                return
+            set_seats(sys.argv[2], sys.argv[3])
+        elif command == 'disable':
+            if len(sys.argv) != 3:
+                print("Usage: python manage_packages.py disable <id>")
+                return
+            set_active(sys.argv[2], False)
+        elif command == 'enable':
+            if len(sys.argv) != 3:
+                print("Usage: python manage_packages.py enable <id>")
+                return
+            set_active(sys.argv[2], True)
+        else:
+            print(f"Unknown command: {command}")
+            print(__doc__)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -19,11 +19,25 @@ class Order(db.Model):
     checkout_url = db.Column(db.String(512), nullable=True)
     payment_method = db.Column(db.String(64), nullable=True)
     reference = db.Column(db.String(128), nullable=True, index=True)
+    qr_string = db.Column(db.Text, nullable=True)
+    expired_at = db.Column(db.DateTime, nullable=True)  # Tripay expired_time of the transaction
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Lookup of a reusable pending transaction for repeat checkouts
+        db.Index('ix_orders_reuse_lookup', 'customer_email', 'package_id', 'payment_status', 'created_at'),
+        # Keyset pagination of the admin order list, unfiltered and per filter
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_payment_status_created_at_id', 'payment_status', 'created_at', 'id'),
+        db.Index('ix_orders_invitation_status_created_at_id', 'invitation_status', 'created_at', 'id'),
+        db.Index('ix_orders_package_id_created_at_id', 'package_id', 'created_at', 'id'),
+    )
+    
     # Relationship
     invitation_logs = db.relationship('InvitationLog', backref='order', lazy=True, cascade='all, delete-orphan')
+    members = db.relationship('OrderMember', backref='order', lazy=True, cascade='all, delete-orphan',
+                              order_by='OrderMember.id')
     
     def __repr__(self):
         return f'<Order {self.order_id}>'
@@ -42,10 +56,38 @@ class Order(db.Model):
             'checkout_url': self.checkout_url,
             'payment_method': self.payment_method,
             'reference': self.reference,
+            'qr_string': self.qr_string,
+            'expired_at': self.expired_at.isoformat() if self.expired_at else None,
+            'members': [member.to_dict() for member in self.members],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class OrderMember(db.Model):
+    __tablename__ = 'order_members'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
+    email = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(50), nullable=False, default='pending')  # 'pending', 'sent', 'failed'
+    error_message = db.Column(db.Text, nullable=True)
+    invited_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint('order_id', 'email', name='uq_order_members_order_email'),
+    )
+    
+    def __repr__(self):
+        return f'<OrderMember {self.email} - Order {self.order_id}>'
+    
+    def to_dict(self):
+        return {
+            'email': self.email,
+            'status': self.status,
+            'error_message': self.error_message,
+            'invited_at': self.invited_at.isoformat() if self.invited_at else None
+        }
+
 class InvitationLog(db.Model):
     __tablename__ = 'invitation_logs'
     
@@ -79,6 +121,7 @@ class Package(db.Model):
     price = db.Column(db.Numeric(10, 2), nullable=False)
     duration = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text, nullable=True)
+    seats = db.Column(db.Integer, nullable=False, default=1)  # member emails an order may invite
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
@@ -92,6 +135,7 @@ class Package(db.Model):
             'price': float(self.price),
             'duration': self.duration,
             'description': self.description,
+            'seats': self.seats,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -118,4 +162,100 @@ class AdminAccount(db.Model):
             'last_used': self.last_used.isoformat() if self.last_used else None,
             'failed_attempts': self.failed_attempts,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+class AdminSession(db.Model):
+    __tablename__ = 'admin_sessions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Keyed by email so the CHATGPT_ADMIN_EMAIL fallback account is covered too
+    admin_email = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey('admin_accounts.id', ondelete='CASCADE'), nullable=True)
+    cookies = db.Column(db.Text, nullable=False)  # Fernet token of the JSON cookie list
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_verified_at = db.Column(db.DateTime, nullable=True)
+    restores = db.Column(db.Integer, nullable=False, default=0)
+    restore_failures = db.Column(db.Integer, nullable=False, default=0)
+    logins = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<AdminSession {self.admin_email}>'
+    
+    def to_dict(self):
+        attempts = self.restores + self.restore_failures
+        return {
+            'admin_email': self.admin_email,
+            'age_seconds': int((datetime.utcnow() - self.created_at).total_seconds()) if self.created_at else None,
+            'last_verified_at': self.last_verified_at.isoformat() if self.last_verified_at else None,
+            'restores': self.restores,
+            'restore_failures': self.restore_failures,
+            'logins': self.logins,
+            'hit_rate': round(self.restores / attempts, 3) if attempts else None
+        }
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='in_progress')  # 'in_progress', 'completed'
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key} - {self.status}>'
+
+class PaymentEvent(db.Model):
+    """Webhook inbox: raw Tripay callbacks, stored before they are processed"""
+    __tablename__ = 'payment_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    merchant_ref = db.Column(db.String(50), nullable=False)
+    reference = db.Column(db.String(128), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # Tripay status: PAID, EXPIRED, FAILED, UNPAID
+    payload = db.Column(db.Text, nullable=False)  # Raw callback body
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    __table_args__ = (
+        # Tripay retries and concurrent deliveries of the same event collapse here
+        db.UniqueConstraint('reference', 'status', name='uq_payment_events_reference_status'),
+        # Per-order drain in arrival order
+        db.Index('ix_payment_events_merchant_ref_id', 'merchant_ref', 'id'),
+        # Sweep of events not processed yet
+        db.Index('ix_payment_events_processed_at_id', 'processed_at', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<PaymentEvent {self.merchant_ref} {self.status}>'
+
+class EmailOutbox(db.Model):
+    """Outgoing email, written in the same transaction as the change it announces"""
+    __tablename__ = 'email_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)  # 'payment_confirmation', 'invitation_confirmation', 'admin_notification'
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True)
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    text_content = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Sender claim: due rows, oldest first
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} {self.category} - {self.status}>'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Payment event replay script
+Re-applies stored Tripay callbacks received in a time range, e.g. after an
+incident left orders out of sync. Events are re-run per order in arrival order.
+
+Usage:
+  python replay_payment_events.py --from 2025-01-01T10:00 --to 2025-01-01T12:00
+  python replay_payment_events.py --from 2025-01-01 --to 2025-01-02 --merchant-ref INV-...
+  python replay_payment_events.py --from 2025-01-01 --to 2025-01-02 --dry-run
+  python replay_payment_events.py --pending
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import PaymentEvent
+from utils.payment_events import reset_payment_events, process_payment_events, drain_payment_events
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay stored Tripay payment events')
+    parser.add_argument('--from', dest='received_from', type=datetime.fromisoformat, help='ISO date, inclusive')
+    parser.add_argument('--to', dest='received_to', type=datetime.fromisoformat, help='ISO date, exclusive')
+    parser.add_argument('--merchant-ref', help='Only replay events of this order')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would be replayed')
+    parser.add_argument('--pending', action='store_true', help='Only process events not processed yet')
+    args = parser.parse_args()
+    
+    app = create_app('production')
+    
+    with app.app_context():
+        if args.pending:
+            processed = drain_payment_events(limit=10000)
+            print(f"Processed {processed} pending events.")
+            return
+        
+        if not args.received_from or not args.received_to:
+            parser.error('--from and --to are required unless --pending is given')
+        
+        if args.dry_run:
+            query = PaymentEvent.query.filter(
+                PaymentEvent.received_at >= args.received_from,
+                PaymentEvent.received_at < args.received_to
+            )
+            if args.merchant_ref:
+                query = query.filter(PaymentEvent.merchant_ref == args.merchant_ref)
+            
+            for event in query.order_by(PaymentEvent.id).all():
+                processed_at = event.processed_at.strftime('%Y-%m-%d %H:%M:%S') if event.processed_at else 'pending'
+                print(f"{event.id:<8} {event.received_at:%Y-%m-%d %H:%M:%S}  {event.merchant_ref:<32} {event.status:<8} {processed_at:<20} {event.last_error or ''}")
+            return
+        
+        merchant_refs = reset_payment_events(args.received_from, args.received_to, args.merchant_ref)
+        print(f"Replaying events of {len(merchant_refs)} orders...")
+        
+        total = 0
+        for merchant_ref in merchant_refs:
+            processed = process_payment_events(merchant_ref)
+            total += processed
+            print(f"{merchant_ref}: {processed} events")
+        
+        print(f"Replay completed: {total} events processed.")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -5,8 +5,21 @@ from celery import Celery
 from celery import shared_task
 from flask import current_app
 from models import db, Order, InvitationLog
+from celery.signals import worker_process_init, worker_process_shutdown
 from automation.chatgpt_inviter import create_inviter
-from utils.email_service import send_invitation_confirmation, send_admin_notification
+from automation.browser_pool import process_invitations_pooled, shutdown_browser_pool
+from automation.driver_manager import warm_up_driver
+from utils.email_service import queue_invitation_confirmation
+from utils.admin_notifier import notify_admin, flush_admin_notifications
+from utils.email_outbox import drain_email_outbox, wake_email_sender
+from utils.order_pipeline import request_payment, PENDING_GATEWAY, GATEWAY_FAILED
+from utils.order_state import transition_payment_status
+from utils.payment_channels import refresh_payment_channels
+from utils.idempotency import purge_expired_keys
+from utils.status_cache import invalidate_order_status
+from utils.payment_events import process_payment_events, drain_payment_events
+from utils.invitation_batcher import flush_invitation_batch
+from utils.order_members import pending_member_emails, record_member_results
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -62,6 +75,7 @@ def process_invitation_task(self, order_id):
         # Update invitation status to processing
         order.invitation_status = 'processing'
         db.session.commit()
+        invalidate_order_status(order.order_id)
         
         # Create invitation log entry
         log_entry = InvitationLog(
@@ -75,14 +89,23 @@ def process_invitation_task(self, order_id):
         # Get configuration
         team_url = current_app.config.get('CHATGPT_ADMIN_URL', 'https://chatgpt.com/admin?tab=members')
         
-        # Create inviter instance
-        inviter = create_inviter(
-            headless=current_app.config.get('SELENIUM_HEADLESS', True),
-            timeout=current_app.config.get('SELENIUM_TIMEOUT', 30)
-        )
+        # Invite every member not invited yet in one browser session,
+        # reusing a logged-in browser when pooling is on
+        member_emails = pending_member_emails(order)
+        if current_app.config.get('SELENIUM_POOL_ENABLED', True):
+            results = process_invitations_pooled(member_emails, team_url=team_url)
+        else:
+            inviter = create_inviter(
+                headless=current_app.config.get('SELENIUM_HEADLESS', True),
+                timeout=current_app.config.get('SELENIUM_TIMEOUT', 30),
+                step_budgets=current_app.config.get('INVITER_STEP_BUDGETS'),
+                mode=current_app.config.get('INVITER_MODE', 'api'),
+                workspace_id=current_app.config.get('CHATGPT_WORKSPACE_ID')
+            )
+            results = inviter.process_invitations(member_emails, team_url=team_url)
         
-        # Process invitation
-        success = inviter.process_invitation(member_email=order.customer_email, team_url=team_url)
+        # Members invited now stay invited; a retry only covers the rest
+        success = record_member_results(order, results, error_message="Invitation not confirmed")
         
         if success:
             # Update order status
@@ -92,14 +115,13 @@ def process_invitation_task(self, order_id):
             # Update log
             log_entry.status = 'success'
             
-            db.session.commit()
+            # Confirmation email to customer, committed with the status
+            queue_invitation_confirmation(order)
             
-            # Send confirmation email to customer
-            try:
-                send_invitation_confirmation(order)
-                logger.info(f"Confirmation email sent to {order.customer_email}")
-            except Exception as e:
-                logger.error(f"Failed to send confirmation email: {str(e)}")
+            db.session.commit()
+            invalidate_order_status(order.order_id)
+            wake_email_sender()
+            logger.info(f"Confirmation email queued for {order.customer_email}")
             
             logger.info(f"Invitation process completed successfully for order {order_id}")
             return {
@@ -110,7 +132,8 @@ def process_invitation_task(self, order_id):
         
         else:
             # Invitation failed, determine if we should retry
-            error_msg = f"Invitation failed for order {order_id}"
+            failed_emails = [email for email, invited in results.items() if not invited]
+            error_msg = f"Invitation failed for order {order_id}: {', '.join(failed_emails)}"
             logger.error(error_msg)
             
             # Update log
@@ -129,16 +152,15 @@ def process_invitation_task(self, order_id):
                 # Max retries reached, mark as failed
                 order.invitation_status = 'manual_review_required'
                 db.session.commit()
+                invalidate_order_status(order.order_id)
                 
-                # Send admin notification
-                try:
-                    send_admin_notification(
-                        subject=f"Manual Review Required - Order {order.order_id}",
-                        message=f"Invitation failed for order {order.order_id} after {self.max_retries} retries. Customer email: {order.customer_email}",
-                        order=order
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send admin notification: {str(e)}")
+                # Buffered: a run of failures becomes one digest
+                notify_admin(
+                    'invitation_failed',
+                    subject="Manual Review Required",
+                    message=f"Invitation failed after {self.max_retries} retries. Last: order {order.order_id}, customer {order.customer_email}",
+                    order=order
+                )
                 
                 return {
                     'success': False,
@@ -163,6 +185,7 @@ def process_invitation_task(self, order_id):
                 )
                 db.session.add(log_entry)
                 db.session.commit()
+                invalidate_order_status(order.order_id)
         except Exception as db_error:
             logger.error(f"Failed to update database after error: {str(db_error)}")
         
@@ -173,6 +196,23 @@ def process_invitation_task(self, order_id):
         
         return {'success': False, 'error': str(e)}
 
+@shared_task(bind=True, max_retries=0)
+def create_payment_task(self, merchant_ref, payment_data, payment_method):
+    """
+    Create the Tripay transaction for an order accepted with 202
+
+    The order is already committed as pending_gateway; the result is applied
+    with a conditional update so clients polling the status endpoint pick up
+    checkout_url/qr_string as soon as it lands.
+    """
+    logger.info(f"Creating payment transaction for order {merchant_ref}")
+    payment_result = request_payment(merchant_ref, payment_data, payment_method)
+    return {
+        'success': payment_result.get('success', False),
+        'order_id': merchant_ref,
+        'error': payment_result.get('error')
+    }
+
 @shared_task
 def cleanup_expired_orders():
     """Clean up expired orders and update their status"""
@@ -181,21 +221,41 @@ def cleanup_expired_orders():
         
         # Find orders that are pending payment for more than 24 hours
         cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        expired_orders = Order.query.filter(
-            Order.payment_status == 'pending',
-            Order.created_at < cutoff_time
-        ).all()
+        # ...or whose Tripay transaction has already expired. Conditional
+        # updates, so a payment confirmed meanwhile is never overwritten
+        expired_orders = transition_payment_status(
+            'expired',
+            db.or_(
+                Order.created_at < cutoff_time,
+                Order.expired_at < datetime.utcnow()
+            )
+        )
         
         for order in expired_orders:
-            order.payment_status = 'expired'
-            order.updated_at = datetime.utcnow()
-            
             logger.info(f"Marked order {order.order_id} as expired")
         
+        # Orders whose gateway call never completed (worker died mid-request)
+        stale_cutoff = datetime.utcnow() - timedelta(
+            minutes=current_app.config.get('ORDER_GATEWAY_STALE_MINUTES', 15)
+        )
+        stale_orders = transition_payment_status(GATEWAY_FAILED, Order.created_at < stale_cutoff)
+        
         db.session.commit()
-        logger.info(f"Cleanup completed. {len(expired_orders)} orders marked as expired")
+        stale_count = len(stale_orders)
         
-        return {'success': True, 'expired_count': len(expired_orders)}
+        for order in expired_orders + stale_orders:
+            invalidate_order_status(order.order_id)
+        logger.info(f"Cleanup completed. {len(expired_orders)} orders marked as expired, {stale_count} stuck in {PENDING_GATEWAY}")
+        
+        purged_keys = purge_expired_keys()
+        logger.info(f"Purged {purged_keys} expired idempotency keys")
+        
+        return {
+            'success': True,
+            'expired_count': len(expired_orders),
+            'gateway_failed_count': stale_count,
+            'purged_idempotency_keys': purged_keys
+        }
         
     except Exception as e:
         logger.error(f"Error during cleanup: {str(e)}")
@@ -233,6 +293,47 @@ def retry_failed_invitations():
         logger.error(f"Error during retry process: {str(e)}")
         return {'success': False, 'error': str(e)}
 
+@shared_task
+def process_payment_events_task(merchant_ref):
+    """Apply the stored Tripay callbacks of one order, in arrival order"""
+    processed = process_payment_events(merchant_ref)
+    return {'success': True, 'order_id': merchant_ref, 'processed': processed}
+
+@shared_task
+def drain_payment_events_task():
+    """Retry payment events whose immediate processing was lost or failed"""
+    processed = drain_payment_events()
+    if processed:
+        logger.info(f"Payment event sweep processed {processed} events")
+    return {'success': True, 'processed': processed}
+
+@shared_task
+def send_email_outbox_task():
+    """Deliver due emails from the outbox"""
+    totals = drain_email_outbox()
+    return {'success': True, **totals}
+
+@shared_task
+def flush_admin_notifications_task():
+    """Deliver buffered admin notifications as a digest once their window is over"""
+    result = flush_admin_notifications()
+    return {'success': True, **result}
+
+@shared_task
+def flush_invitation_batch_task(force=False):
+    """Invite queued paid orders in batches once their window is over or a batch is full"""
+    result = flush_invitation_batch(force=force)
+    if result['orders'] >= current_app.config.get('INVITATION_BATCH_MAX_SIZE', 10):
+        # More may be waiting behind a full batch
+        flush_invitation_batch_task.delay()
+    return {'success': True, **result}
+
+@shared_task
+def refresh_payment_channels_task():
+    """Keep the cached payment channel catalog warm"""
+    refreshed = refresh_payment_channels()
+    return {'success': refreshed}
+
 # Periodic tasks configuration
 def setup_periodic_tasks(sender, **kwargs):
     """Setup periodic tasks - only if Celery is enabled"""
@@ -246,6 +347,41 @@ def setup_periodic_tasks(sender, **kwargs):
         name='cleanup expired orders'
     )
     
+    # Refresh payment channels before the cached catalog goes stale
+    sender.add_periodic_task(
+        float(max(current_app.config.get('PAYMENT_CHANNELS_TTL', 300) // 2, 30)),
+        refresh_payment_channels_task.s(),
+        name='refresh payment channels'
+    )
+    
+    # Sweep the payment event inbox
+    sender.add_periodic_task(
+        float(current_app.config.get('PAYMENT_EVENTS_SWEEP_SECONDS', 60)),
+        drain_payment_events_task.s(),
+        name='drain payment events'
+    )
+    
+    # Poll the email outbox (new rows also wake the sender directly)
+    sender.add_periodic_task(
+        float(current_app.config.get('EMAIL_OUTBOX_POLL_SECONDS', 10)),
+        send_email_outbox_task.s(),
+        name='send email outbox'
+    )
+    
+    # Close admin notification digest windows
+    sender.add_periodic_task(
+        float(current_app.config.get('ADMIN_DIGEST_CHECK_SECONDS', 30)),
+        flush_admin_notifications_task.s(),
+        name='flush admin notifications'
+    )
+    
+    # Pick up queued invitations whose scheduled flush was lost
+    sender.add_periodic_task(
+        float(current_app.config.get('INVITATION_BATCH_WINDOW_SECONDS', 20)),
+        flush_invitation_batch_task.s(),
+        name='flush invitation batch'
+    )
+    
     # Retry failed invitations every 2 hours
     sender.add_periodic_task(
         7200.0,  # 2 hours
@@ -253,6 +389,16 @@ def setup_periodic_tasks(sender, **kwargs):
         name='retry failed invitations'
     )
 
+@worker_process_init.connect
+def resolve_chromedriver(**kwargs):
+    """Resolve ChromeDriver once per worker process, before the first invite"""
+    warm_up_driver()
+
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs):
+    """Quit pooled Chrome instances when a worker process exits"""
+    shutdown_browser_pool()
+
 # Only register if Celery is enabled
 try:
     from flask import current_app
@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.pool import QueuePool
+from config import config, TestingConfig
+from app import create_app
+from models import db, Order
+
+class PooledTestingConfig(TestingConfig):
+    # A file database with a real pool, so checked-out connections are
+    # counted and several threads can hold their own sessions
+    SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': QueuePool, 'pool_size': 4, 'max_overflow': 0}
+    REDIS_URL = None
+    RATELIMIT_STORAGE_URL = 'memory://'
+    ORDER_EVENTS_HEARTBEAT_SECONDS = 0
+    ORDER_STATUS_LOCAL_TTL = 0
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(PooledTestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setitem(config, 'pooled_testing', PooledTestingConfig)
+    app = create_app('pooled_testing')
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+    return app
+
+@pytest.fixture
+def make_order(app):
+    """Insert an order and return its order_id"""
+    def make(order_id, payment_status='pending', **values):
+        with app.app_context():
+            db.session.add(Order(
+                order_id=order_id,
+                customer_email=values.pop('customer_email', 'buyer@example.com'),
+                package_id=values.pop('package_id', 'team_package'),
+                amount=values.pop('amount', 100000),
+                payment_status=payment_status,
+                **values
+            ))
+            db.session.commit()
+            db.session.remove()
+        return order_id
+    return make
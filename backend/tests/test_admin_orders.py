@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta
+
+def test_page_parameter_is_rejected(app):
+    response = app.test_client().get('/api/admin/orders?page=2')
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['error']
+
+def test_cursor_pages_with_an_exact_total_where_estimates_are_unavailable(app, make_order):
+    now = datetime.utcnow()
+    for i in range(5):
+        make_order(f'ORD-{i}', created_at=now - timedelta(minutes=i))
+
+    client = app.test_client()
+    first = client.get('/api/admin/orders?per_page=3').get_json()
+    assert [order['order_id'] for order in first['orders']] == ['ORD-0', 'ORD-1', 'ORD-2']
+    assert first['has_more']
+    # SQLite has no planner estimate, so the total is counted
+    assert first['total'] == 5
+    assert first['total_is_estimate'] is False
+
+    second = client.get(f"/api/admin/orders?per_page=3&cursor={first['next_cursor']}").get_json()
+    assert [order['order_id'] for order in second['orders']] == ['ORD-3', 'ORD-4']
+    assert not second['has_more']
+    assert second['next_cursor'] is None
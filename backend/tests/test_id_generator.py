@@ -0,0 +1,48 @@
+import os
+import pytest
+from models import Order
+from utils.id_generator import MerchantRefGenerator, generate_merchant_ref, merchant_ref_timestamp
+
+def test_ids_are_monotonic_and_unique():
+    generator = MerchantRefGenerator(worker_id=1)
+    refs = [generator.generate() for _ in range(20000)]
+    assert refs == sorted(refs)
+    assert len(set(refs)) == len(refs)
+
+def test_ids_fit_the_order_id_column():
+    ref = MerchantRefGenerator(worker_id=0xFFFF, prefix='INV').generate()
+    assert len(ref) <= Order.order_id.type.length == 50
+    assert merchant_ref_timestamp(ref) > 0
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_ids_are_unique_across_forked_workers(app):
+    # Every worker shares one configured worker id, as a preloaded gunicorn
+    # parent would hand it down, so only the per-process reseed separates them
+    app.config['MERCHANT_REF_WORKER_ID'] = 7
+    with app.app_context():
+        parent_refs = [generate_merchant_ref() for _ in range(1000)]
+
+        pipes = []
+        for _ in range(4):
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                refs = '\n'.join(generate_merchant_ref() for _ in range(1000))
+                os.write(write_fd, refs.encode('ascii'))
+                os._exit(0)
+            os.close(write_fd)
+            pipes.append((pid, read_fd))
+
+        child_refs = []
+        for pid, read_fd in pipes:
+            with os.fdopen(read_fd, 'rb') as reader:
+                refs = reader.read().decode('ascii').split('\n')
+            os.waitpid(pid, 0)
+            assert refs == sorted(refs)
+            child_refs.extend(refs)
+
+    all_refs = parent_refs + child_refs
+    assert len(all_refs) == 5000
+    assert len(set(all_refs)) == len(all_refs)
+    assert max(len(ref) for ref in all_refs) <= 50
@@ -0,0 +1,78 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from flask import jsonify, request
+from utils.idempotency import idempotent, IDEMPOTENCY_HEADER
+
+@pytest.fixture
+def view(app):
+    """Register an idempotent endpoint that records each run of the view"""
+    calls = []
+    started = threading.Event()
+    proceed = threading.Event()
+    proceed.set()
+
+    @idempotent
+    def create():
+        calls.append(request.get_json())
+        started.set()
+        proceed.wait(5)
+        status = request.get_json().get('status', 201)
+        return jsonify({'run': len(calls)}), status
+
+    app.add_url_rule('/test/idempotent', 'test_idempotent', create, methods=['POST'])
+    return SimpleNamespace(calls=calls, started=started, proceed=proceed)
+
+def post(client, key, body):
+    return client.post('/test/idempotent', json=body, headers={IDEMPOTENCY_HEADER: key})
+
+def test_replay_returns_the_stored_response(app, view):
+    client = app.test_client()
+    first = post(client, 'key-1', {'email': 'a@example.com'})
+    second = post(client, 'key-1', {'email': 'a@example.com'})
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json() == {'run': 1}
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert len(view.calls) == 1
+
+def test_same_key_with_a_different_body_is_rejected(app, view):
+    client = app.test_client()
+    post(client, 'key-2', {'email': 'a@example.com'})
+    response = post(client, 'key-2', {'email': 'b@example.com'})
+
+    assert response.status_code == 422
+    assert len(view.calls) == 1
+
+def test_server_error_releases_the_key(app, view):
+    client = app.test_client()
+    assert post(client, 'key-3', {'status': 502}).status_code == 502
+    retry = post(client, 'key-3', {'status': 502})
+
+    assert 'Idempotent-Replayed' not in retry.headers
+    assert len(view.calls) == 2
+
+def test_concurrent_retry_waits_for_the_first_request(app, view):
+    app.config['IDEMPOTENCY_POLL_INTERVAL'] = 0.02
+    view.proceed.clear()
+    responses = {}
+
+    def send(name):
+        responses[name] = post(app.test_client(), 'key-4', {'email': 'a@example.com'})
+
+    first = threading.Thread(target=send, args=('first',))
+    first.start()
+    assert view.started.wait(5)
+
+    retry = threading.Thread(target=send, args=('retry',))
+    retry.start()
+    time.sleep(0.1)
+    view.proceed.set()
+    first.join()
+    retry.join()
+
+    assert len(view.calls) == 1
+    assert responses['retry'].status_code == 201
+    assert responses['retry'].get_json() == responses['first'].get_json()
+    assert responses['retry'].headers['Idempotent-Replayed'] == 'true'
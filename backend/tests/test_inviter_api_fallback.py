@@ -0,0 +1,27 @@
+from automation.chatgpt_inviter import ChatGPTTeamInviter
+
+class FakeWorkspaceClient:
+    def __init__(self):
+        self.invited = []
+        self.timeout = None
+
+    def invite(self, emails):
+        self.invited.extend(emails)
+        return {email: True for email in emails}
+
+    def close(self):
+        pass
+
+def test_api_budget_exhausted_falls_back_to_members_page(monkeypatch):
+    inviter = ChatGPTTeamInviter(mode='api', step_budgets={'api_invite': 0})
+    client = FakeWorkspaceClient()
+    calls = []
+    monkeypatch.setattr(inviter, '_get_api_client', lambda: client)
+    monkeypatch.setattr(inviter, 'navigate_to_team_management', lambda team_url: calls.append('navigate') or True)
+    monkeypatch.setattr(inviter, 'invite_members', lambda emails: calls.append('invite') or {email: True for email in emails})
+
+    results = inviter.send_invitations(['a@example.com', 'b@example.com'], 'https://chatgpt.com/admin?tab=members')
+
+    assert results == {'a@example.com': True, 'b@example.com': True}
+    assert calls == ['navigate', 'invite']
+    assert client.invited == []
@@ -0,0 +1,19 @@
+from models import db
+
+def test_open_stream_holds_no_pooled_connection(app, make_order):
+    make_order('ORD-EVENTS-1')
+    response = app.test_client().get('/api/orders/ORD-EVENTS-1/events')
+    assert response.status_code == 200
+    chunks = iter(response.response)
+    try:
+        assert next(chunks).startswith(b'retry:')
+        assert b'event: status' in next(chunks)
+        with app.app_context():
+            assert db.engine.pool.checkedout() == 0
+
+        # Heartbeat re-check of the status (Redis is off, so it reads the DB)
+        assert next(chunks) == b': keep-alive\n\n'
+        with app.app_context():
+            assert db.engine.pool.checkedout() == 0
+    finally:
+        response.close()
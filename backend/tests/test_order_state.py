@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from models import db, Order
+from utils.order_state import transition_order, transition_payment_status, PENDING_GATEWAY, GATEWAY_FAILED
+
+@pytest.fixture(params=['returning', 'per_id'])
+def dialect_path(request, app, monkeypatch):
+    """Run each test through UPDATE ... RETURNING and the MySQL per-id fallback"""
+    if request.param == 'per_id':
+        with app.app_context():
+            monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+    return request.param
+
+def status_of(app, order_id):
+    with app.app_context():
+        status = db.session.query(Order.payment_status).filter_by(order_id=order_id).scalar()
+        db.session.remove()
+        return status
+
+def test_allowed_transition_moves_the_order(app, make_order, dialect_path):
+    make_order('ORD-1', payment_status=PENDING_GATEWAY)
+    with app.app_context():
+        moved = transition_order('ORD-1', 'pending', reference='T-1')
+        db.session.commit()
+        assert moved.order_id == 'ORD-1'
+        assert Order.query.filter_by(order_id='ORD-1').one().reference == 'T-1'
+    assert status_of(app, 'ORD-1') == 'pending'
+
+def test_disallowed_transition_returns_no_rows(app, make_order, dialect_path):
+    make_order('ORD-2', payment_status='paid')
+    with app.app_context():
+        assert transition_payment_status('expired', Order.order_id == 'ORD-2') == []
+        assert transition_order('ORD-2', 'pending') is None
+        db.session.commit()
+    assert status_of(app, 'ORD-2') == 'paid'
+
+def test_unknown_status_is_rejected(app):
+    with app.app_context():
+        with pytest.raises(ValueError):
+            transition_order('ORD-X', 'refunded')
+
+def test_concurrent_double_transition_has_one_winner(app, make_order, dialect_path):
+    make_order('ORD-3')
+    barrier = threading.Barrier(2)
+    results = []
+
+    def pay():
+        with app.app_context():
+            barrier.wait()
+            moved = transition_order('ORD-3', 'paid', invitation_status='processing')
+            db.session.commit()
+            results.append(moved)
+            db.session.remove()
+
+    threads = [threading.Thread(target=pay) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len([moved for moved in results if moved is not None]) == 1
+    assert status_of(app, 'ORD-3') == 'paid'
+
+def test_cleanup_expires_pending_and_fails_stale_gateway_orders(app, make_order, dialect_path):
+    from tasks import cleanup_expired_orders
+
+    now = datetime.utcnow()
+    make_order('ORD-OLD', created_at=now - timedelta(hours=25))
+    make_order('ORD-LAPSED', expired_at=now - timedelta(minutes=1))
+    make_order('ORD-FRESH', expired_at=now + timedelta(hours=1))
+    make_order('ORD-STALE', payment_status=PENDING_GATEWAY, created_at=now - timedelta(hours=1))
+    make_order('ORD-PAID', payment_status='paid', created_at=now - timedelta(hours=25))
+
+    with app.app_context():
+        result = cleanup_expired_orders()
+        db.session.remove()
+
+    assert result['success']
+    assert result['expired_count'] == 2
+    assert result['gateway_failed_count'] == 1
+    assert status_of(app, 'ORD-OLD') == 'expired'
+    assert status_of(app, 'ORD-LAPSED') == 'expired'
+    assert status_of(app, 'ORD-FRESH') == 'pending'
+    assert status_of(app, 'ORD-STALE') == GATEWAY_FAILED
+    assert status_of(app, 'ORD-PAID') == 'paid'
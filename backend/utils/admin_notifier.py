@@ -0,0 +1,237 @@
+import json
+import time
+import logging
+import requests
+from datetime import datetime
+from flask import current_app
+from models import db
+from utils.redis_client import get_redis
+from utils.background import run_in_background
+from utils.email_service import queue_email, queue_admin_notification
+from utils.email_outbox import wake_email_sender
+from utils.email_templates import render_email
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'admin_notifications:buffer'
+WINDOW_KEY = 'admin_notifications:window_start'
+FLUSH_LOCK_KEY = 'admin_notifications:flush_lock'
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_LENGTH = 4096
+
+def notify_admin(kind, subject, message, order=None):
+    """
+    Buffer an admin notification for the next digest
+
+    Events are appended to a Redis list and delivered together once the
+    window (ADMIN_DIGEST_WINDOW_SECONDS) has passed or ADMIN_DIGEST_MAX_EVENTS
+    are buffered, so an alert storm costs one message per channel per
+    window. Without Redis the notification is queued as an email directly.
+
+    Args:
+        kind (str): Event type, e.g. 'invitation_failed'; identical kinds
+            and subjects are merged in the digest
+        subject (str): Short description
+        message (str): Details
+        order (Order): Related order, if any
+    """
+    event = {
+        'kind': kind,
+        'subject': subject,
+        'message': message,
+        'order_id': order.order_id if order else None,
+        'at': time.time()
+    }
+    try:
+        client = get_redis()
+        if client:
+            pipe = client.pipeline()
+            pipe.rpush(BUFFER_KEY, json.dumps(event))
+            pipe.set(WINDOW_KEY, event['at'], nx=True)
+            pipe.get(WINDOW_KEY)
+            length, _, window_start = pipe.execute()
+
+            if _flush_due(length, window_start):
+                dispatch_admin_digest()
+            return True
+    except Exception as e:
+        logger.warning(f"Failed to buffer admin notification: {str(e)}")
+
+    # No Redis: fall back to one email per notification
+    email = queue_admin_notification(subject, message, order=order)
+    if email is not None:
+        db.session.commit()
+        wake_email_sender()
+    return email is not None
+
+def _flush_due(length, window_start):
+    if not length:
+        return False
+    if length >= current_app.config.get('ADMIN_DIGEST_MAX_EVENTS', 50):
+        return True
+    window = current_app.config.get('ADMIN_DIGEST_WINDOW_SECONDS', 300)
+    return window_start is not None and time.time() - float(window_start) >= window
+
+def dispatch_admin_digest():
+    """Flush the buffer in a Celery worker or a background thread"""
+    if current_app.config.get('ENABLE_CELERY', False):
+        try:
+            from tasks import flush_admin_notifications_task
+            flush_admin_notifications_task.delay()
+            return
+        except Exception as e:
+            logger.warning(f"Failed to queue admin digest: {str(e)}")
+
+    run_in_background(current_app._get_current_object(), flush_admin_notifications)
+
+def _take_buffer(client):
+    """Atomically take all buffered events and start a new window"""
+    pipe = client.pipeline(transaction=True)
+    pipe.lrange(BUFFER_KEY, 0, -1)
+    pipe.delete(BUFFER_KEY)
+    pipe.delete(WINDOW_KEY)
+    raw_events, _, _ = pipe.execute()
+    return [json.loads(raw) for raw in raw_events]
+
+def build_digest(events):
+    """
+    Merge events with the same kind and subject
+
+    Returns:
+        list: One dict per group, most frequent first
+    """
+    groups = {}
+    for event in events:
+        key = (event['kind'], event['subject'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'kind': event['kind'],
+                'subject': event['subject'],
+                'count': 0,
+                'first_at': event['at'],
+                'order_ids': []
+            }
+        group['count'] += 1
+        group['last_at'] = event['at']
+        group['message'] = event['message']  # latest wins
+        if event['order_id'] and len(group['order_ids']) < 10 and event['order_id'] not in group['order_ids']:
+            group['order_ids'].append(event['order_id'])
+    return sorted(groups.values(), key=lambda group: -group['count'])
+
+def _format_time(timestamp):
+    return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
+
+def _queue_digest_email(subject, context):
+    admin_email = current_app.config.get('ADMIN_EMAIL')
+    if not admin_email:
+        return False
+    try:
+        subject, html_content, text_content = render_email('admin_digest', subject=subject, **context)
+        queue_email(admin_email, subject, html_content, text_content, category='admin_digest')
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to queue admin digest email: {str(e)}")
+        return False
+    wake_email_sender()
+    return True
+
+def send_telegram_message(text):
+    """
+    Send a message to the admin Telegram chat
+
+    Returns:
+        bool: True if Telegram accepted it, False on error or if not configured
+    """
+    token = current_app.config.get('ADMIN_TELEGRAM_BOT_TOKEN')
+    chat_id = current_app.config.get('ADMIN_TELEGRAM_CHAT_ID')
+    if not token or not chat_id:
+        return False
+
+    if len(text) > TELEGRAM_MAX_LENGTH:
+        text = text[:TELEGRAM_MAX_LENGTH - 4] + '\n...'
+    try:
+        response = requests.post(
+            f"https://api.telegram.org/bot{token}/sendMessage",
+            json={'chat_id': chat_id, 'text': text, 'disable_web_page_preview': True},
+            timeout=(3.05, 10)
+        )
+        if response.status_code != 200:
+            logger.error(f"Telegram returned {response.status_code}: {response.text[:200]}")
+            return False
+        return True
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to send Telegram message: {str(e)}")
+        return False
+
+def _telegram_text(subject, context):
+    lines = [f"🚨 {subject}", f"{context['window_start']} - {context['window_end']}", ""]
+    for group in context['groups']:
+        lines.append(f"• {group['subject']} (x{group['count']})")
+        lines.append(f"  {group['message']}")
+        if group['order_ids']:
+            lines.append(f"  Orders: {', '.join(group['order_ids'])}")
+    return '\n'.join(lines)
+
+def flush_admin_notifications(force=False):
+    """
+    Deliver the buffered notifications as one digest per channel
+
+    Email goes through the outbox; Telegram is sent directly, since this
+    already runs off the request path.
+
+    Args:
+        force (bool): Flush even if the window is still open
+
+    Returns:
+        dict: Number of events and groups delivered, and per-channel results
+    """
+    client = get_redis()
+    if not client:
+        return {'events': 0}
+
+    if not client.set(FLUSH_LOCK_KEY, '1', nx=True, ex=60):
+        return {'events': 0}
+    try:
+        if not force:
+            pipe = client.pipeline()
+            pipe.llen(BUFFER_KEY)
+            pipe.get(WINDOW_KEY)
+            length, window_start = pipe.execute()
+            if not _flush_due(length, window_start):
+                return {'events': 0}
+
+        events = _take_buffer(client)
+        if not events:
+            return {'events': 0}
+
+        groups = build_digest(events)
+        context = {
+            'total': len(events),
+            'window_start': _format_time(min(event['at'] for event in events)),
+            'window_end': _format_time(max(event['at'] for event in events)),
+            'groups': [
+                dict(group, first_at=_format_time(group['first_at']), last_at=_format_time(group['last_at']))
+                for group in groups
+            ]
+        }
+        if len(groups) == 1:
+            subject = f"{groups[0]['subject']} (x{len(events)})"
+        else:
+            subject = f"{len(events)} notifications in {len(groups)} groups"
+
+        result = {
+            'events': len(events),
+            'groups': len(groups),
+            'email': _queue_digest_email(subject, context),
+            'telegram': send_telegram_message(_telegram_text(subject, context))
+        }
+        logger.info(f"Admin digest flushed: {result}")
+        return result
+    finally:
+        try:
+            client.delete(FLUSH_LOCK_KEY)
+        except Exception:
+            pass
@@ -0,0 +1,27 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def run_in_background(app, func, *args, **kwargs):
+    """
+    Run func in a daemon thread inside an application context
+
+    Used as a fallback for work that would normally go to Celery when
+    ENABLE_CELERY is off. The thread gets its own database session which
+    is removed once func returns.
+    """
+    def runner():
+        with app.app_context():
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Background job {getattr(func, '__name__', func)} failed: {str(e)}")
+                logger.exception("Full traceback:")
+            finally:
+                from models import db
+                db.session.remove()
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    return thread
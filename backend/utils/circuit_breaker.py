@@ -0,0 +1,148 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for calls to an external service
+
+    The breaker opens when, over the last window_seconds, at least
+    minimum_calls were made and either the failure rate or the share of
+    slow calls crosses its threshold. While open every call is refused
+    until open_seconds have passed; then a single probe is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_rate_threshold=0.5, slow_call_seconds=5.0,
+                 slow_call_rate_threshold=0.5, minimum_calls=10, window_seconds=60,
+                 open_seconds=30):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (timestamp, success, latency)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._last_latency = None
+        self._total_calls = 0
+        self._rejected_calls = 0
+
+    def _trim(self, now):
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _open(self, now, reason):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        logger.warning(f"Circuit breaker '{self.name}' opened: {reason}")
+
+    def allow_request(self):
+        """Return True if a call may be made now"""
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.open_seconds:
+                    self._rejected_calls += 1
+                    return False
+                self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._rejected_calls += 1
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def retry_after(self):
+        """Seconds until the breaker will let a probe through (0 if closed)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0
+            return max(0, int(self.open_seconds - (time.monotonic() - self._opened_at)) + 1)
+
+    def record(self, success, latency):
+        """Record the outcome of a call made after allow_request()"""
+        with self._lock:
+            now = time.monotonic()
+            slow = latency >= self.slow_call_seconds
+            self._last_latency = latency
+            self._total_calls += 1
+
+            if self._state == self.HALF_OPEN:
+                if success and not slow:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                    self._probe_in_flight = False
+                    logger.info(f"Circuit breaker '{self.name}' closed after successful probe")
+                else:
+                    self._open(now, f"probe failed (success={success}, latency={latency:.2f}s)")
+                return
+
+            self._calls.append((now, success, latency))
+            self._trim(now)
+
+            if self._state != self.CLOSED or len(self._calls) < self.minimum_calls:
+                return
+
+            total = len(self._calls)
+            failure_rate = sum(1 for _, ok, _ in self._calls if not ok) / total
+            slow_rate = sum(1 for _, _, lat in self._calls if lat >= self.slow_call_seconds) / total
+
+            if failure_rate >= self.failure_rate_threshold:
+                self._open(now, f"failure rate {failure_rate:.0%} over {total} calls")
+            elif slow_rate >= self.slow_call_rate_threshold:
+                self._open(now, f"slow call rate {slow_rate:.0%} over {total} calls")
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def stats(self):
+        """Snapshot of breaker state and latency over the current window"""
+        state = self.state
+        with self._lock:
+            self._trim(time.monotonic())
+            latencies = sorted(lat for _, _, lat in self._calls)
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+
+            def percentile(p):
+                if not latencies:
+                    return None
+                index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+                return round(latencies[index], 3)
+
+            return {
+                'name': self.name,
+                'state': state,
+                'window_seconds': self.window_seconds,
+                'window_calls': total,
+                'window_failures': failures,
+                'failure_rate': round(failures / total, 3) if total else 0.0,
+                'latency_p50': percentile(0.5),
+                'latency_p95': percentile(0.95),
+                'latency_max': round(latencies[-1], 3) if latencies else None,
+                'last_latency': round(self._last_latency, 3) if self._last_latency is not None else None,
+                'total_calls': self._total_calls,
+                'rejected_calls': self._rejected_calls
+            }
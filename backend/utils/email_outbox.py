@@ -0,0 +1,219 @@
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, EmailOutbox
+from utils.email_service import get_email_service, fits_substitution, MAX_PERSONALIZATIONS
+from utils.background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+# Columns the sender needs; rows are read without hydrating ORM objects
+CLAIM_COLUMNS = (
+    EmailOutbox.id,
+    EmailOutbox.category,
+    EmailOutbox.to_email,
+    EmailOutbox.subject,
+    EmailOutbox.html_content,
+    EmailOutbox.text_content,
+    EmailOutbox.attempts
+)
+
+class RateLimiter:
+    """Thread-safe token bucket: at most rate requests per second, bursts up to burst"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# One limiter per provider and process
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider='sendgrid'):
+    """Factory function to get the request rate limiter of an email provider"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = current_app.config.get('EMAIL_RATE_LIMITS', {})
+            _limiters[provider] = RateLimiter(limits.get(provider, 10))
+        return _limiters[provider]
+
+def _claim_batch(limit):
+    """
+    Claim due outbox rows for this sender
+
+    Rows are leased rather than locked: they move to 'sending' with
+    next_attempt_at pushed EMAIL_SEND_LEASE_SECONDS ahead, so rows of a
+    sender that died mid-batch become due again. SKIP LOCKED lets several
+    senders claim side by side.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=current_app.config.get('EMAIL_SEND_LEASE_SECONDS', 120))
+
+    ids = db.session.execute(
+        db.select(EmailOutbox.id).where(
+            EmailOutbox.status.in_(('pending', 'sending')),
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(limit).with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    if not ids:
+        db.session.commit()
+        return []
+
+    EmailOutbox.query.filter(EmailOutbox.id.in_(ids)).update({
+        'status': 'sending',
+        'attempts': EmailOutbox.attempts + 1,
+        'next_attempt_at': now + lease
+    }, synchronize_session=False)
+    rows = db.session.query(*CLAIM_COLUMNS).filter(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id).all()
+    db.session.commit()
+    return rows
+
+def _group_by_category(rows):
+    """
+    Group rows by category so each group is one SendGrid request with a
+    personalization per row; rows too large for substitutions go alone
+    """
+    groups = OrderedDict()
+    for row in rows:
+        if fits_substitution(row.html_content, row.text_content):
+            groups.setdefault(row.category, []).append(row)
+        else:
+            groups[('single', row.id)] = [row]
+    for group in groups.values():
+        for start in range(0, len(group), MAX_PERSONALIZATIONS):
+            yield group[start:start + MAX_PERSONALIZATIONS]
+
+def _send_group(email_service, group):
+    if len(group) == 1:
+        row = group[0]
+        return email_service.send_batch([row.to_email], row.subject, row.html_content, row.text_content)
+    return email_service.send_personalized([{
+        'to_email': row.to_email,
+        'subject': row.subject,
+        'html_content': row.html_content,
+        'text_content': row.text_content
+    } for row in group])
+
+def _retry_delay(attempts):
+    """Exponential backoff with jitter: base, 2x base, 4x base ... capped"""
+    base = current_app.config.get('EMAIL_RETRY_BASE_SECONDS', 30)
+    cap = current_app.config.get('EMAIL_RETRY_MAX_SECONDS', 3600)
+    delay = min(base * (2 ** (attempts - 1)), cap)
+    return delay * random.uniform(0.8, 1.2)
+
+def _mark_sent(rows):
+    EmailOutbox.query.filter(EmailOutbox.id.in_([row.id for row in rows])).update({
+        'status': 'sent',
+        'sent_at': datetime.utcnow(),
+        'last_error': None
+    }, synchronize_session=False)
+    db.session.commit()
+
+def _mark_failed(rows, error, permanent):
+    """
+    Schedule a retry, or give up after EMAIL_MAX_ATTEMPTS or on an error
+    SendGrid will keep returning (e.g. 400 for an invalid address)
+
+    Returns:
+        int: Number of rows given up on
+    """
+    max_attempts = current_app.config.get('EMAIL_MAX_ATTEMPTS', 8)
+    given_up = 0
+    for row in rows:
+        if permanent or row.attempts >= max_attempts:
+            values = {'status': 'failed', 'last_error': error}
+            given_up += 1
+            logger.error(f"Email {row.id} to {row.to_email} failed permanently after {row.attempts} attempts: {error}")
+        else:
+            values = {
+                'status': 'pending',
+                'last_error': error,
+                'next_attempt_at': datetime.utcnow() + timedelta(seconds=_retry_delay(row.attempts))
+            }
+        EmailOutbox.query.filter_by(id=row.id).update(values, synchronize_session=False)
+    db.session.commit()
+    return given_up
+
+def drain_email_outbox(batch_size=None, max_batches=None):
+    """
+    Deliver due outbox emails
+
+    Uses the process-wide SendGrid client, sends the due emails of a
+    category in one request (one personalization each, carrying that
+    recipient's subject and rendered content) and paces requests with the
+    provider rate limiter.
+
+    Returns:
+        dict: Counts of sent, retried and failed emails
+    """
+    batch_size = batch_size or current_app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 100)
+    max_batches = max_batches or current_app.config.get('EMAIL_OUTBOX_MAX_BATCHES', 10)
+
+    email_service = get_email_service()
+    limiter = get_rate_limiter('sendgrid')
+    totals = {'sent': 0, 'retried': 0, 'failed': 0}
+
+    for _ in range(max_batches):
+        rows = _claim_batch(batch_size)
+        if not rows:
+            break
+
+        for group in _group_by_category(rows):
+            limiter.acquire()
+            result = _send_group(email_service, group)
+
+            try:
+                if result['success']:
+                    _mark_sent(group)
+                    totals['sent'] += len(group)
+                else:
+                    given_up = _mark_failed(group, result.get('error'), result.get('permanent', False))
+                    totals['failed'] += given_up
+                    totals['retried'] += len(group) - given_up
+            except Exception as e:
+                # The lease expires and the rows are retried; a sent email may go out twice
+                db.session.rollback()
+                logger.error(f"Failed to record email outbox result: {str(e)}")
+
+        if len(rows) < batch_size:
+            break
+
+    if any(totals.values()):
+        logger.info(f"Email outbox drained: {totals}")
+    return totals
+
+def wake_email_sender():
+    """
+    Deliver newly committed outbox rows now instead of at the next poll
+
+    Call after committing a transaction that queued email.
+    """
+    if current_app.config.get('ENABLE_CELERY', False):
+        try:
+            from tasks import send_email_outbox_task
+            send_email_outbox_task.delay()
+            return
+        except Exception as e:
+            logger.warning(f"Failed to queue email outbox task: {str(e)}")
+
+    run_in_background(current_app._get_current_object(), drain_email_outbox)
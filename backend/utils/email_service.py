@@ -1,11 +1,36 @@
-import os
+import re
 import logging
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
-from flask import current_app, render_template_string
+from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization, Substitution
+from python_http_client.exceptions import HTTPError
+from datetime import datetime
+from flask import current_app
+from models import db, EmailOutbox
+from utils.package_catalog import get_package
+from utils.email_templates import render_email
 
 logger = logging.getLogger(__name__)
 
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+# Content of a personalized batch: every personalization substitutes its
+# own rendered email for these tags
+HTML_BODY_TAG = '-html_body-'
+TEXT_BODY_TAG = '-text_body-'
+
+# SendGrid limit on the substitutions of one personalization
+MAX_SUBSTITUTION_BYTES = 10000
+
+def fits_substitution(html_content, text_content):
+    """Whether an email is small enough to be sent as substitutions"""
+    size = len(html_content.encode('utf-8')) + len(text_content.encode('utf-8'))
+    return size + len(HTML_BODY_TAG) + len(TEXT_BODY_TAG) <= MAX_SUBSTITUTION_BYTES
+
+def html_to_text(html_content):
+    """Plain-text version of an HTML email"""
+    return re.sub('<[^<]+?>', '', html_content)
+
 class EmailService:
     def __init__(self):
         self.enabled = current_app.config.get('EMAIL_ENABLED', False)
@@ -13,126 +38,155 @@ class EmailService:
         self.from_email = current_app.config.get('FROM_EMAIL')
         self.sg = SendGridAPIClient(api_key=self.api_key) if self.api_key and self.enabled else None
     
-    def send_email(self, to_email, subject, html_content, text_content=None):
-        """Send email using SendGrid"""
+    def send_batch(self, to_emails, subject, html_content, text_content=None):
+        """
+        Send identical content to several recipients in one SendGrid request
+        
+        Each recipient gets its own personalization, so nobody sees the
+        other addresses.
+        
+        Returns:
+            dict: {'success': bool, 'status_code': int or None, 'error': str,
+                   'permanent': bool} - permanent errors are not worth retrying
+        """
+        if not self.enabled:
+            logger.info(f"Email disabled - would send to {', '.join(to_emails)}: {subject}")
+            return {'success': True, 'status_code': None}
+        
+        if not self.sg:
+            logger.error("SendGrid not configured but email is enabled")
+            return {'success': False, 'status_code': None, 'error': 'SendGrid not configured', 'permanent': False}
+        
+        if len(to_emails) > MAX_PERSONALIZATIONS:
+            raise ValueError(f"At most {MAX_PERSONALIZATIONS} recipients per request")
+        
+        mail = Mail(
+            from_email=Email(self.from_email),
+            subject=subject,
+            html_content=Content("text/html", html_content),
+            plain_text_content=Content("text/plain", text_content or html_to_text(html_content))
+        )
+        for to_email in to_emails:
+            personalization = Personalization()
+            personalization.add_to(To(to_email))
+            mail.add_personalization(personalization)
+        
+        return self._send(mail, len(to_emails), subject)
+    
+    def send_personalized(self, messages):
+        """
+        Send different emails to several recipients in one SendGrid request
+        
+        Each message becomes a personalization with its own subject, and its
+        rendered HTML and text replace HTML_BODY_TAG and TEXT_BODY_TAG of the
+        shared content. Every message must pass fits_substitution.
+        
+        Args:
+            messages (list): dicts with to_email, subject, html_content and text_content
+        
+        Returns:
+            dict: same as send_batch
+        """
         if not self.enabled:
-            logger.info(f"Email disabled - would send to {to_email}: {subject}")
-            return True
+            logger.info(f"Email disabled - would send {len(messages)} personalized email(s)")
+            return {'success': True, 'status_code': None}
         
         if not self.sg:
             logger.error("SendGrid not configured but email is enabled")
-            return False
+            return {'success': False, 'status_code': None, 'error': 'SendGrid not configured', 'permanent': False}
         
+        if len(messages) > MAX_PERSONALIZATIONS:
+            raise ValueError(f"At most {MAX_PERSONALIZATIONS} recipients per request")
+        
+        mail = Mail(
+            from_email=Email(self.from_email),
+            subject=messages[0]['subject'],
+            html_content=Content("text/html", HTML_BODY_TAG),
+            plain_text_content=Content("text/plain", TEXT_BODY_TAG)
+        )
+        for message in messages:
+            personalization = Personalization()
+            personalization.add_to(To(message['to_email']))
+            personalization.subject = message['subject']
+            personalization.add_substitution(Substitution(HTML_BODY_TAG, message['html_content']))
+            personalization.add_substitution(Substitution(TEXT_BODY_TAG, message['text_content']))
+            mail.add_personalization(personalization)
+        
+        return self._send(mail, len(messages), messages[0]['subject'])
+    
+    def _send(self, mail, recipients, subject):
+        """Send a built Mail and classify the outcome (see send_batch)"""
         try:
-            from_email = Email(self.from_email)
-            to_email = To(to_email)
-            
-            if not text_content:
-                # Create text version from HTML
-                import re
-                text_content = re.sub('<[^<]+?>', '', html_content)
-            
-            mail = Mail(
-                from_email=from_email,
-                to_emails=to_email,
-                subject=subject,
-                html_content=Content("text/html", html_content),
-                plain_text_content=Content("text/plain", text_content)
-            )
-            
             response = self.sg.send(mail)
             
             if response.status_code in [200, 201, 202]:
-                logger.info(f"Email sent successfully to {to_email}")
-                return True
-            else:
-                logger.error(f"Failed to send email. Status code: {response.status_code}")
-                return False
-                
+                logger.info(f"Email sent successfully to {recipients} recipient(s): {subject}")
+                return {'success': True, 'status_code': response.status_code}
+            
+            logger.error(f"Failed to send email. Status code: {response.status_code}")
+            return {
+                'success': False,
+                'status_code': response.status_code,
+                'error': f"SendGrid returned {response.status_code}",
+                'permanent': 400 <= response.status_code < 500 and response.status_code != 429
+            }
+        
+        except HTTPError as e:
+            status_code = getattr(e, 'status_code', None)
+            logger.error(f"Error sending email: {status_code} {str(e)}")
+            return {
+                'success': False,
+                'status_code': status_code,
+                'error': str(e),
+                'permanent': bool(status_code) and 400 <= status_code < 500 and status_code != 429
+            }
         except Exception as e:
             logger.error(f"Error sending email: {str(e)}")
-            return False
+            return {'success': False, 'status_code': None, 'error': str(e), 'permanent': False}
+    
+    def send_email(self, to_email, subject, html_content, text_content=None):
+        """Send email using SendGrid"""
+        return self.send_batch([to_email], subject, html_content, text_content)['success']
+
+# Global email service instance (keeps one SendGrid client per process)
+_email_service = None
 
 def get_email_service():
     """Factory function to get email service instance"""
-    return EmailService()
+    global _email_service
+    if _email_service is None:
+        _email_service = EmailService()
+    return _email_service
 
-def send_invitation_confirmation(order):
-    """Send invitation confirmation email to customer"""
+def queue_email(to_email, subject, html_content, text_content=None, category='general', order_id=None):
+    """
+    Add an email to the outbox in the current transaction
+    
+    Nothing is sent here: the row commits (or rolls back) together with the
+    caller's status change and is delivered later by the outbox sender.
+    
+    Returns:
+        EmailOutbox: The pending outbox row
+    """
+    email = EmailOutbox(
+        category=category,
+        order_id=order_id,
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+        text_content=text_content or html_to_text(html_content)
+    )
+    db.session.add(email)
+    return email
+
+def queue_invitation_confirmation(order):
+    """Queue invitation confirmation email to customer (in the caller's transaction)"""
     try:
-        email_service = get_email_service()
-        
-        # Get package info
-        packages = current_app.config.get('PACKAGES', {})
-        package = packages.get(order.package_id, {})
-        
-        # Email template
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>ChatGPT Plus Invitation Sent</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background: #4F46E5; color: white; padding: 20px; text-align: center; }
-                .content { padding: 20px; background: #f9f9f9; }
-                .footer { padding: 20px; text-align: center; font-size: 12px; color: #666; }
-                .button { display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }
-                .success { background: #10B981; color: white; padding: 15px; border-radius: 5px; margin: 20px 0; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎉 ChatGPT Plus Invitation Sent!</h1>
-                </div>
-                
-                <div class="content">
-                    <div class="success">
-                        <strong>✅ Success!</strong> Your ChatGPT Plus invitation has been sent successfully.
-                    </div>
-                    
-                    <h2>Hello {{ customer_name }},</h2>
-                    
-                    <p>Great news! Your ChatGPT Plus invitation has been sent to <strong>{{ customer_email }}</strong>.</p>
-                    
-                    <h3>Order Details:</h3>
-                    <ul>
-                        <li><strong>Order ID:</strong> {{ order_id }}</li>
-                        <li><strong>Package:</strong> {{ package_name }}</li>
-                        <li><strong>Duration:</strong> {{ package_duration }}</li>
-                        <li><strong>Amount Paid:</strong> Rp {{ amount }}</li>
-                    </ul>
-                    
-                    <h3>Next Steps:</h3>
-                    <ol>
-                        <li>Check your email inbox (including spam/junk folder)</li>
-                        <li>Look for an invitation email from ChatGPT Team</li>
-                        <li>Click the invitation link to join the team</li>
-                        <li>Start enjoying ChatGPT Plus features!</li>
-                    </ol>
-                    
-                    <p><strong>Note:</strong> The invitation email may take a few minutes to arrive. If you don't receive it within 30 minutes, please contact our support team.</p>
-                    
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="https://wa.me/6281234567890" class="button">Contact Support</a>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <p>Thank you for choosing our ChatGPT Plus service!</p>
-                    <p>If you have any questions, feel free to contact our support team.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        # Get package info (the package may have been retired since the order)
+        package = get_package(order.package_id, include_inactive=True) or {}
         
-        # Render template
-        html_content = render_template_string(
-            html_template,
+        subject, html_content, text_content = render_email(
+            'invitation_confirmation',
             customer_name=order.full_name or 'Valued Customer',
             customer_email=order.customer_email,
             order_id=order.order_id,
@@ -141,142 +195,44 @@ def send_invitation_confirmation(order):
             amount=f"{int(order.amount):,}"
         )
         
-        subject = f"✅ ChatGPT Plus Invitation Sent - Order {order.order_id}"
-        
-        return email_service.send_email(order.customer_email, subject, html_content)
+        return queue_email(order.customer_email, subject, html_content, text_content,
+                           category='invitation_confirmation', order_id=order.id)
         
     except Exception as e:
-        logger.error(f"Failed to send invitation confirmation: {str(e)}")
-        return False
+        logger.error(f"Failed to queue invitation confirmation: {str(e)}")
+        return None
 
-def send_admin_notification(subject, message, order=None):
-    """Send notification to admin"""
+def queue_admin_notification(subject, message, order=None):
+    """Queue notification to admin (in the caller's transaction)"""
     try:
         admin_email = current_app.config.get('ADMIN_EMAIL')
         if not admin_email:
             logger.warning("Admin email not configured")
-            return False
-        
-        email_service = get_email_service()
+            return None
         
-        # Admin notification template
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Admin Notification</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background: #EF4444; color: white; padding: 20px; text-align: center; }
-                .content { padding: 20px; background: #f9f9f9; }
-                .alert { background: #FEF2F2; border: 1px solid #FECACA; padding: 15px; border-radius: 5px; margin: 20px 0; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🚨 Admin Notification</h1>
-                </div>
-                
-                <div class="content">
-                    <div class="alert">
-                        <h3>{{ subject }}</h3>
-                        <p>{{ message }}</p>
-                    </div>
-                    
-                    {% if order %}
-                    <h3>Order Details:</h3>
-                    <ul>
-                        <li><strong>Order ID:</strong> {{ order.order_id }}</li>
-                        <li><strong>Customer Email:</strong> {{ order.customer_email }}</li>
-                        <li><strong>Package:</strong> {{ order.package_id }}</li>
-                        <li><strong>Payment Status:</strong> {{ order.payment_status }}</li>
-                        <li><strong>Invitation Status:</strong> {{ order.invitation_status }}</li>
-                        <li><strong>Created:</strong> {{ order.created_at }}</li>
-                        <li><strong>Updated:</strong> {{ order.updated_at }}</li>
-                    </ul>
-                    {% endif %}
-                    
-                    <p><strong>Timestamp:</strong> {{ timestamp }}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        from datetime import datetime
-        html_content = render_template_string(
-            html_template,
+        subject, html_content, text_content = render_email(
+            'admin_notification',
             subject=subject,
             message=message,
             order=order,
             timestamp=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
         )
         
-        return email_service.send_email(admin_email, f"[ADMIN] {subject}", html_content)
+        return queue_email(admin_email, subject, html_content, text_content,
+                           category='admin_notification', order_id=order.id if order else None)
         
     except Exception as e:
-        logger.error(f"Failed to send admin notification: {str(e)}")
-        return False
+        logger.error(f"Failed to queue admin notification: {str(e)}")
+        return None
 
-def send_payment_confirmation(order):
-    """Send payment confirmation email to customer"""
+def queue_payment_confirmation(order):
+    """Queue payment confirmation email to customer (in the caller's transaction)"""
     try:
-        email_service = get_email_service()
-        
-        # Get package info
-        packages = current_app.config.get('PACKAGES', {})
-        package = packages.get(order.package_id, {})
+        # Get package info (the package may have been retired since the order)
+        package = get_package(order.package_id, include_inactive=True) or {}
         
-        html_template = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Payment Confirmation</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background: #10B981; color: white; padding: 20px; text-align: center; }
-                .content { padding: 20px; background: #f9f9f9; }
-                .success { background: #D1FAE5; border: 1px solid #A7F3D0; padding: 15px; border-radius: 5px; margin: 20px 0; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>💳 Payment Confirmed</h1>
-                </div>
-                
-                <div class="content">
-                    <div class="success">
-                        <strong>✅ Payment Successful!</strong> Your payment has been processed successfully.
-                    </div>
-                    
-                    <h2>Hello {{ customer_name }},</h2>
-                    
-                    <p>Thank you for your payment! Your ChatGPT Plus invitation is being processed and will be sent to your email shortly.</p>
-                    
-                    <h3>Order Details:</h3>
-                    <ul>
-                        <li><strong>Order ID:</strong> {{ order_id }}</li>
-                        <li><strong>Package:</strong> {{ package_name }}</li>
-                        <li><strong>Amount Paid:</strong> Rp {{ amount }}</li>
-                        <li><strong>Payment Date:</strong> {{ payment_date }}</li>
-                    </ul>
-                    
-                    <p><strong>What's Next?</strong></p>
-                    <p>Your ChatGPT Plus invitation will be sent to <strong>{{ customer_email }}</strong> within 5-30 minutes. Please check your inbox and spam folder.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        html_content = render_template_string(
-            html_template,
+        subject, html_content, text_content = render_email(
+            'payment_confirmation',
             customer_name=order.full_name or 'Valued Customer',
             customer_email=order.customer_email,
             order_id=order.order_id,
@@ -285,10 +241,9 @@ def send_payment_confirmation(order):
             payment_date=order.updated_at.strftime('%Y-%m-%d %H:%M:%S') if order.updated_at else 'N/A'
         )
         
-        subject = f"💳 Payment Confirmed - Order {order.order_id}"
-        
-        return email_service.send_email(order.customer_email, subject, html_content)
+        return queue_email(order.customer_email, subject, html_content, text_content,
+                           category='payment_confirmation', order_id=order.id)
         
     except Exception as e:
-        logger.error(f"Failed to send payment confirmation: {str(e)}")
-        return False
\ No newline at end of file
+        logger.error(f"Failed to queue payment confirmation: {str(e)}")
+        return None
\ No newline at end of file
@@ -0,0 +1,391 @@
+import re
+import logging
+from functools import lru_cache
+from jinja2 import Environment
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+# HTML is autoescaped like render_template_string; the text/plain
+# alternative is not HTML, so it is rendered without escaping
+_html_env = Environment(autoescape=True)
+_text_env = Environment(autoescape=False, trim_blocks=True, lstrip_blocks=True)
+
+INVITATION_CONFIRMATION_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>ChatGPT Plus Invitation Sent</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #4F46E5; color: white; padding: 20px; text-align: center; }
+        .content { padding: 20px; background: #f9f9f9; }
+        .footer { padding: 20px; text-align: center; font-size: 12px; color: #666; }
+        .button { display: inline-block; padding: 12px 24px; background: #4F46E5; color: white; text-decoration: none; border-radius: 5px; }
+        .success { background: #10B981; color: white; padding: 15px; border-radius: 5px; margin: 20px 0; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🎉 ChatGPT Plus Invitation Sent!</h1>
+        </div>
+
+        <div class="content">
+            <div class="success">
+                <strong>✅ Success!</strong> Your ChatGPT Plus invitation has been sent successfully.
+            </div>
+
+            <h2>Hello {{ customer_name }},</h2>
+
+            <p>Great news! Your ChatGPT Plus invitation has been sent to <strong>{{ customer_email }}</strong>.</p>
+
+            <h3>Order Details:</h3>
+            <ul>
+                <li><strong>Order ID:</strong> {{ order_id }}</li>
+                {{ package_details }}
+                <li><strong>Amount Paid:</strong> Rp {{ amount }}</li>
+            </ul>
+
+            <h3>Next Steps:</h3>
+            <ol>
+                <li>Check your email inbox (including spam/junk folder)</li>
+                <li>Look for an invitation email from ChatGPT Team</li>
+                <li>Click the invitation link to join the team</li>
+                <li>Start enjoying ChatGPT Plus features!</li>
+            </ol>
+
+            <p><strong>Note:</strong> The invitation email may take a few minutes to arrive. If you don't receive it within 30 minutes, please contact our support team.</p>
+
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="https://wa.me/6281234567890" class="button">Contact Support</a>
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>Thank you for choosing our ChatGPT Plus service!</p>
+            <p>If you have any questions, feel free to contact our support team.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+INVITATION_CONFIRMATION_PACKAGE = """<li><strong>Package:</strong> {{ package_name }}</li>
+                <li><strong>Duration:</strong> {{ package_duration }}</li>"""
+
+ADMIN_NOTIFICATION_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Admin Notification</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #EF4444; color: white; padding: 20px; text-align: center; }
+        .content { padding: 20px; background: #f9f9f9; }
+        .alert { background: #FEF2F2; border: 1px solid #FECACA; padding: 15px; border-radius: 5px; margin: 20px 0; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🚨 Admin Notification</h1>
+        </div>
+
+        <div class="content">
+            <div class="alert">
+                <h3>{{ subject }}</h3>
+                <p>{{ message }}</p>
+            </div>
+
+            {% if order %}
+            <h3>Order Details:</h3>
+            <ul>
+                <li><strong>Order ID:</strong> {{ order.order_id }}</li>
+                <li><strong>Customer Email:</strong> {{ order.customer_email }}</li>
+                <li><strong>Package:</strong> {{ order.package_id }}</li>
+                <li><strong>Payment Status:</strong> {{ order.payment_status }}</li>
+                <li><strong>Invitation Status:</strong> {{ order.invitation_status }}</li>
+                <li><strong>Created:</strong> {{ order.created_at }}</li>
+                <li><strong>Updated:</strong> {{ order.updated_at }}</li>
+            </ul>
+            {% endif %}
+
+            <p><strong>Timestamp:</strong> {{ timestamp }}</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+PAYMENT_CONFIRMATION_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Payment Confirmation</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #10B981; color: white; padding: 20px; text-align: center; }
+        .content { padding: 20px; background: #f9f9f9; }
+        .success { background: #D1FAE5; border: 1px solid #A7F3D0; padding: 15px; border-radius: 5px; margin: 20px 0; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>💳 Payment Confirmed</h1>
+        </div>
+
+        <div class="content">
+            <div class="success">
+                <strong>✅ Payment Successful!</strong> Your payment has been processed successfully.
+            </div>
+
+            <h2>Hello {{ customer_name }},</h2>
+
+            <p>Thank you for your payment! Your ChatGPT Plus invitation is being processed and will be sent to your email shortly.</p>
+
+            <h3>Order Details:</h3>
+            <ul>
+                <li><strong>Order ID:</strong> {{ order_id }}</li>
+                {{ package_details }}
+                <li><strong>Amount Paid:</strong> Rp {{ amount }}</li>
+                <li><strong>Payment Date:</strong> {{ payment_date }}</li>
+            </ul>
+
+            <p><strong>What's Next?</strong></p>
+            <p>Your ChatGPT Plus invitation will be sent to <strong>{{ customer_email }}</strong> within 5-30 minutes. Please check your inbox and spam folder.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+PAYMENT_CONFIRMATION_PACKAGE = """<li><strong>Package:</strong> {{ package_name }}</li>"""
+
+ADMIN_DIGEST_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Admin Notification Digest</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #EF4444; color: white; padding: 20px; text-align: center; }
+        .content { padding: 20px; background: #f9f9f9; }
+        .alert { background: #FEF2F2; border: 1px solid #FECACA; padding: 15px; border-radius: 5px; margin: 20px 0; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🚨 {{ total }} Admin Notifications</h1>
+        </div>
+
+        <div class="content">
+            <p><strong>Window:</strong> {{ window_start }} - {{ window_end }}</p>
+
+            {% for group in groups %}
+            <div class="alert">
+                <h3>{{ group.subject }} (x{{ group.count }})</h3>
+                <p>{{ group.message }}</p>
+                <p><strong>First:</strong> {{ group.first_at }}<br><strong>Last:</strong> {{ group.last_at }}</p>
+                {% if group.order_ids %}
+                <p><strong>Orders:</strong> {{ group.order_ids | join(', ') }}{% if group.count > group.order_ids | length %} ...{% endif %}</p>
+                {% endif %}
+            </div>
+            {% endfor %}
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+_STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>\s*', re.S | re.I)
+_CSS_RULE = re.compile(r'([^{}]+)\{([^}]*)\}')
+_START_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)((?:\s[^<>]*?)?)(/?)>')
+_CLASS_ATTR = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+
+def inline_css(html):
+    """
+    Move <style> rules into style attributes
+
+    Supports the tag and .class selectors these templates use. Tag rules
+    apply first, then class rules in stylesheet order, then any existing
+    inline style, matching CSS precedence. Run once per template at
+    registration, so rendering never touches the stylesheet.
+    """
+    rules = []
+    for block in _STYLE_BLOCK.findall(html):
+        for selectors, declarations in _CSS_RULE.findall(block):
+            declarations = '; '.join(d.strip() for d in declarations.split(';') if d.strip())
+            for selector in selectors.split(','):
+                rules.append((selector.strip(), declarations))
+    html = _STYLE_BLOCK.sub('', html)
+
+    def apply(match):
+        tag, attrs, closing = match.groups()
+        classes = _CLASS_ATTR.search(attrs)
+        classes = classes.group(1).split() if classes else []
+
+        styles = [d for s, d in rules if s == tag.lower()]
+        styles += [d for s, d in rules if s.startswith('.') and s[1:] in classes]
+        existing = _STYLE_ATTR.search(attrs)
+        if existing:
+            styles.append(existing.group(1).rstrip('; '))
+            attrs = _STYLE_ATTR.sub('', attrs)
+        if not styles:
+            return match.group(0)
+        return f'<{tag}{attrs} style="{"; ".join(styles)}"{closing}>'
+
+    return _START_TAG.sub(apply, html)
+
+def html_source_to_text(html):
+    """
+    Derive a text/plain template from an HTML template source
+
+    Jinja expressions and statements are kept, so the result compiles to a
+    text template rendered with the same context.
+    """
+    text = re.sub(r'<head>.*?</head>', '', html, flags=re.S | re.I)
+    text = re.sub(r'<a\s[^>]*href="([^"]*)"[^>]*>(.*?)</a>', r'\2: \1', text, flags=re.S | re.I)
+    text = re.sub(r'<li[^>]*>', '- ', text, flags=re.I)
+    text = re.sub(r'</(p|h[1-6]|div|ul|ol)>|<br\s*/?>', '\n', text, flags=re.I)
+    text = re.sub(r'<[^<]+?>', '', text)
+    lines = [line.strip() for line in text.splitlines()]
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+    return text.strip() + '\n'
+
+class EmailTemplate:
+    """One email: subject format string plus HTML and text templates, compiled once"""
+
+    def __init__(self, name, subject, html_source, package_fragment=None):
+        self.name = name
+        self.subject = subject
+        self.html = _html_env.from_string(inline_css(html_source))
+        self.text = _text_env.from_string(html_source_to_text(html_source))
+        self.package_html = _html_env.from_string(package_fragment) if package_fragment else None
+        self.package_text = _text_env.from_string(html_source_to_text(package_fragment).strip()) if package_fragment else None
+
+    def render(self, **context):
+        """
+        Returns:
+            tuple: (subject, html, text)
+        """
+        if self.package_html is not None:
+            html_fragment, text_fragment = _package_fragment(
+                self, context.get('package_name'), context.get('package_duration')
+            )
+        else:
+            html_fragment = text_fragment = None
+
+        subject = self.subject.format(**context)
+        html = self.html.render(context, package_details=html_fragment)
+        text = self.text.render(context, package_details=text_fragment)
+        return subject, html, text
+
+@lru_cache(maxsize=256)
+def _package_fragment(template, package_name, package_duration):
+    """Package lines are the same for every order of a package: render them once"""
+    context = {'package_name': package_name, 'package_duration': package_duration}
+    return Markup(template.package_html.render(context)), template.package_text.render(context)
+
+class TemplateRegistry:
+    """Named email templates, compiled when registered"""
+
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, name, subject, html_source, package_fragment=None):
+        self._templates[name] = EmailTemplate(name, subject, html_source, package_fragment)
+
+    def render(self, name, **context):
+        """
+        Raises:
+            KeyError: for an unknown template name
+        """
+        return self._templates[name].render(**context)
+
+def build_registry():
+    registry = TemplateRegistry()
+    registry.register(
+        'invitation_confirmation',
+        '✅ ChatGPT Plus Invitation Sent - Order {order_id}',
+        INVITATION_CONFIRMATION_HTML,
+        INVITATION_CONFIRMATION_PACKAGE
+    )
+    registry.register(
+        'payment_confirmation',
+        '💳 Payment Confirmed - Order {order_id}',
+        PAYMENT_CONFIRMATION_HTML,
+        PAYMENT_CONFIRMATION_PACKAGE
+    )
+    registry.register(
+        'admin_notification',
+        '[ADMIN] {subject}',
+        ADMIN_NOTIFICATION_HTML
+    )
+    registry.register(
+        'admin_digest',
+        '[ADMIN] {subject}',
+        ADMIN_DIGEST_HTML
+    )
+    return registry
+
+# Compiled at import, i.e. once per process at startup
+_registry = build_registry()
+
+def get_template_registry():
+    """Factory function to get the compiled email template registry"""
+    return _registry
+
+def render_email(name, **context):
+    """Render a registered email; returns (subject, html, text)"""
+    return _registry.render(name, **context)
+
+if __name__ == '__main__':
+    # Micro-benchmark: per-email cost of the previous approach (compile the
+    # template source on every send, regex-strip tags for the text part)
+    # against the precompiled registry
+    import timeit
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    order = SimpleNamespace(
+        order_id='INV-01J0000000000000000000000', customer_email='customer@example.com',
+        package_id='team_package', payment_status='paid', invitation_status='manual_review_required',
+        created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+    )
+    contexts = {
+        'invitation_confirmation': (INVITATION_CONFIRMATION_HTML.replace('{{ package_details }}', INVITATION_CONFIRMATION_PACKAGE), dict(
+            customer_name='Budi', customer_email=order.customer_email, order_id=order.order_id,
+            package_name='Team Plan', package_duration='1 Bulan', amount='95,000'
+        )),
+        'payment_confirmation': (PAYMENT_CONFIRMATION_HTML.replace('{{ package_details }}', PAYMENT_CONFIRMATION_PACKAGE), dict(
+            customer_name='Budi', customer_email=order.customer_email, order_id=order.order_id,
+            package_name='Team Plan', amount='95,000', payment_date='2025-01-01 10:00:00'
+        )),
+        'admin_notification': (ADMIN_NOTIFICATION_HTML, dict(
+            subject='Manual Review Required', message='Invitation failed after 3 retries',
+            order=order, timestamp='2025-01-01 10:00:00 UTC'
+        )),
+    }
+
+    def before(source, context):
+        html = Environment(autoescape=True).from_string(source).render(context)
+        return html, re.sub('<[^<]+?>', '', html)
+
+    number = 2000
+    print(f"{'template':<26} {'before (us)':>12} {'after (us)':>12} {'speedup':>8}")
+    for name, (source, context) in contexts.items():
+        old = timeit.timeit(lambda: before(source, context), number=number) / number * 1e6
+        new = timeit.timeit(lambda: render_email(name, **context), number=number) / number * 1e6
+        print(f"{name:<26} {old:>12.1f} {new:>12.1f} {old / new:>7.1f}x")
@@ -0,0 +1,146 @@
+import os
+import time
+import socket
+import hashlib
+import secrets
+import threading
+
+# Crockford base32: sortable as plain strings, no ambiguous characters
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_TIMESTAMP_BITS = 48
+_WORKER_BITS = 16
+_SEQUENCE_BITS = 64
+_SEQUENCE_MASK = (1 << _SEQUENCE_BITS) - 1
+_ENCODED_LENGTH = 26  # ceil(128 / 5)
+
+def _encode(value):
+    chars = []
+    for _ in range(_ENCODED_LENGTH):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+def _decode(text):
+    value = 0
+    for char in text:
+        value = (value << 5) | _ALPHABET.index(char)
+    return value
+
+def _default_worker_id():
+    """Derive a worker id from host and pid when none is configured"""
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode('utf-8')
+    return int.from_bytes(hashlib.sha256(seed).digest()[:2], 'big')
+
+class MerchantRefGenerator:
+    """
+    ULID-style generator for merchant_ref values
+
+    Each id packs a 48-bit millisecond timestamp, a 16-bit worker id and a
+    64-bit per-process sequence into 128 bits, encoded as 26 base32 chars.
+    Ids sort by creation time and are strictly increasing within a process.
+    The sequence starts at a random value in every process (and again after
+    fork), so two processes that share a worker id still cannot realistically
+    collide.
+    """
+
+    def __init__(self, worker_id=None, prefix='INV'):
+        self.prefix = prefix
+        self._configured_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        worker_id = self._configured_worker_id
+        if worker_id is None:
+            worker_id = _default_worker_id()
+        self.worker_id = int(worker_id) & ((1 << _WORKER_BITS) - 1)
+        self._last_ms = 0
+        self._sequence = secrets.randbits(_SEQUENCE_BITS - 1)
+
+    def _next_value(self):
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+            else:
+                # Same millisecond or clock went backwards: keep the last
+                # timestamp and bump the sequence so ids stay increasing
+                self._sequence = (self._sequence + 1) & _SEQUENCE_MASK
+                if self._sequence == 0:
+                    self._last_ms += 1
+            return (
+                (self._last_ms << (_WORKER_BITS + _SEQUENCE_BITS))
+                | (self.worker_id << _SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    def generate(self):
+        """Return the next merchant_ref, e.g. INV-01M56G4C1Y003GYATFYR9F8WPS"""
+        return f"{self.prefix}-{_encode(self._next_value())}"
+
+def merchant_ref_timestamp(merchant_ref):
+    """Creation time (unix seconds) encoded in a generated merchant_ref"""
+    value = _decode(merchant_ref.rsplit('-', 1)[-1])
+    return (value >> (_WORKER_BITS + _SEQUENCE_BITS)) / 1000.0
+
+# Global generator instance, created on first use
+_generator = None
+_generator_lock = threading.Lock()
+
+def _reset_after_fork():
+    # gunicorn/celery fork workers from a preloaded parent: reseed per child
+    global _generator
+    _generator = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_merchant_ref_generator():
+    """Factory function to get the process-wide generator"""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                from flask import current_app
+                _generator = MerchantRefGenerator(
+                    worker_id=current_app.config.get('MERCHANT_REF_WORKER_ID'),
+                    prefix=current_app.config.get('MERCHANT_REF_PREFIX', 'INV')
+                )
+    return _generator
+
+def generate_merchant_ref():
+    """Generate a collision-free merchant_ref for a new order"""
+    return get_merchant_ref_generator().generate()
+
+def _benchmark_worker(args):
+    worker_id, seconds = args
+    generator = MerchantRefGenerator(worker_id=worker_id)
+    refs = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        refs.append(generator.generate())
+    assert refs == sorted(refs), "ids are not monotonic within a process"
+    return refs
+
+if __name__ == '__main__':
+    # Benchmark: python utils/id_generator.py [processes] [seconds]
+    # Simulates gunicorn workers generating refs in parallel and checks that
+    # the combined output is unique and fits Order.order_id (String(50)).
+    import sys
+    from multiprocessing import Pool
+
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    with Pool(processes) as pool:
+        results = pool.map(_benchmark_worker, [(None, seconds)] * processes)
+
+    all_refs = [ref for refs in results for ref in refs]
+    unique = len(set(all_refs))
+    print(f"Processes:        {processes}")
+    print(f"Generated:        {len(all_refs):,} ids in {seconds}s")
+    print(f"Per process:      {len(all_refs) / processes / seconds:,.0f} ids/s")
+    print(f"Total throughput: {len(all_refs) / seconds:,.0f} ids/s")
+    print(f"Unique:           {unique == len(all_refs)} ({len(all_refs) - unique} duplicates)")
+    print(f"Max length:       {max(len(ref) for ref in all_refs)} chars (limit 50)")
+    print(f"Sample:           {all_refs[0]}")
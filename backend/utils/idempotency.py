@@ -0,0 +1,178 @@
+import time
+import hashlib
+import logging
+from functools import wraps
+from datetime import datetime, timedelta
+from flask import current_app, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+def _request_hash():
+    """Fingerprint of the request body, so a key cannot be reused for a different order"""
+    return hashlib.sha256(request.get_data() or b'').hexdigest()
+
+def _try_claim(key, request_hash):
+    """Insert the key as in_progress; returns True if this request owns it"""
+    now = datetime.utcnow()
+    window = current_app.config.get('IDEMPOTENCY_WINDOW_SECONDS', 86400)
+    record = IdempotencyKey(
+        key=key,
+        request_hash=request_hash,
+        status='in_progress',
+        created_at=now,
+        expires_at=now + timedelta(seconds=window)
+    )
+    try:
+        db.session.add(record)
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+def _load(key):
+    """
+    Read a key as a plain row and end the read transaction
+
+    A plain row is used instead of an ORM instance so its values survive
+    the rollback that releases the pooled connection.
+    """
+    record = db.session.query(
+        IdempotencyKey.request_hash,
+        IdempotencyKey.status,
+        IdempotencyKey.response_status,
+        IdempotencyKey.response_body
+    ).filter_by(key=key).first()
+    db.session.rollback()
+    return record
+
+def _release_abandoned(key):
+    """Drop an expired key, or an in_progress key whose owner evidently died"""
+    now = datetime.utcnow()
+    lock_timeout = current_app.config.get('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', 90)
+    deleted = IdempotencyKey.query.filter(
+        IdempotencyKey.key == key,
+        db.or_(
+            IdempotencyKey.expires_at < now,
+            db.and_(
+                IdempotencyKey.status == 'in_progress',
+                IdempotencyKey.created_at < now - timedelta(seconds=lock_timeout)
+            )
+        )
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted > 0
+
+def _replay(record):
+    response = current_app.response_class(
+        record.response_body,
+        status=record.response_status,
+        mimetype='application/json'
+    )
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def _wait_for_completion(key):
+    """
+    Poll until the request that owns the key finishes
+
+    Returns:
+        tuple: ('completed', record), ('released', None) if the owner gave the
+        key up after a server error, or ('timeout', None)
+    """
+    deadline = time.monotonic() + current_app.config.get('IDEMPOTENCY_WAIT_SECONDS', 35)
+    interval = current_app.config.get('IDEMPOTENCY_POLL_INTERVAL', 0.25)
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        record = _load(key)
+        if record is None:
+            return 'released', None
+        if record.status == 'completed':
+            return 'completed', record
+    return 'timeout', None
+
+def _store_response(key, response):
+    """Persist a finished response; 5xx responses release the key so the client may retry"""
+    try:
+        if response.status_code >= 500:
+            IdempotencyKey.query.filter_by(key=key, status='in_progress').delete(synchronize_session=False)
+        else:
+            IdempotencyKey.query.filter_by(key=key, status='in_progress').update({
+                'status': 'completed',
+                'response_status': response.status_code,
+                'response_body': response.get_data(as_text=True)
+            }, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to store idempotent response for key {key}: {str(e)}")
+
+def idempotent(view):
+    """
+    Make a POST endpoint safe to retry with an Idempotency-Key header
+
+    The first request with a key runs the view and stores its response for
+    IDEMPOTENCY_WINDOW_SECONDS. Retries with the same key and body get the
+    stored response; concurrent retries wait for the first request to finish
+    instead of running the view again. Requests without the header are
+    handled normally.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+
+        if len(key) > 200:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be at most 200 characters'}), 400
+
+        key = f"{request.path}:{key}"
+        request_hash = _request_hash()
+
+        for _ in range(2):
+            if _try_claim(key, request_hash):
+                break
+
+            record = _load(key)
+            if record is None or _release_abandoned(key):
+                continue
+
+            if record.request_hash != request_hash:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used with a different request body'}), 422
+
+            if record.status == 'in_progress':
+                logger.info(f"Waiting for in-flight request with idempotency key {key}")
+                outcome, record = _wait_for_completion(key)
+                if outcome == 'released':
+                    continue
+                if outcome == 'timeout':
+                    return jsonify({'error': 'A request with this Idempotency-Key is still being processed'}), 409
+
+            if record.status == 'completed':
+                logger.info(f"Replaying stored response for idempotency key {key}")
+                return _replay(record)
+        else:
+            return jsonify({'error': 'A request with this Idempotency-Key is still being processed'}), 409
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _store_response(key, current_app.response_class(status=500))
+            raise
+
+        _store_response(key, response)
+        return response
+
+    return wrapper
+
+def purge_expired_keys():
+    """Delete idempotency keys past their window; returns the number removed"""
+    deleted = IdempotencyKey.query.filter(
+        IdempotencyKey.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
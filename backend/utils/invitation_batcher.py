@@ -0,0 +1,144 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, Order, InvitationLog
+from utils.order_state import INVITATION_QUEUED
+from utils.status_cache import invalidate_order_status
+from utils.email_service import queue_invitation_confirmation
+from utils.email_outbox import wake_email_sender
+from utils.order_members import pending_member_emails, record_member_results
+
+logger = logging.getLogger(__name__)
+
+def batching_enabled():
+    """Batch invitations only when there are Celery workers to run the flush"""
+    config = current_app.config
+    return config.get('ENABLE_CELERY', False) and config.get('INVITATION_BATCH_ENABLED', True)
+
+def schedule_invitation_flush():
+    """
+    Make sure a flush runs for a newly queued order
+
+    Flushes right away once INVITATION_BATCH_MAX_SIZE orders are waiting,
+    otherwise when the order's window (INVITATION_BATCH_WINDOW_SECONDS) ends.
+    """
+    from tasks import flush_invitation_batch_task
+
+    max_size = current_app.config.get('INVITATION_BATCH_MAX_SIZE', 10)
+    queued = Order.query.filter_by(invitation_status=INVITATION_QUEUED).limit(max_size).count()
+    if queued >= max_size:
+        flush_invitation_batch_task.delay()
+    else:
+        flush_invitation_batch_task.apply_async(
+            countdown=current_app.config.get('INVITATION_BATCH_WINDOW_SECONDS', 20)
+        )
+
+def claim_invitation_batch(force=False):
+    """
+    Move up to INVITATION_BATCH_MAX_SIZE queued orders to processing
+
+    Nothing is claimed while the batch is not full and its oldest order is
+    younger than the window, unless force is set. SKIP LOCKED lets
+    concurrent flushes claim disjoint batches.
+
+    Returns:
+        list: (Order, InvitationLog) pairs, committed
+    """
+    max_size = current_app.config.get('INVITATION_BATCH_MAX_SIZE', 10)
+    window = timedelta(seconds=current_app.config.get('INVITATION_BATCH_WINDOW_SECONDS', 20))
+
+    rows = db.session.query(Order.id, Order.updated_at).filter(
+        Order.invitation_status == INVITATION_QUEUED,
+        Order.payment_status == 'paid'
+    ).order_by(Order.updated_at, Order.id).limit(max_size).with_for_update(skip_locked=True).all()
+
+    if not rows or (not force and len(rows) < max_size and datetime.utcnow() - rows[0].updated_at < window):
+        db.session.commit()
+        return []
+
+    ids = [row.id for row in rows]
+    Order.query.filter(Order.id.in_(ids)).update({
+        'invitation_status': 'processing',
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+
+    batch = []
+    for order in Order.query.filter(Order.id.in_(ids)).order_by(Order.id).all():
+        log_entry = InvitationLog(order_id=order.id, status='processing', retry_count=0)
+        db.session.add(log_entry)
+        batch.append((order, log_entry))
+    db.session.commit()
+    return batch
+
+def _invite(member_emails):
+    # Imported here so the web process does not load Selenium
+    from automation.browser_pool import process_invitations_pooled
+    from automation.chatgpt_inviter import create_inviter
+
+    config = current_app.config
+    team_url = config.get('CHATGPT_ADMIN_URL', 'https://chatgpt.com/admin?tab=members')
+    if config.get('SELENIUM_POOL_ENABLED', True):
+        return process_invitations_pooled(member_emails, team_url=team_url)
+
+    inviter = create_inviter(
+        headless=config.get('SELENIUM_HEADLESS', True),
+        timeout=config.get('SELENIUM_TIMEOUT', 30),
+        step_budgets=config.get('INVITER_STEP_BUDGETS'),
+        mode=config.get('INVITER_MODE', 'api'),
+        workspace_id=config.get('CHATGPT_WORKSPACE_ID')
+    )
+    return inviter.process_invitations(member_emails, team_url=team_url)
+
+def flush_invitation_batch(force=False):
+    """
+    Invite a batch of queued orders with one navigate and invite-modal cycle
+
+    The pending member emails of all orders go into one submission. Orders
+    whose members were all invited are marked sent and their confirmation email queued in
+    the same commit. Orders not invited are handed to process_invitation_task,
+    which retries them one by one and escalates to manual review.
+
+    Returns:
+        dict: Number of orders in the batch, sent and handed off
+    """
+    batch = claim_invitation_batch(force=force)
+    if not batch:
+        return {'orders': 0, 'sent': 0, 'failed': 0}
+
+    member_emails = list(dict.fromkeys(
+        email for order, _ in batch for email in pending_member_emails(order)
+    ))
+    logger.info(f"Inviting batch of {len(batch)} orders ({len(member_emails)} emails)")
+    try:
+        results = _invite(member_emails)
+    except Exception as e:
+        logger.error(f"Invitation batch failed: {str(e)}")
+        results = {}
+
+    failed = []
+    for order, log_entry in batch:
+        order_results = {email: results.get(email, False) for email in pending_member_emails(order)}
+        if record_member_results(order, order_results, error_message=f"Not invited in batch of {len(batch)}"):
+            order.invitation_status = 'sent'
+            order.updated_at = datetime.utcnow()
+            log_entry.status = 'success'
+            queue_invitation_confirmation(order)
+        else:
+            log_entry.status = 'failure'
+            log_entry.error_message = f"Not invited in batch of {len(batch)}"
+            failed.append(order.id)
+    db.session.commit()
+
+    for order, _ in batch:
+        invalidate_order_status(order.order_id)
+    if len(failed) < len(batch):
+        wake_email_sender()
+
+    if failed:
+        from tasks import process_invitation_task
+        for order_id in failed:
+            process_invitation_task.delay(order_id)
+
+    result = {'orders': len(batch), 'sent': len(batch) - len(failed), 'failed': len(failed)}
+    logger.info(f"Invitation batch done: {result}")
+    return result
@@ -0,0 +1,124 @@
+import json
+import queue
+import time
+import logging
+import threading
+import redis
+from flask import current_app
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'order_events:'
+
+def publish_status_change(order_id, status):
+    """
+    Publish a committed status change to every web worker
+
+    Called from invalidate_order_status, i.e. after the webhook, the
+    payment pipeline or a Celery task has committed the new status.
+    """
+    try:
+        client = get_redis()
+        if client:
+            client.publish(f"{CHANNEL_PREFIX}{order_id}", json.dumps(status))
+    except Exception as e:
+        logger.warning(f"Failed to publish status change for order {order_id}: {str(e)}")
+
+class OrderEventHub:
+    """
+    Per-process fan-out of order status events
+
+    A single background thread holds one Redis pattern subscription for the
+    whole worker and hands each message to the queues of the SSE streams
+    watching that order, so open streams cost no Redis connections.
+    """
+
+    def __init__(self, redis_url):
+        self.redis_url = redis_url
+        self._lock = threading.Lock()
+        self._subscribers = {}  # order_id -> set of queue.Queue
+        self._thread = None
+        self.connected = False
+
+    def subscribe(self, order_id):
+        self._ensure_started()
+        events = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.setdefault(order_id, set()).add(events)
+        return events
+
+    def unsubscribe(self, order_id, events):
+        with self._lock:
+            subscribers = self._subscribers.get(order_id)
+            if subscribers:
+                subscribers.discard(events)
+                if not subscribers:
+                    del self._subscribers[order_id]
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='order-event-hub', daemon=True)
+                self._thread.start()
+
+    def _dispatch(self, order_id, status):
+        with self._lock:
+            subscribers = list(self._subscribers.get(order_id, ()))
+        for events in subscribers:
+            try:
+                events.put_nowait(status)
+            except queue.Full:
+                # A stalled stream only needs the latest status: drop the oldest
+                try:
+                    events.get_nowait()
+                    events.put_nowait(status)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _run(self):
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                client = redis.Redis.from_url(self.redis_url, health_check_interval=30)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self.connected = True
+                backoff = 1
+                logger.info("Order event hub subscribed to Redis")
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message or message.get('type') != 'pmessage':
+                        continue
+                    channel = message['channel'].decode('utf-8')
+                    order_id = channel[len(CHANNEL_PREFIX):]
+                    self._dispatch(order_id, json.loads(message['data']))
+            except Exception as e:
+                self.connected = False
+                logger.warning(f"Order event hub disconnected: {str(e)}; retrying in {backoff}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+# Global hub instance
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_event_hub():
+    """Factory function to get this process's event hub (None without Redis)"""
+    global _hub
+    if _hub is None:
+        redis_url = current_app.config.get('REDIS_URL')
+        if not redis_url:
+            return None
+        with _hub_lock:
+            if _hub is None:
+                _hub = OrderEventHub(redis_url)
+    return _hub
@@ -0,0 +1,120 @@
+import io
+import csv
+import json
+import zlib
+import logging
+from decimal import Decimal
+from datetime import datetime
+from models import db, Order, InvitationLog
+from utils.order_queries import apply_order_filters
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Column-only select: rows are plain tuples, no ORM objects are hydrated
+EXPORT_COLUMNS = (
+    Order.id.label('id'),
+    Order.order_id.label('order_id'),
+    Order.customer_email.label('customer_email'),
+    Order.full_name.label('full_name'),
+    Order.phone_number.label('phone_number'),
+    Order.package_id.label('package_id'),
+    Order.amount.label('amount'),
+    Order.payment_status.label('payment_status'),
+    Order.invitation_status.label('invitation_status'),
+    Order.payment_method.label('payment_method'),
+    Order.reference.label('reference'),
+    Order.created_at.label('created_at'),
+    Order.updated_at.label('updated_at'),
+    InvitationLog.id.label('invitation_log_id'),
+    InvitationLog.attempt_timestamp.label('invitation_attempt_at'),
+    InvitationLog.status.label('invitation_log_status'),
+    InvitationLog.error_message.label('invitation_error'),
+    InvitationLog.retry_count.label('invitation_retry_count')
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def iter_export_rows(filters, batch_size=1000):
+    """
+    Yield orders joined with their invitation logs, one dict per log row
+
+    Orders without logs appear once with empty log columns. Rows are read
+    through a server-side cursor batch_size at a time, so memory stays flat
+    regardless of how many orders match.
+    """
+    stmt = (
+        db.select(*EXPORT_COLUMNS)
+        .select_from(Order)
+        .outerjoin(InvitationLog, InvitationLog.order_id == Order.id)
+    )
+    stmt = apply_order_filters(stmt, filters).order_by(Order.id, InvitationLog.id)
+
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        for row in partition:
+            yield {key: _serialize(value) for key, value in row._mapping.items()}
+
+def _iter_csv(rows, batch_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def _iter_ndjson(rows, batch_size):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def iter_export(filters, export_format='csv', compress=False, batch_size=1000):
+    """
+    Stream an order export as bytes chunks
+
+    Args:
+        filters (dict): Parsed filters (see parse_order_filters)
+        export_format (str): 'csv' or 'ndjson'
+        compress (bool): gzip the stream
+        batch_size (int): Rows fetched per round trip and per output chunk
+
+    Raises:
+        ValueError: for an unsupported format
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    rows = iter_export_rows(filters, batch_size=batch_size)
+    serializer = _iter_csv if export_format == 'csv' else _iter_ndjson
+    chunks = serializer(rows, batch_size)
+    return _gzip(chunks) if compress else chunks
+
+def export_filename(export_format, compress):
+    name = f"orders-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    return f"{name}.gz" if compress else name
@@ -0,0 +1,39 @@
+from datetime import datetime
+from models import OrderMember
+
+def pending_member_emails(order):
+    """
+    Emails of an order still to be invited
+
+    Orders created before member emails existed invite the customer email.
+    """
+    if not order.members:
+        return [order.customer_email]
+    return [member.email for member in order.members if member.status != 'sent']
+
+def record_member_results(order, results, error_message=None):
+    """
+    Store per-member invitation results, without committing
+
+    Args:
+        order (Order): Order whose members were invited
+        results (dict): email -> True if invited; members not in it are untouched
+        error_message (str): Stored on members that were not invited
+
+    Returns:
+        bool: True if every member of the order is now invited
+    """
+    if not order.members:
+        order.members.append(OrderMember(email=order.customer_email, status='pending'))
+
+    for member in order.members:
+        if member.email not in results:
+            continue
+        if results[member.email]:
+            member.status = 'sent'
+            member.invited_at = datetime.utcnow()
+            member.error_message = None
+        else:
+            member.status = 'failed'
+            member.error_message = error_message
+    return all(member.status == 'sent' for member in order.members)
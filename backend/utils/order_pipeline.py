@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, Order
+from utils.tripay_client import get_tripay_client
+from utils.status_cache import invalidate_order_status
+from utils.order_state import transition_order, PENDING_GATEWAY, GATEWAY_FAILED
+
+logger = logging.getLogger(__name__)
+
+def request_payment(merchant_ref, payment_data, method):
+    """
+    Second phase of order creation: create the Tripay transaction for an
+    order that is already committed as pending_gateway, then apply the result.
+
+    The gateway call can take up to the HTTP timeout, so no transaction or
+    pooled connection may be held while it runs.
+
+    Args:
+        merchant_ref (str): Order.order_id of the committed order
+        payment_data (dict): Payload for TripayClient.create_transaction
+        method (str): Tripay payment method code
+
+    Returns:
+        dict: The raw create_transaction result
+    """
+    # Release the connection back to the pool before blocking on the gateway
+    db.session.close()
+
+    tripay_client = get_tripay_client()
+    payment_result = tripay_client.create_transaction(payment_data, method=method)
+
+    if not payment_result.get('success', False):
+        logger.error(f"Tripay error for order {merchant_ref}: {payment_result.get('error', 'Unknown error')}")
+
+    apply_payment_result(merchant_ref, payment_result)
+    return payment_result
+
+def apply_payment_result(merchant_ref, payment_result):
+    """
+    Store the gateway outcome with a single conditional UPDATE
+
+    Only orders still in pending_gateway change status, so a late result can
+    never overwrite a status the webhook or the cleanup task already set.
+    The gateway fields of a successful result are still stored if an UNPAID
+    callback moved the order on first, or the customer could not pay.
+
+    Returns:
+        bool: True if the order row was updated
+    """
+    if payment_result.get('success', False):
+        expired_time = payment_result.get('expired_time')
+        new_status = 'pending'
+        values = {
+            'checkout_url': payment_result.get('checkout_url'),
+            'qr_string': payment_result.get('qr_string'),
+            'payment_method': payment_result.get('payment_method'),
+            'reference': payment_result.get('reference'),
+            'expired_at': datetime.utcfromtimestamp(int(expired_time)) if expired_time else None
+        }
+    else:
+        new_status = GATEWAY_FAILED
+        values = {}
+
+    try:
+        updated = transition_order(merchant_ref, new_status, **values) is not None
+        if not updated and values:
+            # Fill the fields only where they are still empty
+            updated = Order.query.filter(
+                Order.order_id == merchant_ref,
+                Order.checkout_url.is_(None),
+                Order.reference.is_(None)
+            ).update(values, synchronize_session=False) > 0
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to apply payment result for order {merchant_ref}: {str(e)}")
+        raise
+
+    if updated:
+        invalidate_order_status(merchant_ref)
+    else:
+        logger.warning(f"Order {merchant_ref} left pending_gateway before the payment result was applied")
+
+    return updated
+
+def find_reusable_order(customer_email, package_id, payment_method, amount, member_emails=None):
+    """
+    Find a still-payable pending order for a repeat checkout
+
+    A customer clicking "buy" again for the same package gets the Tripay
+    transaction they already have instead of a new one. The order must have
+    been created within ORDER_REUSE_WINDOW_MINUTES, use the same method and
+    price, and its Tripay expired_time must be at least
+    ORDER_REUSE_MIN_REMAINING_MINUTES away, and it must invite the same
+    member emails.
+
+    Returns:
+        Order or None
+    """
+    if not current_app.config.get('ORDER_REUSE_ENABLED', True):
+        return None
+
+    now = datetime.utcnow()
+    window = timedelta(minutes=current_app.config.get('ORDER_REUSE_WINDOW_MINUTES', 60))
+    min_remaining = timedelta(minutes=current_app.config.get('ORDER_REUSE_MIN_REMAINING_MINUTES', 10))
+
+    # Served by ix_orders_reuse_lookup (customer_email, package_id, payment_status, created_at)
+    order = Order.query.filter(
+        Order.customer_email == customer_email,
+        Order.package_id == package_id,
+        Order.payment_status == 'pending',
+        Order.created_at >= now - window,
+        Order.payment_method == payment_method,
+        Order.amount == amount,
+        Order.checkout_url.isnot(None),
+        Order.expired_at > now + min_remaining
+    ).order_by(Order.created_at.desc()).first()
+
+    if order and member_emails is not None:
+        existing = [member.email for member in order.members] or [order.customer_email]
+        if sorted(existing) != sorted(member_emails):
+            return None
+    return order
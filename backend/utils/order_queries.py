@@ -0,0 +1,102 @@
+import json
+import base64
+import logging
+from datetime import datetime
+from models import db, Order
+
+logger = logging.getLogger(__name__)
+
+ORDER_FILTER_FIELDS = ('payment_status', 'invitation_status', 'package_id')
+
+def parse_order_filters(args):
+    """
+    Read admin order filters from request args
+
+    Supported: payment_status, invitation_status, package_id and an ISO-8601
+    created_from/created_to range (created_to is exclusive).
+
+    Raises:
+        ValueError: if a date cannot be parsed
+    """
+    filters = {field: args.get(field) for field in ORDER_FILTER_FIELDS if args.get(field)}
+    for field in ('created_from', 'created_to'):
+        value = args.get(field)
+        if value:
+            try:
+                filters[field] = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid {field}: expected ISO-8601 date, got {value}")
+    return filters
+
+def apply_order_filters(query, filters):
+    """
+    Apply parsed filters to an Order query
+
+    Each equality filter is the leading column of a composite
+    (<filter>, created_at, id) index, so filtered keyset pages stay
+    index-only range scans.
+    """
+    for field in ORDER_FILTER_FIELDS:
+        if field in filters:
+            query = query.filter(getattr(Order, field) == filters[field])
+    if 'created_from' in filters:
+        query = query.filter(Order.created_at >= filters['created_from'])
+    if 'created_to' in filters:
+        query = query.filter(Order.created_at < filters['created_to'])
+    return query
+
+def encode_cursor(order):
+    """Opaque cursor pointing just past an order in (created_at, id) DESC order"""
+    payload = json.dumps([order.created_at.isoformat(), order.id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(order_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def apply_cursor(query, cursor):
+    """Keyset condition: rows strictly after the cursor in (created_at, id) DESC order"""
+    created_at, order_id = decode_cursor(cursor)
+    return query.filter(db.or_(
+        Order.created_at < created_at,
+        db.and_(Order.created_at == created_at, Order.id < order_id)
+    ))
+
+def estimate_count(query):
+    """
+    Planner row estimate for a query, without running it
+
+    Uses EXPLAIN on PostgreSQL and MySQL, which read table statistics instead
+    of scanning. Returns None on other databases or if EXPLAIN fails, so the
+    caller can count exactly instead.
+    """
+    dialect = db.engine.dialect
+    if dialect.name not in ('postgresql', 'mysql', 'mariadb'):
+        return None
+    try:
+        compiled = query.order_by(None).statement.compile(dialect=dialect)
+        if compiled.positional:
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+        else:
+            params = compiled.params
+        connection = db.session.connection()
+
+        if dialect.name == 'postgresql':
+            result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+            plan = result if isinstance(result, list) else json.loads(result)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+        # MySQL: rows examined times the share the WHERE clause keeps
+        row = connection.exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().first()
+        return int((row['rows'] or 0) * float(row['filtered'] or 100) / 100)
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Failed to estimate order count: {str(e)}")
+        return None
@@ -0,0 +1,84 @@
+import logging
+from datetime import datetime
+from models import db, Order
+
+logger = logging.getLogger(__name__)
+
+# Order has been committed but the Tripay transaction is not created yet
+PENDING_GATEWAY = 'pending_gateway'
+# Tripay refused or never answered the transaction request
+GATEWAY_FAILED = 'gateway_failed'
+# Paid order waiting for the invitation batcher to pick it up
+INVITATION_QUEUED = 'queued'
+
+# payment_status -> statuses an order may move to it from. 'paid' is
+# terminal, and a confirmed payment wins over any earlier outcome since
+# the money has been received.
+PAYMENT_TRANSITIONS = {
+    'pending': (PENDING_GATEWAY,),
+    GATEWAY_FAILED: (PENDING_GATEWAY,),
+    'expired': ('pending',),
+    'failed': ('pending',),
+    'paid': ('pending', PENDING_GATEWAY, GATEWAY_FAILED, 'expired', 'failed'),
+}
+
+RETURNED_COLUMNS = (Order.id, Order.order_id)
+
+def allowed_sources(new_status):
+    """
+    Raises:
+        ValueError: for a status no order may move to
+    """
+    sources = PAYMENT_TRANSITIONS.get(new_status)
+    if sources is None:
+        raise ValueError(f"Unknown payment status: {new_status}")
+    return sources
+
+def transition_payment_status(new_status, *criteria, **values):
+    """
+    Compare-and-set payment_status with a single conditional UPDATE
+
+    Only rows matching criteria whose current status may move to new_status
+    are changed, so of two workers applying the same transition exactly one
+    gets the row back; for the other, and for a status already reached, the
+    statement is a no-op. The row lock only lasts until the caller commits,
+    which must happen before any I/O that depends on the outcome.
+
+    Args:
+        new_status (str): Target payment_status
+        *criteria: Extra WHERE clauses selecting the orders
+        **values: Other columns to set together with the status
+
+    Returns:
+        list: (id, order_id) rows that were moved, uncommitted
+    """
+    where = (Order.payment_status.in_(allowed_sources(new_status)),) + criteria
+    values = dict(values, payment_status=new_status, updated_at=datetime.utcnow())
+
+    if db.engine.dialect.update_returning:
+        stmt = db.update(Order).where(*where).values(**values).returning(*RETURNED_COLUMNS)
+        return db.session.execute(stmt, execution_options={'synchronize_session': False}).all()
+
+    # No UPDATE ... RETURNING (MySQL): collect candidates, then update by id.
+    # A candidate another worker moved first is dropped by the status check.
+    candidates = db.session.query(*RETURNED_COLUMNS).filter(*where).all()
+    moved = []
+    for row in candidates:
+        stmt = db.update(Order).where(
+            Order.id == row.id,
+            Order.payment_status.in_(allowed_sources(new_status))
+        ).values(**values)
+        if db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount == 1:
+            moved.append(row)
+    return moved
+
+def transition_order(order_id, new_status, **values):
+    """
+    Compare-and-set the payment_status of one order
+
+    Returns:
+        Row or None: (id, order_id) if this call moved the order, None if it
+        was a no-op (status already reached, or not allowed from the current one)
+    """
+    rows = transition_payment_status(new_status, Order.order_id == order_id, **values)
+    return rows[0] if rows else None
@@ -0,0 +1,157 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from flask import current_app
+from models import db, Package
+from utils.cache import SingleFlight
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'packages:version'
+
+# Process-local copy of the package table
+_local = {
+    'packages': None,    # package_id -> dict, including inactive packages
+    'catalog': None,     # (payload, etag) of the active packages
+    'version': None,     # Redis version the copy was loaded at
+    'loaded_at': 0.0,
+    'checked_at': 0.0    # last time the Redis version was compared
+}
+_lock = threading.Lock()
+_flight = SingleFlight()
+
+def _package_dict(row):
+    return {
+        'name': row.name,
+        # Rupiah amounts are whole numbers; Tripay signs the amount as a string
+        'price': int(row.price),
+        'duration': row.duration,
+        'description': row.description,
+        'seats': row.seats,
+        'is_active': row.is_active
+    }
+
+def _read_version():
+    """Current catalog version in Redis, or None if Redis is unavailable"""
+    try:
+        client = get_redis()
+        if not client:
+            return None
+        return int(client.get(VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Failed to read package catalog version: {str(e)}")
+        return None
+
+def _load(version):
+    rows = db.session.query(
+        Package.id, Package.name, Package.price, Package.duration,
+        Package.description, Package.seats, Package.is_active
+    ).order_by(Package.price, Package.id).all()
+    packages = {row.id: _package_dict(row) for row in rows}
+
+    active = {
+        package_id: {key: value for key, value in package.items() if key != 'is_active'}
+        for package_id, package in packages.items() if package['is_active']
+    }
+    payload = {'packages': active}
+    etag = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+    now = time.monotonic()
+    with _lock:
+        _local.update(
+            packages=packages,
+            catalog=(payload, etag),
+            version=version,
+            loaded_at=now,
+            checked_at=now
+        )
+    logger.info(f"Loaded {len(packages)} packages (catalog version {version})")
+
+def _ensure_current():
+    """
+    Reload the local copy when the Redis version moved
+
+    The version is compared at most every PACKAGE_CACHE_CHECK_SECONDS, so
+    reads in between are plain dict lookups. Without Redis the copy is
+    reloaded every PACKAGE_CACHE_FALLBACK_TTL seconds instead.
+    """
+    now = time.monotonic()
+    with _lock:
+        loaded = _local['packages'] is not None
+        version = _local['version']
+        loaded_at = _local['loaded_at']
+        checked_at = _local['checked_at']
+
+    if loaded and now - checked_at < current_app.config.get('PACKAGE_CACHE_CHECK_SECONDS', 1):
+        return
+
+    current_version = _read_version()
+    if current_version is None:
+        stale = now - loaded_at > current_app.config.get('PACKAGE_CACHE_FALLBACK_TTL', 30)
+    else:
+        stale = current_version != version
+
+    if not loaded or stale:
+        # The version is read before the rows, so a concurrent bump can only
+        # cause one extra reload, never a stale copy tagged as current
+        _flight.do('packages', lambda: _load(current_version))
+    else:
+        with _lock:
+            _local['checked_at'] = now
+
+def get_packages(include_inactive=False):
+    """
+    Packages keyed by id, served from the process-local copy
+
+    Args:
+        include_inactive (bool): Also return packages with is_active=False
+            (e.g. to render emails for orders of a retired package)
+
+    Returns:
+        dict: package_id -> {'name', 'price', 'duration', 'description', 'seats', 'is_active'}
+    """
+    _ensure_current()
+    with _lock:
+        packages = _local['packages']
+    if include_inactive:
+        return packages
+    return {package_id: package for package_id, package in packages.items() if package['is_active']}
+
+def get_package(package_id, include_inactive=False):
+    """Single package or None; inactive packages are only returned on request"""
+    return get_packages(include_inactive=include_inactive).get(package_id)
+
+def get_package_catalog():
+    """
+    Public catalog of active packages
+
+    Returns:
+        tuple: (payload dict, etag) where the etag only changes when the
+        active packages change
+    """
+    _ensure_current()
+    with _lock:
+        return _local['catalog']
+
+def bump_catalog_version():
+    """
+    Signal every worker to reload packages; call after committing a change
+
+    Returns:
+        int: The new version, or None if Redis is unavailable (workers then
+        pick up the change within PACKAGE_CACHE_FALLBACK_TTL)
+    """
+    with _lock:
+        _local['checked_at'] = 0.0
+        _local['loaded_at'] = 0.0
+    try:
+        client = get_redis()
+        if not client:
+            return None
+        return client.incr(VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to bump package catalog version: {str(e)}")
+        return None
@@ -0,0 +1,232 @@
+import json
+import math
+import time
+import hashlib
+import logging
+import threading
+from flask import current_app
+from utils.redis_client import get_redis
+from utils.tripay_client import get_tripay_client
+from utils.background import run_in_background
+from utils.package_catalog import get_package_catalog
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'tripay:payment_channels'
+REFRESH_LOCK_KEY = 'tripay:payment_channels:refresh_lock'
+
+# Process-local copy of the cached catalog
+_local = {
+    'entry': None,       # {'channels': [...], 'fetched_at': float}
+    'checked_at': 0.0,   # last time Redis was consulted for a newer entry
+    'merged': None       # (memo key, payload, etag)
+}
+_lock = threading.Lock()
+_refreshing = threading.Event()
+
+def _calculate_fee(channel, amount):
+    """Customer-side fee Tripay will add for this channel and amount"""
+    fee = channel.get('fee_customer') or {}
+    flat = float(fee.get('flat') or 0)
+    percent = float(fee.get('percent') or 0)
+    total = flat + math.ceil(amount * percent / 100)
+
+    minimum_fee = channel.get('minimum_fee')
+    maximum_fee = channel.get('maximum_fee')
+    if minimum_fee and total < float(minimum_fee):
+        total = float(minimum_fee)
+    if maximum_fee and total > float(maximum_fee):
+        total = float(maximum_fee)
+    return int(total)
+
+def _is_available(channel, amount):
+    """A channel is usable for an amount if it is active and within its limits"""
+    if not channel.get('active', False):
+        return False
+    minimum_amount = channel.get('minimum_amount')
+    maximum_amount = channel.get('maximum_amount')
+    if minimum_amount and amount < float(minimum_amount):
+        return False
+    if maximum_amount and amount > float(maximum_amount):
+        return False
+    return True
+
+def merge_channels(channels, packages):
+    """
+    Merge Tripay channels with per-package fees
+
+    Built from scratch on every refresh so channels Tripay disables or
+    re-enables are reflected as soon as the cache is refreshed.
+    """
+    merged = []
+    for channel in channels:
+        if not channel.get('active', False):
+            continue
+
+        package_fees = {}
+        for package_id, package in packages.items():
+            amount = float(package['price'])
+            fee = _calculate_fee(channel, amount)
+            package_fees[package_id] = {
+                'available': _is_available(channel, amount),
+                'fee': fee,
+                'total': int(amount) + fee
+            }
+
+        merged.append({
+            'code': channel.get('code'),
+            'name': channel.get('name'),
+            'group': channel.get('group'),
+            'type': channel.get('type'),
+            'icon_url': channel.get('icon_url'),
+            'fee_customer': channel.get('fee_customer'),
+            'packages': package_fees
+        })
+    return merged
+
+def _store(entry):
+    with _lock:
+        _local['entry'] = entry
+        _local['checked_at'] = time.monotonic()
+
+def _load_from_redis():
+    """Pick up a catalog another worker refreshed; errors count as a miss"""
+    try:
+        client = get_redis()
+        raw = client.get(CACHE_KEY) if client else None
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Failed to read payment channels from Redis: {str(e)}")
+        return None
+
+def refresh_payment_channels():
+    """
+    Fetch channels from Tripay and store them in Redis and the local cache
+
+    This is the only place that calls Tripay for channels; it runs from the
+    Celery beat schedule or a background thread, never on the request path.
+
+    Returns:
+        bool: True if the catalog was refreshed
+    """
+    client = None
+    locked = False
+    try:
+        client = get_redis()
+        if client:
+            locked = bool(client.set(REFRESH_LOCK_KEY, '1', nx=True, ex=30))
+            if not locked:
+                logger.info("Payment channel refresh already running in another worker")
+                _refreshing.clear()
+                return False
+    except Exception as e:
+        logger.warning(f"Payment channel refresh lock unavailable: {str(e)}")
+        client = None
+
+    try:
+        result = get_tripay_client().get_payment_channels()
+        if not result.get('success', False):
+            # Keep serving the previous catalog rather than an empty one
+            logger.error(f"Payment channel refresh failed: {result.get('error')}")
+            return False
+
+        entry = {'channels': result.get('data', []), 'fetched_at': time.time()}
+        _store(entry)
+
+        if client:
+            ttl = current_app.config.get('PAYMENT_CHANNELS_STALE_TTL', 3600)
+            client.set(CACHE_KEY, json.dumps(entry), ex=ttl)
+
+        logger.info(f"Payment channels refreshed: {len(entry['channels'])} channels")
+        return True
+    except Exception as e:
+        logger.error(f"Payment channel refresh error: {str(e)}")
+        return False
+    finally:
+        if locked:
+            try:
+                client.delete(REFRESH_LOCK_KEY)
+            except Exception:
+                pass
+        _refreshing.clear()
+
+def _schedule_refresh():
+    """Start one background refresh per process at a time"""
+    if _refreshing.is_set():
+        return
+    _refreshing.set()
+    run_in_background(current_app._get_current_object(), refresh_payment_channels)
+
+def _current_entry():
+    now = time.monotonic()
+    with _lock:
+        entry = _local['entry']
+        checked_at = _local['checked_at']
+
+    recheck = current_app.config.get('PAYMENT_CHANNELS_LOCAL_TTL', 5)
+    if entry is None or now - checked_at > recheck:
+        shared = _load_from_redis()
+        with _lock:
+            _local['checked_at'] = now
+            if shared and (entry is None or shared['fetched_at'] > entry['fetched_at']):
+                _local['entry'] = shared
+                entry = shared
+    return entry
+
+def get_payment_catalog():
+    """
+    Serve the merged channel catalog from cache (stale-while-revalidate)
+
+    Fresh entries are returned as-is; entries past PAYMENT_CHANNELS_TTL are
+    still served while a background refresh runs. Entries past
+    PAYMENT_CHANNELS_STALE_TTL, or an empty cache, return None.
+
+    Returns:
+        tuple: (payload dict, etag) or None if no usable catalog is cached
+    """
+    entry = _current_entry()
+    age = time.time() - entry['fetched_at'] if entry else None
+
+    if entry is None or age > current_app.config.get('PAYMENT_CHANNELS_TTL', 300):
+        _schedule_refresh()
+    if entry is None or age > current_app.config.get('PAYMENT_CHANNELS_STALE_TTL', 3600):
+        return None
+
+    packages, packages_etag = get_package_catalog()
+    packages = packages['packages']
+    # Recompute when either the channels or the package catalog changed
+    memo_key = (entry['fetched_at'], packages_etag)
+    with _lock:
+        memo = _local['merged']
+    if memo and memo[0] == memo_key:
+        return memo[1], memo[2]
+
+    payload = {
+        'channels': merge_channels(entry['channels'], packages),
+        'updated_at': int(entry['fetched_at'])
+    }
+    # Hash only the channel data so an unchanged refresh keeps the same ETag
+    etag = hashlib.sha256(json.dumps(payload['channels'], sort_keys=True).encode('utf-8')).hexdigest()[:32]
+    with _lock:
+        _local['merged'] = (memo_key, payload, etag)
+    return payload, etag
+
+def is_channel_active(code, amount=None):
+    """
+    Check a payment method, and the amount if given, against the cached catalog
+
+    The amount must lie within the channel's minimum_amount/maximum_amount,
+    as Tripay rejects transactions outside them. Returns None when no
+    catalog is cached so callers can fall back to letting Tripay decide.
+    """
+    if get_payment_catalog() is None:
+        return None
+    with _lock:
+        channels = _local['entry']['channels']
+
+    for channel in channels:
+        if channel.get('code') == code:
+            if amount is None:
+                return channel.get('active', False)
+            return _is_available(channel, float(amount))
+    return False
@@ -0,0 +1,306 @@
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db, Order, PaymentEvent
+from utils.redis_client import get_redis
+from utils.status_cache import invalidate_order_status
+from utils.order_state import transition_order, INVITATION_QUEUED
+from utils.email_service import queue_payment_confirmation
+from utils.email_outbox import wake_email_sender
+from utils.invitation_batcher import batching_enabled, schedule_invitation_flush
+
+logger = logging.getLogger(__name__)
+
+DRAIN_LOCK_KEY = 'payment_events:drain:{}'
+
+# Sweeper thread used when Celery beat is not running
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+# Map Tripay status to our internal status
+STATUS_MAPPING = {
+    'PAID': 'paid',
+    'EXPIRED': 'expired',
+    'FAILED': 'failed',
+    'UNPAID': 'pending'
+}
+
+def record_payment_event(webhook_data):
+    """
+    Store a verified callback in the inbox
+
+    This is all the webhook does before answering Tripay, so the response
+    time no longer depends on email, Redis or Celery. A redelivery of an
+    event already stored (same reference and status) is rejected by the
+    unique key and ignored.
+
+    Returns:
+        PaymentEvent: The committed event, or None for a duplicate
+    """
+    event = PaymentEvent(
+        merchant_ref=webhook_data['merchant_ref'],
+        reference=webhook_data['reference'],
+        status=webhook_data['status'],
+        payload=json.dumps(webhook_data)
+    )
+    db.session.add(event)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return event
+
+def _apply_event(event):
+    """
+    Apply one event as a compare-and-set transition, without committing
+
+    Redeliveries and events that would move the order backwards (e.g.
+    UNPAID after PAID) match no row and are no-ops.
+
+    Returns:
+        Row: (id, order_id) if this event just moved the order to paid, else None
+    """
+    new_status = STATUS_MAPPING.get(event.status, 'pending')
+    # The invitation is claimed in the same statement, so only the worker
+    # that wins the transition to paid queues it
+    if new_status == 'paid':
+        values = {'invitation_status': INVITATION_QUEUED if batching_enabled() else 'processing'}
+    else:
+        values = {}
+
+    moved = transition_order(event.merchant_ref, new_status, **values)
+    if moved is None:
+        current_status = db.session.query(Order.payment_status).filter_by(order_id=event.merchant_ref).scalar()
+        if current_status is None:
+            raise LookupError(f"Order not found: {event.merchant_ref}")
+        logger.info(f"Payment event {event.id} for order {event.merchant_ref} ignored: {current_status} -> {new_status} not applicable")
+        return None
+
+    logger.info(f"Payment event {event.id} moved order {event.merchant_ref} to {new_status}")
+    return moved if new_status == 'paid' else None
+
+def _after_paid(order_id):
+    """Side effects of a newly paid order, run after its status is committed"""
+    order = Order.query.get(order_id)
+    wake_email_sender()
+
+    # Trigger invitation task
+    if not current_app.config.get('ENABLE_CELERY', False):
+        logger.info(f"Celery disabled, invitation task not queued for order {order.order_id}")
+        return
+
+    try:
+        if order.invitation_status == INVITATION_QUEUED:
+            schedule_invitation_flush()
+            logger.info(f"Order {order.order_id} queued for the next invitation batch")
+            return
+
+        from tasks import process_invitation_task
+        process_invitation_task.delay(order.id)
+        logger.info(f"Invitation task queued for order {order.order_id}")
+    except Exception as e:
+        logger.error(f"Failed to queue invitation task: {str(e)}")
+        order.invitation_status = 'failed'
+        db.session.commit()
+        invalidate_order_status(order.order_id)
+
+def _record_failure(event_id, error):
+    """
+    Count a failed attempt; after PAYMENT_EVENT_MAX_ATTEMPTS the event is
+    parked (processed_at set, last_error kept) so it stops blocking the
+    events behind it. Parked events can be re-run with replay_payment_events.py.
+    """
+    try:
+        attempts = (db.session.query(PaymentEvent.attempts).filter_by(id=event_id).scalar() or 0) + 1
+        values = {'attempts': attempts, 'last_error': str(error)}
+
+        max_attempts = current_app.config.get('PAYMENT_EVENT_MAX_ATTEMPTS', 5)
+        if attempts >= max_attempts or isinstance(error, LookupError):
+            values['processed_at'] = datetime.utcnow()
+            logger.error(f"Payment event {event_id} parked after {attempts} attempts: {str(error)}")
+
+        PaymentEvent.query.filter_by(id=event_id).update(values)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to record payment event failure: {str(e)}")
+
+def _acquire_drain_lock(client, lock_key):
+    """
+    Returns:
+        bool: True if this worker now holds the order's drain lock
+    """
+    lock_timeout = current_app.config.get('PAYMENT_EVENTS_LOCK_TIMEOUT', 120)
+    return bool(client.set(lock_key, '1', nx=True, ex=lock_timeout))
+
+def _has_unprocessed(merchant_ref):
+    return db.session.query(PaymentEvent.id).filter(
+        PaymentEvent.merchant_ref == merchant_ref,
+        PaymentEvent.processed_at.is_(None)
+    ).first() is not None
+
+def _drain(merchant_ref):
+    """
+    Apply unprocessed events of one order until none is left or one fails
+
+    Returns:
+        tuple: (events processed, True if stopped by a failing event)
+    """
+    processed = 0
+    while True:
+        event = PaymentEvent.query.filter(
+            PaymentEvent.merchant_ref == merchant_ref,
+            PaymentEvent.processed_at.is_(None)
+        ).order_by(PaymentEvent.id).first()
+        if event is None:
+            return processed, False
+
+        event_id = event.id
+        try:
+            paid_order = _apply_event(event)
+            if paid_order:
+                # Committed together with the status change
+                queue_payment_confirmation(Order.query.get(paid_order.id))
+            event.processed_at = datetime.utcnow()
+            event.attempts += 1
+            event.last_error = None
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error processing payment event {event_id}: {str(e)}")
+            _record_failure(event_id, e)
+            if isinstance(e, LookupError):
+                continue
+            return processed, True
+
+        processed += 1
+        invalidate_order_status(merchant_ref)
+        if paid_order:
+            _after_paid(paid_order.id)
+
+def process_payment_events(merchant_ref):
+    """
+    Drain the unprocessed events of one order, oldest first
+
+    A Redis lock per merchant_ref keeps two workers from interleaving events
+    of the same order. A dispatch that finds the lock taken returns at once,
+    so after releasing the lock the holder checks for events stored in the
+    meantime and drains again. A failing event stops the drain so later
+    events are never applied before it; the periodic sweep retries it.
+
+    Returns:
+        int: Number of events processed
+    """
+    lock_key = DRAIN_LOCK_KEY.format(merchant_ref)
+    processed = 0
+    while True:
+        client = None
+        locked = False
+        try:
+            client = get_redis()
+            if client:
+                locked = _acquire_drain_lock(client, lock_key)
+                if not locked:
+                    logger.info(f"Payment events for order {merchant_ref} already being processed")
+                    return processed
+        except Exception as e:
+            logger.warning(f"Payment event lock unavailable: {str(e)}")
+            client = None
+
+        try:
+            drained, failed = _drain(merchant_ref)
+            processed += drained
+        finally:
+            if locked:
+                try:
+                    client.delete(lock_key)
+                except Exception:
+                    pass
+
+        if failed or not locked or not _has_unprocessed(merchant_ref):
+            return processed
+
+def pending_merchant_refs(limit=100):
+    """Orders with unprocessed events, oldest event first"""
+    rows = db.session.query(
+        PaymentEvent.merchant_ref,
+        db.func.min(PaymentEvent.id).label('first_id')
+    ).filter(
+        PaymentEvent.processed_at.is_(None)
+    ).group_by(PaymentEvent.merchant_ref).order_by('first_id').limit(limit).all()
+    return [row.merchant_ref for row in rows]
+
+def drain_payment_events(limit=100):
+    """
+    Sweep the inbox for events whose immediate dispatch was lost or failed
+
+    Returns:
+        int: Number of events processed
+    """
+    processed = 0
+    for merchant_ref in pending_merchant_refs(limit):
+        processed += process_payment_events(merchant_ref)
+    return processed
+
+def start_payment_event_sweeper(app):
+    """
+    Sweep the inbox every PAYMENT_EVENTS_SWEEP_SECONDS in a daemon thread
+
+    Stands in for the Celery beat sweep when ENABLE_CELERY is off, so
+    failed events and events whose dispatch was lost are still retried
+    after the webhook has answered Tripay. One thread per process.
+    """
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper.is_alive():
+            return _sweeper
+
+        interval = app.config.get('PAYMENT_EVENTS_SWEEP_SECONDS', 60)
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        processed = drain_payment_events()
+                        if processed:
+                            logger.info(f"Payment event sweep processed {processed} events")
+                    except Exception as e:
+                        logger.error(f"Payment event sweep failed: {str(e)}")
+                    finally:
+                        db.session.remove()
+
+        _sweeper = threading.Thread(target=sweep, name='payment-event-sweeper', daemon=True)
+        _sweeper.start()
+        return _sweeper
+
+def reset_payment_events(received_from, received_to, merchant_ref=None):
+    """
+    Mark events received in [received_from, received_to) as unprocessed again
+
+    Returns:
+        list: merchant_refs to drain, in order of their first reset event
+    """
+    query = PaymentEvent.query.filter(
+        PaymentEvent.received_at >= received_from,
+        PaymentEvent.received_at < received_to
+    )
+    if merchant_ref:
+        query = query.filter(PaymentEvent.merchant_ref == merchant_ref)
+
+    merchant_refs = []
+    for row in query.with_entities(PaymentEvent.merchant_ref).order_by(PaymentEvent.id).all():
+        if row.merchant_ref not in merchant_refs:
+            merchant_refs.append(row.merchant_ref)
+
+    query.update(
+        {'processed_at': None, 'attempts': 0, 'last_error': None},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return merchant_refs
@@ -0,0 +1,29 @@
+import logging
+import redis
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Global client instance (redis-py keeps its own connection pool)
+_client = None
+
+def get_redis():
+    """
+    Factory function to get the shared Redis client used for caching
+
+    Short socket timeouts keep a slow or missing Redis from stalling
+    requests; callers treat Redis errors as a cache miss.
+    Returns None if no REDIS_URL is configured.
+    """
+    global _client
+    if _client is None:
+        redis_url = current_app.config.get('REDIS_URL')
+        if not redis_url:
+            return None
+        _client = redis.Redis.from_url(
+            redis_url,
+            socket_timeout=current_app.config.get('REDIS_SOCKET_TIMEOUT', 0.5),
+            socket_connect_timeout=current_app.config.get('REDIS_SOCKET_TIMEOUT', 0.5),
+            health_check_interval=30
+        )
+    return _client
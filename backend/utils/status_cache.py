@@ -0,0 +1,121 @@
+import json
+import hashlib
+import logging
+from flask import current_app
+from models import db, Order
+from utils.cache import LocalLRUCache, SingleFlight, MISSING
+from utils.redis_client import get_redis
+from utils.order_events import publish_status_change
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = 'order_status:{}'
+
+# Fields returned by the status endpoint, read without hydrating an Order
+STATUS_COLUMNS = (
+    Order.order_id,
+    Order.customer_email,
+    Order.payment_status,
+    Order.invitation_status,
+    Order.checkout_url,
+    Order.qr_string,
+    Order.payment_method
+)
+
+_local = None
+_flight = SingleFlight()
+
+def _local_cache():
+    global _local
+    if _local is None:
+        _local = LocalLRUCache(
+            maxsize=current_app.config.get('ORDER_STATUS_LOCAL_SIZE', 2048),
+            ttl=current_app.config.get('ORDER_STATUS_LOCAL_TTL', 1.0)
+        )
+    return _local
+
+def _load_from_db(order_id):
+    """Column-only read of the status fields; returns None if the order does not exist"""
+    row = db.session.query(*STATUS_COLUMNS).filter(Order.order_id == order_id).first()
+    if row is None:
+        return None
+
+    status = {column.key: getattr(row, column.key) for column in STATUS_COLUMNS}
+    # Only the visible fields are hashed, not updated_at: updates that leave
+    # the status unchanged keep the ETag, so clients keep their 304s
+    status['etag'] = hashlib.sha1(json.dumps(status, sort_keys=True).encode('utf-8')).hexdigest()
+    return status
+
+def _write_redis(order_id, status, only_if_absent):
+    try:
+        client = get_redis()
+        if client:
+            client.set(
+                STATUS_KEY.format(order_id),
+                json.dumps(status),
+                ex=current_app.config.get('ORDER_STATUS_CACHE_TTL', 300),
+                nx=only_if_absent
+            )
+    except Exception as e:
+        logger.warning(f"Failed to cache status for order {order_id}: {str(e)}")
+
+def _read_redis(order_id):
+    try:
+        client = get_redis()
+        raw = client.get(STATUS_KEY.format(order_id)) if client else None
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Failed to read cached status for order {order_id}: {str(e)}")
+        return None
+
+def _fill(order_id):
+    status = _load_from_db(order_id)
+    if status is not None:
+        # NX: never overwrite a fresher value written by invalidate_order_status
+        _write_redis(order_id, status, only_if_absent=True)
+    return status
+
+def get_order_status(order_id):
+    """
+    Status fields for an order: local LRU, then Redis, then one DB read
+
+    Concurrent misses for the same order_id in this process share a single
+    DB query. Unknown orders are cached locally only, for the local TTL.
+
+    Returns:
+        dict or None: status fields plus an 'etag', None if not found
+    """
+    local = _local_cache()
+    status = local.get(order_id)
+    if status is not MISSING:
+        return status
+
+    status = _read_redis(order_id)
+    if status is None:
+        status = _flight.do(order_id, lambda: _fill(order_id))
+
+    local.set(order_id, status)
+    return status
+
+def invalidate_order_status(order_id):
+    """
+    Refresh the cached status after a committed status change
+
+    Write-through rather than delete: the fresh row is read after the commit
+    and overwrites Redis, while readers only fill Redis when the key is
+    absent. A reader that loaded the old row just before the commit can
+    therefore never put it back. The fresh status is also published to
+    the SSE streams watching the order.
+    """
+    try:
+        _local_cache().delete(order_id)
+        status = _load_from_db(order_id)
+        if status is None:
+            client = get_redis()
+            if client:
+                client.delete(STATUS_KEY.format(order_id))
+            return
+        _write_redis(order_id, status, only_if_absent=False)
+        publish_status_change(order_id, status)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cached status for order {order_id}: {str(e)}")
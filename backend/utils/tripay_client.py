@@ -2,13 +2,23 @@ import os
 import hmac
 import hashlib
 import json
+import time
 import requests
 import logging
 from datetime import datetime
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from utils.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
+# Returned without touching the network while the circuit breaker is open
+GATEWAY_DEGRADED_RESPONSE = {
+    'success': False,
+    'degraded': True,
+    'error': 'Payment gateway degraded'
+}
+
 class TripayClient:
     def __init__(self):
         self.api_key = current_app.config.get('TRIPAY_API_KEY')
@@ -21,6 +31,78 @@ class TripayClient:
         if not all([self.api_key, self.merchant_code, self.private_key]):
             logger.error("Tripay credentials not properly configured")
             raise ValueError("Missing Tripay credentials in configuration")
+        
+        # Separate connect/read timeouts so a dead host fails in seconds
+        self.timeout = (
+            current_app.config.get('TRIPAY_CONNECT_TIMEOUT', 3.05),
+            current_app.config.get('TRIPAY_READ_TIMEOUT', 15)
+        )
+        
+        # One keep-alive pool per process, sized to the threads that share it
+        pool_size = current_app.config.get('TRIPAY_POOL_SIZE', 10)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+        
+        self.breaker = CircuitBreaker(
+            'tripay',
+            failure_rate_threshold=current_app.config.get('TRIPAY_BREAKER_FAILURE_RATE', 0.5),
+            slow_call_seconds=current_app.config.get('TRIPAY_BREAKER_SLOW_CALL_SECONDS', 5.0),
+            slow_call_rate_threshold=current_app.config.get('TRIPAY_BREAKER_SLOW_CALL_RATE', 0.5),
+            minimum_calls=current_app.config.get('TRIPAY_BREAKER_MINIMUM_CALLS', 10),
+            window_seconds=current_app.config.get('TRIPAY_BREAKER_WINDOW_SECONDS', 60),
+            open_seconds=current_app.config.get('TRIPAY_BREAKER_OPEN_SECONDS', 30)
+        )
+    
+    def _degraded_response(self):
+        """Cached fail-fast response used while the breaker is open"""
+        response = dict(GATEWAY_DEGRADED_RESPONSE)
+        response['details'] = {
+            'breaker_state': self.breaker.state,
+            'retry_after': self.breaker.retry_after()
+        }
+        return response
+    
+    def _request(self, method, path, **kwargs):
+        """
+        Send a request through the pooled session and record its outcome
+        
+        Network errors and 5xx responses count as failures for the circuit
+        breaker; 4xx responses mean the gateway is up and count as successes.
+        Returns None without sending anything when the breaker is open.
+        """
+        if not self.breaker.allow_request():
+            logger.warning(f"Tripay circuit breaker open, skipping {method} {path}")
+            return None
+        
+        url = f"{self.base_url}{path}"
+        started = time.monotonic()
+        success = False
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            success = response.status_code < 500
+            return response
+        finally:
+            latency = time.monotonic() - started
+            self.breaker.record(success, latency)
+            logger.info(f"Tripay {method} {path} took {latency * 1000:.0f} ms (success={success})")
+    
+    def is_degraded(self):
+        """True while the breaker is refusing calls"""
+        return self.breaker.state == CircuitBreaker.OPEN
+    
+    def degraded_response(self):
+        """Fail-fast response for callers that check is_degraded() up front"""
+        return self._degraded_response()
+    
+    def get_health(self):
+        """Gateway health: breaker state and per-call latency over the window"""
+        return self.breaker.stats()
     
     def _build_signature(self, merchant_ref, amount):
         """
@@ -93,17 +175,12 @@ class TripayClient:
                 payload['callback_url'] = callback_url
             
             # Make request to Tripay
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            url = f"{self.base_url}/transaction/create"
-            
             logger.info(f"Creating Tripay transaction: {payload['merchant_ref']}")
-            logger.info(f"Tripay URL: {url}")
+            logger.info(f"Tripay URL: {self.base_url}/transaction/create")
             
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._request('POST', '/transaction/create', json=payload)
+            if response is None:
+                return self._degraded_response()
             
             logger.info(f"Tripay response status: {response.status_code}")
             logger.info(f"Tripay response body: {response.text}")
@@ -224,13 +301,9 @@ class TripayClient:
             dict: Available payment channels
         """
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            url = f"{self.base_url}/merchant/payment-channel"
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._request('GET', '/merchant/payment-channel')
+            if response is None:
+                return self._degraded_response()
             
             if response.status_code == 200:
                 result = response.json()
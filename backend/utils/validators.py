@@ -1,7 +1,7 @@
 import re
 import phonenumbers
 from email_validator import validate_email, EmailNotValidError
-from flask import current_app
+from utils.package_catalog import get_package
 
 def validate_email_format(email):
     """Validate email format using email-validator library"""
@@ -33,12 +33,39 @@ def validate_phone_number(phone):
         return False, f"Phone number parse error: {str(e)}"
 
 def validate_package_id(package_id):
-    """Validate if package_id exists in configuration"""
-    packages = current_app.config.get('PACKAGES', {})
-    if package_id not in packages:
+    """Validate if package_id is an active package"""
+    if get_package(package_id) is None:
         return False, f"Invalid package_id: {package_id}"
     return True, package_id
 
+def validate_member_emails(member_emails, package_id):
+    """
+    Validate the member emails of an order against the package seats
+    
+    Emails are normalized and duplicates dropped, keeping the first spelling.
+    """
+    if not isinstance(member_emails, list) or not member_emails:
+        return False, "member_emails must be a non-empty list"
+    
+    normalized = []
+    seen = set()
+    for email in member_emails:
+        if not isinstance(email, str):
+            return False, "member_emails must contain strings"
+        is_valid, result = validate_email_format(email)
+        if not is_valid:
+            return False, f"{email}: {result}"
+        if result.lower() not in seen:
+            seen.add(result.lower())
+            normalized.append(result)
+    
+    package = get_package(package_id)
+    seats = package.get('seats', 1) if package else 1
+    if len(normalized) > seats:
+        return False, f"Package {package_id} allows at most {seats} member email(s)"
+    
+    return True, normalized
+
 def sanitize_input(text):
     """Basic input sanitization"""
     if not text:
@@ -77,6 +104,15 @@ def validate_order_data(data):
         if not is_valid:
             errors['package_id'] = result
     
+    # Member emails (optional): who gets invited, defaults to the customer
+    if not errors:
+        member_emails = data.get('member_emails') or [data['customer_email']]
+        is_valid, result = validate_member_emails(member_emails, data['package_id'])
+        if not is_valid:
+            errors['member_emails'] = result
+        else:
+            data['member_emails'] = result
+    
     # Phone validation (optional)
     if 'phone_number' in data and data['phone_number']:
         is_valid, result = validate_phone_number(data['phone_number'])
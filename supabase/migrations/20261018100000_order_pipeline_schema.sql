@@ -0,0 +1,153 @@
+/*
+  # Order Pipeline Schema
+
+  Brings databases created by the earlier migrations up to the backend
+  models; db.create_all() only creates missing tables and never alters
+  existing ones.
+
+  1. Changes
+    - `orders.qr_string` (text) - QRIS payload of the Tripay transaction
+    - `orders.expired_at` (timestamptz) - Tripay expired_time of the transaction,
+      backfilled for pending orders (transactions are created for 24 hours)
+    - `packages.seats` (integer) - Member emails an order of the package may
+      invite; 5 for the Team Plan
+
+  2. New Tables
+    - `order_members` - Member emails of an order and their invitation status
+    - `admin_sessions` - Encrypted login cookies of the ChatGPT admin accounts
+    - `idempotency_keys` - Stored responses of POST /api/orders per Idempotency-Key
+    - `payment_events` - Inbox of raw Tripay callbacks
+    - `email_outbox` - Outgoing email, delivered by the email sender
+
+  3. Security
+    - Enable RLS on the new tables, service role only
+
+  4. Indexes
+    - Composite indexes on orders for reusable transaction lookups and the
+      keyset-paginated admin order list
+*/
+
+-- Orders: QRIS payload for the confirmation page
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS qr_string TEXT;
+
+-- Orders: expiry of the Tripay transaction, used to reuse pending transactions
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS expired_at TIMESTAMPTZ;
+
+UPDATE orders
+SET expired_at = created_at + INTERVAL '24 hours'
+WHERE payment_status = 'pending' AND expired_at IS NULL;
+
+-- Packages: member emails an order may invite
+ALTER TABLE packages ADD COLUMN IF NOT EXISTS seats INTEGER NOT NULL DEFAULT 1;
+
+UPDATE packages SET seats = 5 WHERE id = 'team_package';
+
+-- Create order_members table
+CREATE TABLE IF NOT EXISTS order_members (
+  id SERIAL PRIMARY KEY,
+  order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+  email TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  error_message TEXT,
+  invited_at TIMESTAMPTZ,
+  CONSTRAINT uq_order_members_order_email UNIQUE (order_id, email)
+);
+
+-- Create admin_sessions table
+CREATE TABLE IF NOT EXISTS admin_sessions (
+  id SERIAL PRIMARY KEY,
+  admin_email TEXT UNIQUE NOT NULL,
+  admin_id INTEGER REFERENCES admin_accounts(id) ON DELETE CASCADE,
+  cookies TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_verified_at TIMESTAMPTZ,
+  restores INTEGER NOT NULL DEFAULT 0,
+  restore_failures INTEGER NOT NULL DEFAULT 0,
+  logins INTEGER NOT NULL DEFAULT 0
+);
+
+-- Create idempotency_keys table
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  id SERIAL PRIMARY KEY,
+  key TEXT UNIQUE NOT NULL,
+  request_hash TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'in_progress',
+  response_status INTEGER,
+  response_body TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Create payment_events table
+CREATE TABLE IF NOT EXISTS payment_events (
+  id SERIAL PRIMARY KEY,
+  merchant_ref TEXT NOT NULL,
+  reference TEXT NOT NULL,
+  status TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  processed_at TIMESTAMPTZ,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  CONSTRAINT uq_payment_events_reference_status UNIQUE (reference, status)
+);
+
+-- Create email_outbox table
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id SERIAL PRIMARY KEY,
+  category TEXT NOT NULL,
+  order_id INTEGER REFERENCES orders(id),
+  to_email TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  html_content TEXT NOT NULL,
+  text_content TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  last_error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  sent_at TIMESTAMPTZ
+);
+
+-- Create indexes
+CREATE INDEX IF NOT EXISTS ix_orders_reuse_lookup ON orders(customer_email, package_id, payment_status, created_at);
+CREATE INDEX IF NOT EXISTS ix_orders_created_at_id ON orders(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_orders_payment_status_created_at_id ON orders(payment_status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_orders_invitation_status_created_at_id ON orders(invitation_status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_orders_package_id_created_at_id ON orders(package_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_order_members_order_id ON order_members(order_id);
+CREATE INDEX IF NOT EXISTS ix_admin_sessions_admin_email ON admin_sessions(admin_email);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_key ON idempotency_keys(key);
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS ix_payment_events_received_at ON payment_events(received_at);
+CREATE INDEX IF NOT EXISTS ix_payment_events_merchant_ref_id ON payment_events(merchant_ref, id);
+CREATE INDEX IF NOT EXISTS ix_payment_events_processed_at_id ON payment_events(processed_at, id);
+CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt_at ON email_outbox(status, next_attempt_at, id);
+
+-- Enable RLS
+ALTER TABLE order_members ENABLE ROW LEVEL SECURITY;
+ALTER TABLE admin_sessions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;
+ALTER TABLE payment_events ENABLE ROW LEVEL SECURITY;
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policies (service role only)
+CREATE POLICY "Service role can manage order members"
+  ON order_members FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role can manage admin sessions"
+  ON admin_sessions FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role can manage idempotency keys"
+  ON idempotency_keys FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role can manage payment events"
+  ON payment_events FOR ALL
+  USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role can manage email outbox"
+  ON email_outbox FOR ALL
+  USING (auth.role() = 'service_role');